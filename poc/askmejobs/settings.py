@@ -18,12 +18,103 @@ GENAI_CONFIG = {
     "thinking_config": {"thinking_budget": 0},
 }
 
+# Backend de resumen (experiences/summarizers): "auto" (gemini si hay GEMINI_API_KEY,
+# si no extractive), "gemini", "extractive", "fake" o la ruta "modulo.Clase".
+SUMMARIZER_BACKEND = os.environ.get("ASKMEJOBS_SUMMARIZER", "auto")
+
+# Pre-resumen extractivo local (TF-IDF + MMR) antes de llamar a la IA.
+# También es el resumidor offline cuando no hay GEMINI_API_KEY.
+AI_EXTRACTIVE = {
+    "enabled": True,
+    # Tokens aprox. del extracto enviado en el prompt (si el corpus completo los excede)
+    "token_budget": 2000,
+    # Peso de la relevancia frente a la redundancia en MMR (1.0 = solo relevancia)
+    "mmr_lambda": 0.7,
+    # Oraciones candidatas por banda antes de vectorizar (acota la memoria de la matriz TF-IDF)
+    "max_candidates": 1000,
+}
+
+# Refresco de resúmenes (stale-while-revalidate)
+AI_SUMMARY_REFRESH = {
+    # Recalcular en un hilo de fondo; las páginas muestran el último resumen válido mientras tanto
+    "async": True,
+    # Segundos de espera antes de reintentar una empresa cuyo último intento falló
+    "retry_backoff": 300,
+}
+
+# Detección de reviews casi duplicadas (MinHash + LSH)
+REVIEW_DEDUP = {
+    "num_perm": 128,      # tamaño de la firma MinHash
+    "bands": 32,          # bandas LSH (filas por banda = num_perm / bands)
+    "shingle_size": 3,    # n-gramas de palabras
+    "min_words": 8,       # textos más cortos no se evalúan
+    # Umbrales de similitud (Jaccard estimado) por alcance: marcar o rechazar
+    "enterprise": {"flag": 0.7, "reject": 0.9},  # contra reviews de la misma empresa
+    "author": {"flag": 0.6, "reject": 0.8},      # contra reviews del mismo autor
+}
+
+# Autocompletado de empresas (índice de prefijos en memoria por proceso)
+AUTOCOMPLETE = {
+    "limit": 8,      # sugerencias por consulta
+    "max_age": 300,  # segundos antes de refrescar los conteos de reviews
+}
+
+# Reviews similares / empresas relacionadas (experiences/similarity.py)
+SIMILARITY = {
+    "n_features": 512,  # columnas del feature hashing
+    "k": 5,             # vecinos guardados por review / empresa
+    "block_size": 256,  # filas por bloque del producto X_bloque · Xᵀ
+    "min_score": 0.2,   # coseno mínimo para guardar un vecino
+}
+
+# Rankings "tendencia" y "mejor valoradas" (experiences/ranking.py).
+# Cambiar el prior o la vida media requiere `manage.py rebuild_rankings`.
+RANKING = {
+    "prior_mean": 3.0,       # estrellas supuestas antes de tener reviews
+    "prior_weight": 5,       # cuántas reviews "vale" el prior
+    "half_life_days": 7,     # la actividad pesa la mitad cada N días
+    "review_weight": 1.0,    # peso de una review en la actividad
+    "comment_weight": 0.3,   # peso de un comentario en la actividad
+    "limit": 20,             # empresas por listado
+}
+
+# Fragmentos y agregados de páginas en caché (experiences/page_cache.py) y su
+# calentamiento con `manage.py warm_cache` (experiences/warmup.py).
+PAGE_CACHE = {
+    "timeout": 3600,                  # segundos de vida de fragmentos y agregados
+    "warm_enterprises": 20,           # empresas más activas a calentar
+    "warm_reviews_per_enterprise": 5, # reviews más nuevas de cada una
+    "warm_workers": 4,                # páginas renderizadas en paralelo
+    "warm_budget": 30,                # segundos máximos del calentamiento
+}
+
+# Precios del modelo (USD por millón de tokens) para estimar costos en la telemetría.
+# Valores de referencia de gemini-2.5-flash; ajustar si se cambia GEMINI_MODEL.
+GENAI_PRICING = {
+    "input_per_million": 0.30,
+    "output_per_million": 2.50,
+}
+
 # ========================
 # 🔹 RUTA BASE DEL PROYECTO
 # ========================
 # BASE_DIR nos permite construir rutas relativas dentro del proyecto.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Límites de escritura por ruta (experiences/throttling.py): "N/unidad" con
+# unidad s, m, h o d (también "N/10m"). Alcances: user, ip, enterprise.
+THROTTLE_RATES = {
+    "review_create": {"user": "5/h", "ip": "20/h", "enterprise": "30/h"},
+    "comment_create": {"user": "30/h", "ip": "60/h"},
+}
+
+# Perfilado bajo demanda para staff (experiences/profiling.py)
+PROFILING = {
+    "dir": os.environ.get("ASKMEJOBS_PROFILING_DIR", BASE_DIR / "profiles"),  # .prof + .json
+    "keep": 50,        # capturas conservadas (se borran las más viejas)
+    "stack_depth": 4,  # frames del proyecto guardados por consulta SQL
+}
+
 
 # ========================
 # 🔹 SEGURIDAD
@@ -68,6 +159,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',      # Protección contra ataques CSRF
     'django.contrib.auth.middleware.AuthenticationMiddleware',  # Manejo de autenticación
+    'experiences.profiling.ProfilingMiddleware',  # Perfilado bajo demanda (?_profile=1, solo staff)
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -108,14 +200,59 @@ WSGI_APPLICATION = 'askmejobs.wsgi.application'
 # 🔹 BASE DE DATOS
 # ========================
 # Por defecto usamos SQLite (archivo local db.sqlite3).
+# ASKMEJOBS_DB permite apuntar a otro archivo (ej. pruebas de carga con una BD temporal).
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('ASKMEJOBS_DB', BASE_DIR / 'db.sqlite3'),
     }
 }
 
 
+# ========================
+# 🔹 CACHÉ
+# ========================
+# Por defecto, caché en memoria de cada proceso (desarrollo).
+# Con varios workers, ASKMEJOBS_REDIS_URL activa una caché compartida: los límites
+# de escritura, los candados de resúmenes y los sellos de versión valen para todos.
+if os.environ.get('ASKMEJOBS_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['ASKMEJOBS_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            # El valor por defecto (300) no alcanza para los fragmentos y agregados de páginas
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
+# ========================
+# 🔹 SESIONES Y AUTENTICACIÓN
+# ========================
+# Sesiones en caché con escritura también en BD (si la caché se pierde, se relee de la BD).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# ModelBackend con el usuario de cada sesión cacheado (experiences/auth_backends.py).
+# Se invalida al guardar/borrar el usuario y al cerrar sesión.
+# ModelBackend sigue en la lista solo por las sesiones abiertas antes del cambio:
+# guardan su ruta y, sin él, se cerrarían todas. Los inicios de sesión nuevos usan
+# el primero. Se puede quitar cuando venzan esas sesiones (SESSION_COOKIE_AGE,
+# 2 semanas por defecto, después del deploy).
+AUTHENTICATION_BACKENDS = [
+    'experiences.auth_backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE = {
+    "timeout": 600,  # segundos que vive el usuario cacheado
+}
+
+
 # ========================
 # 🔹 VALIDACIÓN DE CONTRASEÑAS
 # ========================
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# ============================================================
+# poc/benchmarks/autocomplete_bench.py
+# Microbenchmark: índice de prefijos en memoria vs ORM icontains
+# ------------------------------------------------------------
+# Crea una BD SQLite temporal con N empresas (y reviews para el
+# ranking), y compara por consulta:
+# - autocomplete.search(q)  (índice en memoria del proceso)
+# - Enterprise.objects.filter(name__icontains=q) + conteo de reviews
+#   ordenado, limitado a k (lo que haría una vista "ingenua")
+#
+# Uso:
+#     python benchmarks/autocomplete_bench.py --enterprises 5000 --queries 2000
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+POC_DIR = Path(__file__).resolve().parent.parent
+
+WORDS = [
+    "banco", "grupo", "servicios", "tecnologia", "soluciones", "andina", "bogota", "medellin",
+    "caribe", "digital", "energia", "logistica", "consultores", "salud", "seguros", "comercial",
+    "industrias", "nacional", "global", "software", "datos", "ingenieria", "transportes", "alimentos",
+]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def setup_django(db_path: str) -> None:
+    os.environ["ASKMEJOBS_DB"] = db_path
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "askmejobs.settings")
+    sys.path.insert(0, str(POC_DIR))
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command("migrate", verbosity=0, interactive=False)
+
+
+def seed(n: int, rng: random.Random) -> list[str]:
+    from experiences.models import Enterprise, Review
+
+    names = set()
+    while len(names) < n:
+        names.add(" ".join(w.capitalize() for w in rng.sample(WORDS, rng.randint(1, 3))) + f" {len(names)}")
+    ents = Enterprise.objects.bulk_create([Enterprise(name=name) for name in names])
+    Review.objects.bulk_create(
+        [Review(enterprise=e, title="x", body="x", rating=3) for e in ents for _ in range(rng.randint(0, 5))],
+        batch_size=2000,
+    )
+    return sorted(names)
+
+
+def timed(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        "mean_us": round(statistics.mean(samples), 1),
+        "p50_us": round(percentile(samples, 50), 1),
+        "p99_us": round(percentile(samples, 99), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Autocompletado: índice en memoria vs ORM icontains.")
+    parser.add_argument("--enterprises", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="askmejobs-autocomplete-") as tmp:
+        setup_django(str(Path(tmp) / "db.sqlite3"))
+        from django.db.models import Count
+        from experiences import autocomplete
+        from experiences.models import Enterprise
+
+        names = seed(args.enterprises, rng)
+        # Consultas realistas: prefijos de 1 a 6 caracteres de palabras de nombres reales
+        queries = []
+        for _ in range(args.queries):
+            word = rng.choice(rng.choice(names).split())
+            queries.append(word[: rng.randint(1, min(6, len(word)))].lower())
+
+        start = time.perf_counter()
+        autocomplete.get_index()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        index = autocomplete.get_index()
+        results = {
+            "enterprises": args.enterprises,
+            "queries": args.queries,
+            "index_build_ms": round(build_ms, 1),
+            # Solo la búsqueda en el índice (sin chequeo de versión en caché)
+            "index_search": timed(lambda q: index.search(q, args.limit), queries),
+            # Camino completo de la vista: chequeo de versión + búsqueda
+            "autocomplete_search": timed(lambda q: autocomplete.search(q, args.limit), queries),
+            "orm_icontains": timed(
+                lambda q: list(
+                    Enterprise.objects.filter(name__icontains=q)
+                    .annotate(n=Count("reviews"))
+                    .order_by("-n", "name")
+                    .values_list("id", "name", "n")[: args.limit]
+                ),
+                queries,
+            ),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Empresas: {results['enterprises']}  consultas: {results['queries']}  "
+          f"construcción del índice: {results['index_build_ms']} ms")
+    print(f"{'camino':<22} {'media µs':>10} {'p50 µs':>10} {'p99 µs':>10}")
+    for key in ("index_search", "autocomplete_search", "orm_icontains"):
+        r = results[key]
+        print(f"{key:<22} {r['mean_us']:>10} {r['p50_us']:>10} {r['p99_us']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# ============================================================
+# poc/benchmarks/extractive_bench.py
+# Benchmark del pre-resumen extractivo (experiences/extractive.py)
+# ------------------------------------------------------------
+# Para distintas cantidades de reviews sintéticas mide:
+# - tamaño del corpus crudo (como lo arma services.build_corpus),
+# - tamaño que antes llegaba al prompt (truncado a 18k chars),
+# - tamaño del extracto TF-IDF + MMR y su reducción,
+# - tiempo de procesamiento (mediana de varias repeticiones).
+#
+# Uso:
+#     python benchmarks/extractive_bench.py --counts 10 100 1000 5000 --budget 2000
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from experiences import extractive  # noqa: E402  (no requiere Django)
+
+LEGACY_MAX_CHARS = 18000
+
+PHRASES = {
+    "positive": [
+        "El ambiente laboral es muy bueno y los compañeros siempre ayudan",
+        "Hay muchas oportunidades de aprendizaje en proyectos reales",
+        "El salario es competitivo frente a otras empresas del sector",
+        "Los horarios son flexibles y se respeta el trabajo remoto",
+        "Los líderes dan retroalimentación clara y frecuente",
+        "Los beneficios de salud y bienestar son muy completos",
+    ],
+    "neutral": [
+        "La empresa es estable aunque el crecimiento es lento",
+        "El salario está en el promedio del mercado",
+        "Los procesos internos son correctos pero burocráticos",
+        "Algunos equipos trabajan mejor que otros",
+    ],
+    "negative": [
+        "La carga de trabajo es excesiva y se trabaja los fines de semana",
+        "Los pagos llegan tarde casi todos los meses",
+        "Los jefes no escuchan las propuestas del equipo",
+        "Hay mucha rotación de personal y poca capacitación",
+        "Las herramientas de trabajo son antiguas y lentas",
+    ],
+}
+FILLERS = ["en general", "la verdad", "desde que entré", "en mi experiencia", "según mi equipo", ""]
+
+
+def synthetic_reviews(n: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    reviews = []
+    for i in range(n):
+        rating = rng.choices([1, 2, 3, 4, 5], weights=[10, 10, 15, 30, 35])[0]
+        band = "positive" if rating >= 4 else "neutral" if rating == 3 else "negative"
+        pool = PHRASES[band] + rng.sample(sum(PHRASES.values(), []), 2)
+        sentences = [
+            f"{rng.choice(pool)} {rng.choice(FILLERS)}".strip() + "."
+            for _ in range(rng.randint(3, 8))
+        ]
+        reviews.append({"title": f"Review {i}", "body": " ".join(sentences), "rating": rating,
+                        "created": "2025-01-01"})
+    return reviews
+
+
+def raw_corpus(reviews: list[dict]) -> str:
+    """Mismo formato por review que services.build_corpus (sin truncar)."""
+    return "\n".join(
+        f"- Review:\n    título: {r['title']}\n    rating: {r['rating']}⭐\n"
+        f"    fecha: {r['created']}\n    texto: {r['body']}\n"
+        for r in reviews
+    ).strip()
+
+
+def bench(count: int, budget: int, repeats: int, mmr_lambda: float) -> dict:
+    reviews = synthetic_reviews(count)
+    raw = raw_corpus(reviews)
+    legacy = min(len(raw), LEGACY_MAX_CHARS)
+
+    timings = []
+    extract = ""
+    for _ in range(repeats):
+        start = time.perf_counter()
+        extract = extractive.build_extract(reviews, budget, mmr_lambda)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "reviews": count,
+        "raw_chars": len(raw),
+        "legacy_prompt_chars": legacy,
+        "extract_chars": len(extract),
+        "extract_tokens_est": extractive.estimate_tokens(extract),
+        "reduction_vs_raw": round(1 - len(extract) / len(raw), 4),
+        "reduction_vs_legacy": round(1 - len(extract) / legacy, 4),
+        "time_ms_median": round(1000 * statistics.median(timings), 2),
+        "time_ms_max": round(1000 * max(timings), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del pre-resumen extractivo.")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 200, 1000, 5000])
+    parser.add_argument("--budget", type=int, default=2000, help="Presupuesto de tokens del extracto.")
+    parser.add_argument("--mmr-lambda", type=float, default=0.7)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+    args = parser.parse_args(argv)
+
+    rows = [bench(c, args.budget, args.repeats, args.mmr_lambda) for c in args.counts]
+    if args.json:
+        print(json.dumps({"budget": args.budget, "mmr_lambda": args.mmr_lambda, "results": rows}, indent=2))
+        return
+
+    print(f"{'reviews':>8} {'crudo':>10} {'antes':>8} {'extracto':>9} {'-% crudo':>9} {'-% antes':>9} {'ms (med)':>9}")
+    for r in rows:
+        print(f"{r['reviews']:>8} {r['raw_chars']:>10} {r['legacy_prompt_chars']:>8} {r['extract_chars']:>9} "
+              f"{100 * r['reduction_vs_raw']:>8.1f}% {100 * r['reduction_vs_legacy']:>8.1f}% {r['time_ms_median']:>9}")
+
+
+if __name__ == "__main__":
+    main()
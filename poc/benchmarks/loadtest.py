@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# ============================================================
+# poc/benchmarks/loadtest.py
+# Generador de carga multi-proceso para AskMeJobs
+# ------------------------------------------------------------
+# ¿Qué hace este script?
+# - Crea una BD SQLite temporal, aplica migraciones y la puebla
+#   con empresas, reviews, comentarios y usuarios de prueba.
+# - Levanta la app (askmejobs.wsgi o askmejobs.asgi) en un
+#   servidor local, con el resumidor de IA reemplazado por un stub
+#   (no se llama a Gemini ni a ningún servicio externo).
+# - Desactiva los límites de escritura (THROTTLE_RATES): todo el tráfico
+#   sale de 127.0.0.1 con un usuario por worker y los POST terminarían en
+#   429 en segundos. Con --throttle se conservan y los 429 se reportan
+#   aparte ("throttled"), no como errores.
+# - Lanza N procesos que reproducen una mezcla configurable de
+#   tráfico: navegación anónima, comentarios y creación de reviews.
+# - Reporta RPS, latencias p50/p95/p99 y tasa de error por ruta
+#   en JSON, para comparar entre corridas.
+#
+# Uso:
+#     python benchmarks/loadtest.py --processes 4 --duration 30 \
+#         --mix browse=80,comment=15,review=5 --output resultados.json
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import http.cookiejar
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+POC_DIR = Path(__file__).resolve().parent.parent
+
+# Mezcla por defecto: % de escenarios que ejecuta cada proceso.
+DEFAULT_MIX = "browse=80,comment=15,review=5"
+PASSWORD = "loadtest-pass-123"
+
+
+# ============================================================
+# Modo servidor (proceso hijo)
+# ============================================================
+
+def _stub_summarizer(latency: float) -> None:
+    """Usa el resumidor "fake" (sin red) con latencia simulada en vez de Gemini."""
+    from django.conf import settings
+
+    settings.SUMMARIZER_BACKEND = "fake"
+    settings.SUMMARIZER_FAKE_LATENCY = latency
+
+
+def _disable_throttling() -> None:
+    """Sin límites de escritura: se mide la latencia de la app, no los 429."""
+    from django.conf import settings
+
+    settings.THROTTLE_RATES = {}
+
+
+def _seed(manifest_path: Path, enterprises: int, reviews_per_enterprise: int, users: int) -> None:
+    """Puebla la BD temporal y escribe un manifiesto con los ids para los workers."""
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import transaction
+    from experiences.models import Enterprise, Review, Comment
+
+    call_command("migrate", verbosity=0, interactive=False)
+
+    # bulk_create no dispara señales: la carga inicial no recalcula resúmenes.
+    rng = random.Random(42)
+    with transaction.atomic():
+        user_objs = [
+            User.objects.create_user(f"loadtest{i}", password=PASSWORD) for i in range(users)
+        ]
+        ents = Enterprise.objects.bulk_create(
+            [Enterprise(name=f"Empresa {i:03d}") for i in range(enterprises)]
+        )
+        reviews = []
+        for e in ents:
+            for j in range(reviews_per_enterprise):
+                reviews.append(Review(
+                    enterprise=e,
+                    author=rng.choice(user_objs),
+                    title=f"Experiencia {j} en {e.name}",
+                    body=" ".join(rng.choice(["buen ambiente", "salario bajo", "mucho aprendizaje",
+                                              "jefes exigentes", "horario flexible", "poco crecimiento"])
+                                  for _ in range(30)),
+                    rating=rng.randint(1, 5),
+                ))
+        reviews = Review.objects.bulk_create(reviews)
+        Comment.objects.bulk_create([
+            Comment(review=r, author=rng.choice(user_objs), text="Coincido con esta experiencia.")
+            for r in reviews if rng.random() < 0.5
+        ])
+
+    manifest = {
+        "enterprises": [e.pk for e in ents],
+        "reviews": [r.pk for r in reviews],
+        "users": [u.username for u in user_objs],
+    }
+    manifest_path.write_text(json.dumps(manifest))
+
+
+def serve(args) -> None:
+    """Punto de entrada del proceso servidor."""
+    sys.path.insert(0, str(POC_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "askmejobs.settings")
+
+    import django
+    django.setup()
+
+    _stub_summarizer(args.summary_latency)
+    if not args.throttle:
+        _disable_throttling()
+    _seed(Path(args.manifest), args.enterprises, args.reviews_per_enterprise, args.processes)
+
+    if args.interface == "asgi":
+        try:
+            import uvicorn
+        except ImportError:
+            sys.exit("El modo asgi requiere uvicorn instalado (pip install uvicorn).")
+        from askmejobs.asgi import application
+        uvicorn.run(application, host="127.0.0.1", port=args.port, log_level="warning")
+    else:
+        from django.core.servers.basehttp import run
+        from askmejobs.wsgi import application
+        run("127.0.0.1", args.port, application, threading=True)
+
+
+# ============================================================
+# Cliente HTTP (procesos worker)
+# ============================================================
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """No seguimos redirecciones: un 302 tras un POST es un éxito en sí mismo."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Client:
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.jar = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.jar), _NoRedirect()
+        )
+        self.samples: list[tuple[str, int, float]] = []
+
+    def csrf_token(self) -> str:
+        for cookie in self.jar:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def request(self, route: str, path: str, data: dict | None = None) -> int:
+        """Hace una petición y guarda (ruta, status, latencia). status 0 = error de red."""
+        body = None
+        if data is not None:
+            data = {**data, "csrfmiddlewaretoken": self.csrf_token()}
+            body = urllib.parse.urlencode(data).encode()
+        req = urllib.request.Request(self.base_url + path, data=body)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        self.samples.append((route, status, time.perf_counter() - start))
+        return status
+
+
+def _scenario_browse(client: Client, manifest: dict, rng: random.Random) -> None:
+    """Navegación anónima: índice -> empresa -> detalle de review."""
+    client.request("index", "/")
+    client.request("enterprise_experiences",
+                   f"/enterprises/{rng.choice(manifest['enterprises'])}/experiences/")
+    client.request("review_detail", f"/reviews/{rng.choice(manifest['reviews'])}/")
+
+
+def _scenario_comment(client: Client, manifest: dict, rng: random.Random) -> None:
+    client.request("comment_create", f"/reviews/{rng.choice(manifest['reviews'])}/",
+                   {"text": f"Comentario de carga {rng.random():.6f}"})
+
+
+def _scenario_review(client: Client, manifest: dict, rng: random.Random) -> None:
+    client.request("review_create", f"/enterprises/{rng.choice(manifest['enterprises'])}/reviews/new/",
+                   {"title": "Review de carga", "body": f"Texto de prueba {rng.random():.6f}",
+                    "rating": rng.randint(1, 5)})
+
+
+SCENARIOS = {
+    "browse": _scenario_browse,
+    "comment": _scenario_comment,
+    "review": _scenario_review,
+}
+
+
+def worker(params: dict) -> list[tuple[str, int, float]]:
+    """Ejecuta escenarios durante `duration` segundos; devuelve las muestras."""
+    manifest = params["manifest"]
+    rng = random.Random(params["seed"])
+    names, weights = zip(*params["mix"].items())
+
+    # Solo los workers que escriben inician sesión (una cuenta por worker);
+    # la navegación usa un cliente aparte, sin cookies de sesión.
+    client = Client(params["base_url"], params["timeout"])
+    if any(params["mix"].get(n) for n in ("comment", "review")):
+        client.request("login_form", "/login/")
+        client.request("login", "/login/", {"username": params["username"], "password": PASSWORD})
+        browse_client = Client(params["base_url"], params["timeout"])
+    else:
+        browse_client = client
+
+    deadline = time.monotonic() + params["duration"]
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        target = browse_client if name == "browse" else client
+        SCENARIOS[name](target, manifest, rng)
+
+    if browse_client is client:
+        return client.samples
+    return client.samples + browse_client.samples
+
+
+# ============================================================
+# Agregación de resultados
+# ============================================================
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ya ordenada."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list[tuple[str, int, float]], elapsed: float) -> dict:
+    by_route: dict[str, list[tuple[int, float]]] = defaultdict(list)
+    for route, status, latency in samples:
+        by_route[route].append((status, latency))
+        by_route["_total"].append((status, latency))
+
+    routes = {}
+    for route, rows in sorted(by_route.items()):
+        latencies = sorted(lat for _, lat in rows)
+        # 2xx y 3xx cuentan como éxito (los POST válidos redirigen);
+        # los 429 (solo con --throttle) se cuentan aparte.
+        throttled = sum(1 for status, _ in rows if status == 429)
+        errors = sum(1 for status, _ in rows if not 200 <= status < 400) - throttled
+        routes[route] = {
+            "requests": len(rows),
+            "errors": errors,
+            "throttled": throttled,
+            "error_rate": round(errors / len(rows), 4),
+            "rps": round(len(rows) / elapsed, 2),
+            "latency_ms": {
+                "mean": round(1000 * sum(latencies) / len(latencies), 2),
+                "p50": round(1000 * percentile(latencies, 50), 2),
+                "p95": round(1000 * percentile(latencies, 95), 2),
+                "p99": round(1000 * percentile(latencies, 99), 2),
+                "max": round(1000 * latencies[-1], 2),
+            },
+            "status_codes": _count_statuses(rows),
+        }
+    return routes
+
+
+def _count_statuses(rows) -> dict[str, int]:
+    counts: dict[str, int] = defaultdict(int)
+    for status, _ in rows:
+        counts[str(status)] += 1
+    return dict(sorted(counts.items()))
+
+
+def parse_mix(raw: str) -> dict[str, int]:
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Escenario desconocido: {name!r} (usa {', '.join(SCENARIOS)})")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base_url: str, server: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("El servidor terminó antes de estar listo (ver log del servidor).")
+        try:
+            with urllib.request.urlopen(base_url + "/health/", timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.2)
+    raise RuntimeError("Timeout esperando a que el servidor responda /health/.")
+
+
+# ============================================================
+# Orquestación
+# ============================================================
+
+def run(args) -> dict:
+    mix = parse_mix(args.mix)
+    workdir = Path(tempfile.mkdtemp(prefix="askmejobs-loadtest-"))
+    manifest_path = workdir / "manifest.json"
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    env = {**os.environ, "ASKMEJOBS_DB": str(workdir / "db.sqlite3")}
+    cmd = [
+        sys.executable, __file__, "--serve",
+        "--port", str(port),
+        "--manifest", str(manifest_path),
+        "--interface", args.interface,
+        "--processes", str(args.processes),
+        "--enterprises", str(args.enterprises),
+        "--reviews-per-enterprise", str(args.reviews_per_enterprise),
+        "--summary-latency", str(args.summary_latency),
+    ] + (["--throttle"] if args.throttle else [])
+    log = open(workdir / "server.log", "w")
+    server = subprocess.Popen(cmd, env=env, cwd=POC_DIR, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        _wait_ready(base_url, server, args.startup_timeout)
+        manifest = json.loads(manifest_path.read_text())
+
+        params = [
+            {
+                "base_url": base_url,
+                "manifest": manifest,
+                "mix": mix,
+                "duration": args.duration,
+                "timeout": args.timeout,
+                "seed": args.seed + i,
+                "username": manifest["users"][i],
+            }
+            for i in range(args.processes)
+        ]
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            results = pool.map(worker, params)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        log.close()
+        if args.keep_workdir:
+            print(f"Directorio de trabajo: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    samples = [s for chunk in results for s in chunk]
+    return {
+        "config": {
+            "interface": args.interface,
+            "processes": args.processes,
+            "duration_s": args.duration,
+            "mix": mix,
+            "enterprises": args.enterprises,
+            "reviews_per_enterprise": args.reviews_per_enterprise,
+            "summary_latency_s": args.summary_latency,
+            "throttle": args.throttle,
+            "seed": args.seed,
+        },
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "elapsed_s": round(elapsed, 3),
+        "routes": summarize(samples, elapsed),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga local para AskMeJobs.")
+    parser.add_argument("--processes", type=int, default=4, help="Procesos generadores de carga.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos de carga por proceso.")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos por escenario, ej. browse=80,comment=15,review=5.")
+    parser.add_argument("--interface", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--enterprises", type=int, default=20)
+    parser.add_argument("--reviews-per-enterprise", type=int, default=25)
+    parser.add_argument("--summary-latency", type=float, default=0.0,
+                        help="Latencia simulada (s) del resumidor stub.")
+    parser.add_argument("--throttle", action="store_true",
+                        help="Conserva THROTTLE_RATES en el servidor (por defecto se desactivan).")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición (s).")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=0, help="0 = puerto libre aleatorio.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout).")
+    parser.add_argument("--keep-workdir", action="store_true", help="Conserva BD temporal y log del servidor.")
+    # Flags internos del proceso servidor
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--manifest", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return
+
+    report = json.dumps(run(args), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
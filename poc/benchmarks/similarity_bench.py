@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# ============================================================
+# poc/benchmarks/similarity_bench.py
+# Benchmark del cálculo de vecinos (experiences/similarity.py)
+# ------------------------------------------------------------
+# Con N reviews sintéticas mide, sin tocar la BD:
+# - vectorización (feature hashing + TF-IDF),
+# - top-k por bloques sobre todas las filas (reconstrucción completa),
+# - top-k solo de las reviews nuevas (camino incremental),
+# - memoria pico (tracemalloc) de la matriz y de los bloques.
+#
+# Uso:
+#     python benchmarks/similarity_bench.py --reviews 100000 --new 1000
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+POC_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(POC_DIR))
+
+from extractive_bench import synthetic_reviews  # noqa: E402
+
+
+def setup_django(db_path: str) -> None:
+    # similarity importa los modelos; la BD no se usa (no hace falta migrar)
+    os.environ["ASKMEJOBS_DB"] = db_path
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "askmejobs.settings")
+    import django
+    django.setup()
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, round(elapsed, 2), round(peak / 2**20, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de vecinos por similitud coseno.")
+    parser.add_argument("--reviews", type=int, default=100000)
+    parser.add_argument("--new", type=int, default=1000, help="Reviews nuevas del paso incremental.")
+    parser.add_argument("--n-features", type=int, default=512)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="askmejobs-similarity-") as tmp:
+        setup_django(str(Path(tmp) / "db.sqlite3"))
+        from experiences import similarity
+
+        rng = random.Random(11)
+        texts = [f"{r['title']}. {r['body']}" for r in synthetic_reviews(args.reviews)]
+        # Algo de vocabulario propio por review para que los vecinos no sean triviales
+        texts = [f"{t} {rng.choice(['remoto', 'oficina', 'híbrido'])} {rng.randrange(500)}" for t in texts]
+
+        X, vec_s, vec_mb = measure(lambda: similarity.vectorize(texts, args.n_features))
+
+        def run(rows):
+            n = 0
+            for _, idx, _ in similarity.topk_blocks(X, rows, args.k, args.block_size):
+                n += idx.size
+            return n
+
+        _, full_s, full_mb = measure(lambda: run(range(args.reviews)))
+        new_rows = range(args.reviews - args.new, args.reviews)
+        _, inc_s, inc_mb = measure(lambda: run(new_rows))
+
+    results = {
+        "reviews": args.reviews,
+        "n_features": args.n_features,
+        "k": args.k,
+        "block_size": args.block_size,
+        "matrix_mb": round(X.nbytes / 2**20, 1),
+        "vectorize_s": vec_s,
+        "vectorize_peak_mb": vec_mb,
+        "full_topk_s": full_s,
+        "full_topk_peak_mb": full_mb,
+        "incremental_new": args.new,
+        "incremental_topk_s": inc_s,
+        "incremental_topk_peak_mb": inc_mb,
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for key, value in results.items():
+        print(f"{key:<26} {value}")
+
+
+if __name__ == "__main__":
+    main()
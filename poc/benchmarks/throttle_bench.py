@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# ============================================================
+# poc/benchmarks/throttle_bench.py
+# Sobrecosto por petición del decorador @throttle
+# ------------------------------------------------------------
+# Llama N veces a una vista trivial (RequestFactory, sin BD) con y sin
+# @throttle, con 3 alcances (user, ip, enterprise) y límites altos para
+# que ninguna petición se rechace. Mide el costo del conteo en la caché
+# configurada (LocMemCache por defecto; ASKMEJOBS_REDIS_URL para Redis).
+#
+# Uso:
+#     python benchmarks/throttle_bench.py --requests 20000
+# ============================================================
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+POC_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django() -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "askmejobs.settings")
+    sys.path.insert(0, str(POC_DIR))
+    import django
+    django.setup()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+def timed(view, requests):
+    samples = []
+    for request in requests:
+        start = time.perf_counter()
+        view(request, pk=request.enterprise_id)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return {
+        "mean_us": round(statistics.mean(samples), 2),
+        "p50_us": round(percentile(samples, 50), 2),
+        "p99_us": round(percentile(samples, 99), 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sobrecosto por petición de @throttle.")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from types import SimpleNamespace
+
+    from experiences.throttling import throttle
+
+    settings.THROTTLE_RATES = {"bench": {"user": "1000000/h", "ip": "1000000/h", "enterprise": "1000000/h"}}
+    cache.clear()
+
+    def view(request, pk):
+        return HttpResponse("ok")
+
+    throttled = throttle("bench", enterprise=lambda request, pk: pk)(view)
+
+    factory = RequestFactory()
+    requests = []
+    for i in range(args.requests):
+        request = factory.post("/", REMOTE_ADDR=f"10.0.{i % 250}.{i % 200}")
+        request.user = SimpleNamespace(pk=i % args.users, is_authenticated=True) if i % 5 else AnonymousUser()
+        request.enterprise_id = i % 50
+        requests.append(request)
+
+    baseline = timed(view, requests)
+    with_throttle = timed(throttled, requests)
+    results = {
+        "requests": args.requests,
+        "cache_backend": settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1],
+        "scopes": 3,
+        "baseline": baseline,
+        "throttled": with_throttle,
+        "overhead_mean_us": round(with_throttle["mean_us"] - baseline["mean_us"], 2),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Peticiones: {results['requests']}  caché: {results['cache_backend']}  alcances: 3")
+    print(f"{'vista':<12} {'media µs':>10} {'p50 µs':>10} {'p99 µs':>10}")
+    for key in ("baseline", "throttled"):
+        r = results[key]
+        print(f"{key:<12} {r['mean_us']:>10} {r['p50_us']:>10} {r['p99_us']:>10}")
+    print(f"Sobrecosto medio: {results['overhead_mean_us']} µs por petición")
+
+
+if __name__ == "__main__":
+    main()
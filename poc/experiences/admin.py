@@ -2,7 +2,8 @@
 # Importamos el admin de Django y nuestros modelos
 # ------------------------------
 from django.contrib import admin
-from .models import Enterprise, Review, Comment
+from .models import Enterprise, Review, Comment, LLMCall
+from .services import schedule_summary_refresh
 
 # ------------------------------
 # Administración del modelo Enterprise
@@ -10,10 +11,13 @@ from .models import Enterprise, Review, Comment
 @admin.register(Enterprise)
 class EnterpriseAdmin(admin.ModelAdmin):
     # Lo que ves en la tabla
-    list_display = ("name", "ai_summary_short", "reviews_count", "average_rating")
+    list_display = ("name", "ai_summary_short", "summary_status", "summary_generated_at", "reviews_count", "average_rating")
+    list_filter = ("summary_stale",)
     # Buscar solo por campos reales (no por propiedades)
     search_fields = ("name", "AI_summary")
     ordering = ("name",)
+    readonly_fields = ("summary_version", "summary_generated_at", "summary_corpus_hash", "summary_stale")
+    actions = ["refresh_summaries"]
 
     # Muestra un resumen cortico en la lista
     def ai_summary_short(self, obj):
@@ -22,15 +26,45 @@ class EnterpriseAdmin(admin.ModelAdmin):
         return (obj.AI_summary[:60] + "…") if len(obj.AI_summary) > 60 else obj.AI_summary
     ai_summary_short.short_description = "Resumen"
 
+    # Reintenta (en segundo plano) los resúmenes seleccionados
+    @admin.action(description="Regenerar resumen de IA")
+    def refresh_summaries(self, request, queryset):
+        scheduled = sum(schedule_summary_refresh(pk) for pk in queryset.values_list("pk", flat=True))
+        self.message_user(request, f"{scheduled} resumen(es) programado(s) para regenerarse.")
+
 # ------------------------------
 # Administración del modelo Review
 # ------------------------------
+class DuplicateFilter(admin.SimpleListFilter):
+    title = "casi duplicado"
+    parameter_name = "duplicate"
+
+    def lookups(self, request, model_admin):
+        return (("yes", "Marcado"), ("no", "No marcado"))
+
+    def queryset(self, request, queryset):
+        if self.value() == "yes":
+            return queryset.filter(fingerprint__duplicate_of__isnull=False)
+        if self.value() == "no":
+            return queryset.filter(fingerprint__duplicate_of__isnull=True)
+        return queryset
+
+
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
-    list_display = ("enterprise", "title", "author", "anonymous", "rating", "created_at")
+    list_display = ("enterprise", "title", "author", "anonymous", "rating", "duplicate_of", "created_at")
     search_fields = ("title", "body", "enterprise__name", "author__username")
-    list_filter = ("anonymous", "rating", "created_at", "enterprise")
+    list_filter = (DuplicateFilter, "anonymous", "rating", "created_at", "enterprise")
     ordering = ("-created_at",)
+    list_select_related = ("enterprise", "author", "fingerprint")
+
+    # Muestra la review original cuando esta quedó marcada como casi duplicada
+    def duplicate_of(self, obj):
+        fp = getattr(obj, "fingerprint", None)
+        if not fp or not fp.duplicate_of_id:
+            return "—"
+        return f"#{fp.duplicate_of_id} ({fp.similarity:.0%})"
+    duplicate_of.short_description = "Duplicado de"
 
 # ------------------------------
 # Administración del modelo Comment
@@ -40,4 +74,20 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ("review", "author", "anonymous", "created_at")
     search_fields = ("text", "author__username", "review__title", "review__enterprise__name")
     list_filter = ("anonymous", "created_at")
-    ordering = ("created_at",)
\ No newline at end of file
+    ordering = ("created_at",)
+
+# ------------------------------
+# Telemetría de llamadas a la IA (solo lectura)
+# ------------------------------
+@admin.register(LLMCall)
+class LLMCallAdmin(admin.ModelAdmin):
+    list_display = ("created_at", "enterprise", "trigger", "outcome", "prompt_tokens", "output_tokens", "latency_ms")
+    list_filter = ("outcome", "trigger", "model_name", "created_at")
+    search_fields = ("enterprise__name", "error")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
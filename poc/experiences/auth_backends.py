@@ -0,0 +1,47 @@
+# ============================================
+# poc/experiences/auth_backends.py
+# Backend de autenticación con el usuario cacheado
+# --------------------------------------------
+# - AuthenticationMiddleware llama a get_user(user_id) en cada petición con
+#   sesión: ModelBackend hace un SELECT a auth_user cada vez. Aquí el
+#   usuario se guarda en la caché (USER_CACHE["timeout"]).
+# - Invalidación: señales post_save/post_delete de User (cambio de clave,
+#   perfil, is_staff...) y user_logged_out (ver signals.py).
+# - Los cambios hechos con QuerySet.update() no disparan señales: llamar a
+#   forget_user(pk) después, o esperar a que venza el timeout.
+# ============================================
+
+from __future__ import annotations
+from typing import Any, Dict
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {"timeout": 600}
+    cfg.update(getattr(settings, "USER_CACHE", {}))
+    return cfg
+
+
+def user_cache_key(user_id) -> str:
+    return f"auth:user:{user_id}"
+
+
+def forget_user(user_id) -> None:
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend cuyo get_user lee primero de la caché."""
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, get_config()["timeout"])
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,145 @@
+# ============================================
+# poc/experiences/autocomplete.py
+# Índice de prefijos en memoria para autocompletar empresas
+# --------------------------------------------
+# - Por proceso: lista ordenada de claves normalizadas (minúsculas, sin
+#   tildes) de cada palabra inicial del nombre; búsqueda con bisect.
+# - Ranking por cantidad de reviews; para prefijos de 1-2 caracteres
+#   (los más frecuentes y con más coincidencias) el top-k se precalcula.
+# - Invalidación: las señales de Enterprise incrementan un sello de versión
+#   en la caché compartida; cada proceso reconstruye su índice al ver un
+#   sello distinto. Los conteos de reviews se refrescan por antigüedad (max_age).
+# ============================================
+
+from __future__ import annotations
+import bisect
+import heapq
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .extractive import fold
+from .models import Enterprise
+
+VERSION_KEY = "autocomplete:enterprise-index:version"
+SHORT_PREFIX = 2  # prefijos hasta esta longitud tienen top-k precalculado
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+class Entry(NamedTuple):
+    id: int
+    name: str
+    reviews_count: int
+
+
+class PrefixIndex:
+    """Índice inmutable: se reemplaza entero al reconstruir."""
+
+    def __init__(self, rows: List[Tuple[int, str, int]], top_k: int):
+        self.entries = [Entry(*row) for row in rows]
+        self.top_k = top_k
+        pairs = []
+        for pos, e in enumerate(self.entries):
+            words = normalize(e.name).split()
+            # Cada sufijo que empieza en una palabra: "banco de bogota", "de bogota", "bogota"
+            for i in range(len(words)):
+                pairs.append((" ".join(words[i:]), pos))
+        pairs.sort()
+        self.keys = [k for k, _ in pairs]
+        self.positions = [p for _, p in pairs]
+
+        self.short: Dict[str, List[int]] = {}
+        buckets: Dict[str, set] = {}
+        for key, pos in pairs:
+            for n in range(1, min(SHORT_PREFIX, len(key)) + 1):
+                buckets.setdefault(key[:n], set()).add(pos)
+        for prefix, positions in buckets.items():
+            self.short[prefix] = self._rank(positions, top_k)
+
+    def _rank(self, positions, k: int) -> List[int]:
+        return heapq.nsmallest(
+            k, positions, key=lambda p: (-self.entries[p].reviews_count, self.entries[p].name)
+        )
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Entry]:
+        limit = limit or self.top_k
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX and limit <= self.top_k:
+            return [self.entries[p] for p in self.short.get(prefix, [])[:limit]]
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_right(self.keys, prefix + "\uffff", lo)
+        return [self.entries[p] for p in self._rank(set(self.positions[lo:hi]), limit)]
+
+
+def normalize(text: str) -> str:
+    return " ".join(_NON_ALNUM_RE.split(fold(text))).strip()
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {"limit": 8, "max_age": 300}
+    cfg.update(getattr(settings, "AUTOCOMPLETE", {}))
+    return cfg
+
+
+def _initial_version() -> int:
+    # Aleatorio: si la caché se vacía, el sello nuevo no coincide con el viejo
+    return random.randrange(1, 2**31)
+
+
+def bump_version() -> None:
+    """Invalida los índices de todos los procesos (se llama desde señales)."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, _initial_version(), None)
+
+
+def _current_version() -> int:
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, _initial_version(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def build_index(top_k: int) -> PrefixIndex:
+    rows = (
+        # Los casi duplicados marcados no suben a una empresa en el ranking
+        Enterprise.objects.annotate(n=Count("reviews", filter=Q(reviews__fingerprint__duplicate_of__isnull=True)))
+        .order_by()
+        .values_list("id", "name", "n")
+    )
+    return PrefixIndex(list(rows), top_k)
+
+
+# Estado por proceso: (índice, versión, instante de construcción)
+_state: Tuple[Optional[PrefixIndex], Optional[int], float] = (None, None, 0.0)
+_lock = threading.Lock()
+
+
+def get_index() -> PrefixIndex:
+    global _state
+    cfg = get_config()
+    index, version, built_at = _state
+    current = _current_version()
+    if index is not None and version == current and time.monotonic() - built_at < cfg["max_age"]:
+        return index
+    with _lock:
+        index, version, built_at = _state
+        if index is None or version != current or time.monotonic() - built_at >= cfg["max_age"]:
+            index = build_index(cfg["limit"])
+            _state = (index, current, time.monotonic())
+        return index
+
+
+def search(query: str, limit: Optional[int] = None) -> List[Entry]:
+    return get_index().search(query, limit)
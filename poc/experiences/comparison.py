@@ -0,0 +1,97 @@
+# ============================================
+# poc/experiences/comparison.py
+# Comparación de 2-10 empresas con una cantidad fija de consultas
+# --------------------------------------------
+# - Métricas por empresa en UNA consulta agrupada con agregados
+#   condicionales: conteo, promedio, distribución de estrellas (COUNT
+#   FILTER por estrella), comentarios (Review.comments_count) y última review.
+# - Volumen mensual de los últimos meses en OTRA consulta agrupada por
+#   (empresa, mes); los meses sin reviews se completan con ceros.
+# - Las empresas (nombre y resumen IA) ya vienen de CompareForm.
+#   Total: 3 consultas, sin importar cuántas empresas se elijan.
+# ============================================
+
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Enterprise, Review
+
+MONTHS = 12  # meses de la serie de volumen
+RATINGS = range(1, 6)
+
+
+def month_starts(now: datetime, months: int = MONTHS) -> List[datetime]:
+    """Primer instante de cada uno de los últimos `months` meses (incluido el actual)."""
+    current = timezone.localtime(now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    starts = []
+    year, month = current.year, current.month
+    for _ in range(months):
+        starts.append(current.replace(year=year, month=month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return starts[::-1]
+
+
+def compare(
+    enterprises: Sequence[Enterprise],
+    months: int = MONTHS,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    ids = [e.pk for e in enterprises]
+    starts = month_starts(now or timezone.now(), months)
+    labels = [f"{start:%Y-%m}" for start in starts]
+
+    totals = {
+        row["enterprise_id"]: row
+        for row in Review.objects.filter(enterprise_id__in=ids, fingerprint__duplicate_of__isnull=True).order_by().values("enterprise_id").annotate(
+            reviews=Count("id"),
+            average=Avg("rating"),
+            comments=Sum("comments_count"),
+            commented=Count("id", filter=Q(comments_count__gt=0)),
+            last_review=Max("created_at"),
+            **{f"rating_{r}": Count("id", filter=Q(rating=r)) for r in RATINGS},
+        )
+    }
+
+    monthly: Dict[int, Dict[str, Dict[str, Any]]] = {pk: {} for pk in ids}
+    for row in (
+        Review.objects.filter(enterprise_id__in=ids, created_at__gte=starts[0], fingerprint__duplicate_of__isnull=True)
+        .annotate(month=TruncMonth("created_at")).order_by()
+        .values("enterprise_id", "month").annotate(reviews=Count("id"), average=Avg("rating"))
+    ):
+        monthly[row["enterprise_id"]][f"{row['month']:%Y-%m}"] = row
+
+    results = []
+    for e in enterprises:
+        row = totals.get(e.pk, {})
+        reviews = row.get("reviews", 0)
+        comments = row.get("comments") or 0
+        results.append({
+            "id": e.pk,
+            "name": e.name,
+            "reviews_count": reviews,
+            "average_rating": round(row.get("average") or 0, 2),
+            "distribution": {str(r): row.get(f"rating_{r}", 0) for r in RATINGS},
+            "comments_count": comments,
+            "comments_per_review": round(comments / reviews, 2) if reviews else 0,
+            "commented_share": round(row.get("commented", 0) / reviews, 2) if reviews else 0,
+            "last_review_at": row.get("last_review"),
+            "monthly": [
+                {
+                    "month": label,
+                    "reviews": monthly[e.pk].get(label, {}).get("reviews", 0),
+                    "average_rating": round(monthly[e.pk].get(label, {}).get("average") or 0, 2),
+                }
+                for label in labels
+            ],
+            "summary": {
+                "text": e.AI_summary,
+                "status": e.summary_status,
+                "generated_at": e.summary_generated_at,
+            },
+        })
+    return {"months": labels, "enterprises": results}
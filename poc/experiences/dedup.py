@@ -0,0 +1,312 @@
+# ============================================
+# poc/experiences/dedup.py
+# Detección de reviews casi duplicadas (MinHash + LSH)
+# --------------------------------------------
+# - Firma MinHash de los n-gramas de palabras del cuerpo de la review.
+# - La firma se parte en bandas; cada banda se guarda como una cubeta
+#   (LSHBucket) indexada. Buscar duplicados = buscar reviews que compartan
+#   alguna cubeta (lookup por índice) y comparar solo esas firmas.
+# - Umbrales por empresa y por autor (settings.REVIEW_DEDUP) deciden si
+#   la review se acepta, se marca o se rechaza.
+# ============================================
+
+from __future__ import annotations
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .extractive import fold
+from .models import LSHBucket, Review, ReviewFingerprint
+
+# Primo de Mersenne 2^31 - 1: (a * x + b) cabe en uint64 sin desbordar
+_PRIME = np.uint64((1 << 31) - 1)
+
+ACTION_OK = "ok"
+ACTION_FLAG = "flag"
+ACTION_REJECT = "reject"
+_SEVERITY = {ACTION_OK: 0, ACTION_FLAG: 1, ACTION_REJECT: 2}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {
+        "num_perm": 128,
+        "bands": 32,
+        "shingle_size": 3,
+        "min_words": 8,
+        "enterprise": {"flag": 0.7, "reject": 0.9},
+        "author": {"flag": 0.6, "reject": 0.8},
+    }
+    cfg.update(getattr(settings, "REVIEW_DEDUP", {}))
+    return cfg
+
+
+@lru_cache(maxsize=4)
+def _permutations(num_perm: int) -> tuple[np.ndarray, np.ndarray]:
+    """Coeficientes (a, b) fijos: las firmas deben ser comparables entre procesos."""
+    rng = np.random.default_rng(20250911)
+    a = rng.integers(1, int(_PRIME), size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, int(_PRIME), size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def words(text: str) -> List[str]:
+    return _WORD_RE.findall(fold(text or ""))
+
+
+def shingles(text: str, size: int = 3) -> set:
+    tokens = words(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def minhash(text: str, num_perm: int = 128, shingle_size: int = 3) -> Optional[np.ndarray]:
+    """Firma MinHash (int32[num_perm]) o None si el texto no tiene palabras."""
+    sh = shingles(text, shingle_size)
+    if not sh:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) & 0x7FFFFFFF for s in sh), dtype=np.uint64, count=len(sh))
+    a, b = _permutations(num_perm)
+    hashed = (a[:, None] * x[None, :] + b[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.int32)
+
+
+def band_keys(signature: np.ndarray, bands: int) -> List[int]:
+    """Una clave int64 por banda (incluye el número de banda en el hash)."""
+    rows = len(signature) // bands
+    keys = []
+    for i in range(bands):
+        chunk = signature[i * rows:(i + 1) * rows].tobytes()
+        digest = hashlib.blake2b(bytes([i]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Jaccard estimado: fracción de posiciones iguales de las firmas."""
+    return float(np.mean(sig_a == sig_b))
+
+
+def decode(raw: bytes) -> np.ndarray:
+    return np.frombuffer(bytes(raw), dtype=np.int32)
+
+
+# ============================================================
+# Consulta y veredicto
+# ============================================================
+
+@dataclass
+class Verdict:
+    action: str = ACTION_OK
+    match_id: Optional[int] = None
+    similarity: float = 0.0
+    scope: str = ""
+
+    @property
+    def rejected(self) -> bool:
+        return self.action == ACTION_REJECT
+
+    @property
+    def flagged(self) -> bool:
+        return self.action == ACTION_FLAG
+
+
+def find_candidates(
+    signature: np.ndarray,
+    exclude_review_id: Optional[int] = None,
+    bands: int = 32,
+    created_at: Optional[datetime] = None,
+):
+    """
+    Reviews que comparten al menos una cubeta LSH con la firma (una sola consulta
+    por índice), con su similitud estimada, de mayor a menor.
+    Al reindexar una review existente (`exclude_review_id`, `created_at`) solo
+    cuentan las anteriores a ella y nunca sus propias copias: el original no
+    puede quedar marcado como duplicado de una review posterior.
+    """
+    qs = (
+        ReviewFingerprint.objects
+        .filter(review__lsh_buckets__key__in=band_keys(signature, bands))
+        .values_list("review_id", "review__enterprise_id", "review__author_id", "signature")
+        .distinct()
+    )
+    if exclude_review_id is not None:
+        qs = qs.exclude(review_id=exclude_review_id).exclude(duplicate_of_id=exclude_review_id)
+        if created_at is not None:
+            qs = qs.filter(
+                Q(review__created_at__lt=created_at)
+                | Q(review__created_at=created_at, review_id__lt=exclude_review_id)
+            )
+    matches = [
+        (review_id, enterprise_id, author_id, similarity(signature, decode(raw)))
+        for review_id, enterprise_id, author_id, raw in qs
+    ]
+    matches.sort(key=lambda m: m[3], reverse=True)
+    return matches
+
+
+def _action(score: float, thresholds: Dict[str, float]) -> str:
+    if score >= thresholds["reject"]:
+        return ACTION_REJECT
+    if score >= thresholds["flag"]:
+        return ACTION_FLAG
+    return ACTION_OK
+
+
+def decide(candidates, enterprise_id: int, author_id: Optional[int], cfg: Dict[str, Any]) -> Verdict:
+    """
+    Veredicto más severo entre candidatos (review_id, enterprise_id, author_id, similitud)
+    de la misma empresa o del mismo autor.
+    """
+    verdict = Verdict()
+    for review_id, ent_id, auth_id, score in candidates:
+        scopes = []
+        if ent_id == enterprise_id:
+            scopes.append("enterprise")
+        if author_id is not None and auth_id == author_id:
+            scopes.append("author")
+        for scope in scopes:
+            action = _action(score, cfg[scope])
+            if (_SEVERITY[action], score) > (_SEVERITY[verdict.action], verdict.similarity):
+                verdict = Verdict(action, review_id, score, scope)
+    return verdict
+
+
+def evaluate(
+    signature: Optional[np.ndarray],
+    enterprise_id: int,
+    author_id: Optional[int],
+    exclude_review_id: Optional[int] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+    created_at: Optional[datetime] = None,
+) -> Verdict:
+    """Busca candidatos en el índice LSH persistido y decide."""
+    cfg = cfg or get_config()
+    if signature is None:
+        return Verdict()
+    candidates = find_candidates(signature, exclude_review_id, cfg["bands"], created_at)
+    return decide(candidates, enterprise_id, author_id, cfg)
+
+
+def check_text(
+    body: str,
+    enterprise_id: int,
+    author_id: Optional[int],
+    exclude_review_id: Optional[int] = None,
+    created_at: Optional[datetime] = None,
+) -> Verdict:
+    """Chequeo en escritura, antes de guardar (usado por las vistas)."""
+    cfg = get_config()
+    if len(words(body)) < cfg["min_words"]:
+        return Verdict()
+    signature = minhash(body, cfg["num_perm"], cfg["shingle_size"])
+    return evaluate(signature, enterprise_id, author_id, exclude_review_id, cfg, created_at)
+
+
+# ============================================================
+# Indexación
+# ============================================================
+
+def index_review(review: Review) -> Verdict:
+    """
+    (Re)calcula la firma y las cubetas de la review y guarda el marcado
+    de duplicado si corresponde. Se llama desde la señal post_save.
+    """
+    cfg = get_config()
+    signature = minhash(review.body, cfg["num_perm"], cfg["shingle_size"])
+    verdict = Verdict()
+    if signature is not None and len(words(review.body)) >= cfg["min_words"]:
+        verdict = evaluate(signature, review.enterprise_id, review.author_id, review.pk, cfg, review.created_at)
+
+    with transaction.atomic():
+        LSHBucket.objects.filter(review_id=review.pk).delete()
+        if signature is None:
+            ReviewFingerprint.objects.filter(review_id=review.pk).delete()
+            return verdict
+        flagged = verdict.action != ACTION_OK
+        ReviewFingerprint.objects.update_or_create(
+            review_id=review.pk,
+            defaults={
+                "signature": signature.tobytes(),
+                "duplicate_of_id": verdict.match_id if flagged else None,
+                "similarity": verdict.similarity if flagged else None,
+            },
+        )
+        LSHBucket.objects.bulk_create(
+            [LSHBucket(key=k, review_id=review.pk) for k in band_keys(signature, cfg["bands"])]
+        )
+    return verdict
+
+
+def bulk_index(
+    signatures: Dict[int, np.ndarray],
+    verdicts: Optional[Dict[int, Verdict]] = None,
+    cfg: Optional[Dict[str, Any]] = None,
+    scanned: Iterable[int] = (),
+) -> Set[int]:
+    """
+    Reemplaza en lote firmas, cubetas y marcas de duplicado de las reviews dadas
+    ({review_id: firma}). Usado por el comando dedupe_reviews.
+    Las reviews de `scanned` sin firma (texto vacío) pierden la suya, y se omiten
+    las que se borraron mientras tanto. Devuelve las reviews cuya marca cambió.
+    """
+    cfg = cfg or get_config()
+    verdicts = verdicts or {}
+    ids = list(set(scanned) | set(signatures))
+    with transaction.atomic():
+        before = dict(
+            ReviewFingerprint.objects.filter(review_id__in=ids, duplicate_of__isnull=False)
+            .values_list("review_id", "duplicate_of_id")
+        )
+        LSHBucket.objects.filter(review_id__in=ids).delete()
+        ReviewFingerprint.objects.filter(review_id__in=ids).delete()
+        referenced = set(signatures) | {v.match_id for v in verdicts.values() if v.match_id is not None}
+        alive = set(Review.objects.filter(pk__in=referenced).values_list("pk", flat=True))
+
+        fingerprints, after = [], {}
+        for pk, sig in signatures.items():
+            if pk not in alive:
+                continue
+            v = verdicts.get(pk)
+            flagged = v is not None and v.action != ACTION_OK and v.match_id in alive
+            if flagged:
+                after[pk] = v.match_id
+            fingerprints.append(ReviewFingerprint(
+                review_id=pk,
+                signature=sig.tobytes(),
+                duplicate_of_id=v.match_id if flagged else None,
+                similarity=v.similarity if flagged else None,
+            ))
+        ReviewFingerprint.objects.bulk_create(fingerprints, batch_size=500)
+        LSHBucket.objects.bulk_create(
+            [LSHBucket(key=k, review_id=pk)
+             for pk, sig in signatures.items() if pk in alive for k in band_keys(sig, cfg["bands"])],
+            batch_size=1000,
+        )
+    return {pk for pk in before.keys() | after.keys() if before.get(pk) != after.get(pk)}
+
+
+def purge_orphans() -> int:
+    """
+    Borra firmas y cubetas cuya review ya no existe (borrados con SQL directo
+    o cargas sin integridad referencial; el ORM las borra en cascada).
+    """
+    alive = Review.objects.values("pk")
+    with transaction.atomic():
+        buckets, _ = LSHBucket.objects.exclude(review_id__in=alive).delete()
+        fingerprints, _ = ReviewFingerprint.objects.exclude(review_id__in=alive).delete()
+        ReviewFingerprint.objects.filter(duplicate_of__isnull=False).exclude(duplicate_of_id__in=alive).update(
+            duplicate_of=None, similarity=None
+        )
+    return buckets + fingerprints
@@ -0,0 +1,273 @@
+# ============================================
+# poc/experiences/extractive.py
+# Pre-resumen extractivo local (TF-IDF + MMR)
+# --------------------------------------------
+# - Divide las reviews en oraciones y las agrupa por banda de rating.
+# - Preselecciona como mucho MAX_CANDIDATES oraciones por banda (puntaje
+#   barato por frecuencia documental) para acotar la memoria.
+# - Puntúa cada oración por cercanía al centroide TF-IDF de su banda
+#   (qué tan representativa es) con operaciones vectorizadas de NumPy.
+# - Selecciona con MMR (Maximal Marginal Relevance) para evitar
+#   oraciones redundantes, respetando un presupuesto de tokens.
+# No depende de Django: se usa desde services.py y desde benchmarks/.
+# ============================================
+
+from __future__ import annotations
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Bandas de rating: (clave, etiqueta, ratings incluidos)
+BANDS: Tuple[Tuple[str, str, Tuple[int, ...]], ...] = (
+    ("positive", "Reseñas positivas (4-5⭐)", (4, 5)),
+    ("neutral", "Reseñas intermedias (3⭐)", (3,)),
+    ("negative", "Reseñas negativas (1-2⭐)", (1, 2)),
+)
+
+# Mínimo del presupuesto que recibe cada banda no vacía (las opiniones
+# minoritarias también deben llegar al prompt).
+MIN_BAND_SHARE = 0.15
+
+# Máximo de oraciones candidatas por banda que llegan a la matriz TF-IDF
+# (con 4096 términos, ~16 MB por banda en float32).
+MAX_CANDIDATES = 1000
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?¡¿…])\s+|\n+")
+_WORD_RE = re.compile(r"[a-z0-9]{3,}")
+
+STOPWORDS = frozenset("""
+    que con por para los las una uno unos unas del como mas pero sus esta este esto estos estas
+    ese esa eso esos esas hay muy ser son fue era han hemos tiene tienen tenia todo toda todos todas
+    nos les sin sobre entre cuando donde porque tambien desde hasta ante bajo cada otro otra otros
+    otras mismo misma ya asi aqui alli solo algo nada poco mucho mucha muchos muchas bien mal
+    the and for with that this are was
+""".split())
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin tildes (para tokenizar y comparar)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(fold(text)) if w not in STOPWORDS]
+
+
+def split_sentences(text: str, min_words: int = 4) -> List[str]:
+    """Oraciones con al menos `min_words` palabras, sin espacios sobrantes."""
+    out = []
+    for raw in _SENTENCE_RE.split(text or ""):
+        sentence = " ".join(raw.split())
+        if len(sentence.split()) >= min_words:
+            out.append(sentence)
+    return out
+
+
+def estimate_tokens(text: str) -> int:
+    """Aproximación barata (~4 caracteres por token) suficiente para presupuestar."""
+    return len(text) // 4 + 1
+
+
+def tfidf_matrix(token_lists: Sequence[Sequence[str]], max_features: int = 4096) -> np.ndarray:
+    """
+    Matriz TF-IDF densa (n_oraciones x vocabulario), filas normalizadas L2.
+    TF sublineal (1 + log tf) e IDF suavizado, como en la formulación clásica.
+    Los pesos se calculan sobre los pares (fila, columna) no nulos y se
+    escriben una sola vez: la única matriz densa es la que se devuelve.
+    """
+    n = len(token_lists)
+    df = Counter()
+    for tokens in token_lists:
+        df.update(set(tokens))
+    vocab = [w for w, _ in df.most_common(max_features)]
+    if not n or not vocab:
+        return np.zeros((n, 0), dtype=np.float32)
+    index = {w: j for j, w in enumerate(vocab)}
+
+    rows, cols = [], []
+    for i, tokens in enumerate(token_lists):
+        for t in tokens:
+            j = index.get(t)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+    width = len(vocab)
+    keys, tf = np.unique(
+        np.asarray(rows, dtype=np.int64) * width + np.asarray(cols, dtype=np.int64),
+        return_counts=True,
+    )
+    rows_nz, cols_nz = np.divmod(keys, width)
+
+    df_arr = np.fromiter((df[w] for w in vocab), dtype=np.float32, count=width)
+    idf = np.log((1.0 + n) / (1.0 + df_arr)) + 1.0
+    X = np.zeros((n, width), dtype=np.float32)
+    X[rows_nz, cols_nz] = (1.0 + np.log(tf.astype(np.float32))) * idf[cols_nz]
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1.0, norms)
+    return X
+
+
+def shortlist(token_lists: Sequence[Sequence[str]], limit: int) -> List[int]:
+    """
+    Índices de las `limit` oraciones más representativas según una
+    aproximación barata (sin matriz): suma de la frecuencia documental de sus
+    términos dentro de la banda, normalizada por la raíz de cuántos tiene.
+    Acota la memoria de tfidf_matrix en empresas con miles de reviews.
+    """
+    if len(token_lists) <= limit:
+        return list(range(len(token_lists)))
+    df = Counter()
+    for tokens in token_lists:
+        df.update(set(tokens))
+    scores = np.fromiter(
+        (sum(df[t] for t in set(tokens)) / (len(set(tokens)) ** 0.5 or 1.0) for tokens in token_lists),
+        dtype=np.float64,
+        count=len(token_lists),
+    )
+    # Orden estable: ante empates se conserva el orden original
+    return sorted(np.argsort(-scores, kind="stable")[:limit].tolist())
+
+
+def mmr_select(
+    X: np.ndarray,
+    costs: np.ndarray,
+    budget: int,
+    mmr_lambda: float = 0.7,
+) -> List[int]:
+    """
+    Selección MMR: en cada paso toma la oración que maximiza
+        λ·relevancia − (1−λ)·similitud máxima con lo ya elegido
+    mientras quepa en el presupuesto. La relevancia es el coseno con el centroide.
+    """
+    n = X.shape[0]
+    if n == 0 or budget <= 0:
+        return []
+    centroid = X.mean(axis=0)
+    norm = np.linalg.norm(centroid)
+    relevance = X @ (centroid / norm) if norm else np.zeros(n, dtype=np.float32)
+
+    available = np.ones(n, dtype=bool)
+    max_sim = np.zeros(n, dtype=np.float32)
+    selected: List[int] = []
+    while budget > 0 and available.any():
+        scores = mmr_lambda * relevance - (1.0 - mmr_lambda) * max_sim
+        scores[~available] = -np.inf
+        i = int(np.argmax(scores))
+        available[i] = False
+        if costs[i] > budget:
+            continue
+        selected.append(i)
+        budget -= int(costs[i])
+        max_sim = np.maximum(max_sim, X @ X[i])
+        # Casi duplicados de lo elegido ya no aportan nada
+        available &= max_sim < 0.9
+    return selected
+
+
+def _band_of(rating: int) -> str:
+    for key, _, ratings in BANDS:
+        if rating in ratings:
+            return key
+    return "neutral"
+
+
+def _band_sentences(reviews: Iterable[Mapping]) -> Tuple[Dict[str, List[str]], Counter]:
+    """Oraciones únicas por banda y cantidad de reviews por banda."""
+    sentences: Dict[str, List[str]] = {key: [] for key, _, _ in BANDS}
+    seen: Dict[str, set] = {key: set() for key, _, _ in BANDS}
+    counts: Counter = Counter()
+    for r in reviews:
+        band = _band_of(int(r["rating"]))
+        counts[band] += 1
+        for s in split_sentences(r["body"]):
+            key = fold(s)
+            if key not in seen[band]:
+                seen[band].add(key)
+                sentences[band].append(s)
+    return sentences, counts
+
+
+def _allocate(counts: Mapping[str, int], budget: int) -> Dict[str, int]:
+    """Reparte el presupuesto proporcional al volumen, con un mínimo por banda."""
+    active = {k: v for k, v in counts.items() if v}
+    if not active:
+        return {}
+    total = sum(active.values())
+    shares = {k: max(MIN_BAND_SHARE, v / total) for k, v in active.items()}
+    scale = sum(shares.values())
+    return {k: int(budget * s / scale) for k, s in shares.items()}
+
+
+def _select(
+    reviews: Iterable[Mapping], token_budget: int, mmr_lambda: float, max_candidates: int
+) -> Tuple[Dict[str, List[str]], Counter]:
+    sentences, counts = _band_sentences(reviews)
+    picked: Dict[str, List[str]] = {}
+    for band, band_budget in _allocate(counts, token_budget).items():
+        candidates = sentences[band]
+        if not candidates:
+            continue
+        token_lists = [tokenize(s) for s in candidates]
+        keep = shortlist(token_lists, max_candidates)
+        if len(keep) < len(candidates):
+            candidates = [candidates[i] for i in keep]
+            token_lists = [token_lists[i] for i in keep]
+        X = tfidf_matrix(token_lists)
+        costs = np.fromiter((estimate_tokens(s) for s in candidates), dtype=np.int64, count=len(candidates))
+        picked[band] = [candidates[i] for i in mmr_select(X, costs, band_budget, mmr_lambda)]
+    return picked, counts
+
+
+def select_sentences(
+    reviews: Iterable[Mapping],
+    token_budget: int,
+    mmr_lambda: float = 0.7,
+    max_candidates: int = MAX_CANDIDATES,
+) -> Dict[str, List[str]]:
+    """Oraciones más representativas y no redundantes por banda de rating."""
+    return _select(reviews, token_budget, mmr_lambda, max_candidates)[0]
+
+
+def build_extract(
+    reviews: Iterable[Mapping],
+    token_budget: int,
+    mmr_lambda: float = 0.7,
+    max_candidates: int = MAX_CANDIDATES,
+) -> str:
+    """Extracto agrupado por banda, listo para el prompt del LLM."""
+    picked, counts = _select(reviews, token_budget, mmr_lambda, max_candidates)
+    blocks = []
+    for key, label, _ in BANDS:
+        if picked.get(key):
+            lines = "\n".join(f"- {s}" for s in picked[key])
+            n = counts[key]
+            blocks.append(f"{label}, {n} review{'s' if n != 1 else ''}:\n{lines}")
+    return "\n\n".join(blocks)
+
+
+def extractive_summary(reviews: Sequence[Mapping], max_sentences_per_band: int = 3) -> str:
+    """
+    Resumen 100 % local (sin IA generativa): un párrafo con las oraciones
+    más representativas de cada banda. Se usa cuando no hay API key.
+    """
+    reviews = list(reviews)
+    if not reviews:
+        return ""
+    average = sum(int(r["rating"]) for r in reviews) / len(reviews)
+    picked = select_sentences(reviews, token_budget=max_sentences_per_band * 3 * 60)
+    intros = {
+        "positive": "Lo más valorado:",
+        "neutral": "Opiniones intermedias:",
+        "negative": "Aspectos a mejorar:",
+    }
+    parts = [f"Resumen extractivo de {len(reviews)} reviews (promedio {average:.1f}⭐)."]
+    for key, _, _ in BANDS:
+        chosen = picked.get(key, [])[:max_sentences_per_band]
+        if chosen:
+            body = " ".join(s if s[-1] in ".!?…" else s + "." for s in chosen)
+            parts.append(f"{intros[key]} {body}")
+    return " ".join(parts)
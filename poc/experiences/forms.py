@@ -3,8 +3,11 @@
 # Definición de formularios basados en modelos
 # ============================================
 
+from datetime import datetime, time, timedelta
+
 from django import forms
-from .models import Review, Comment
+from django.utils import timezone
+from .models import Enterprise, Review, Comment
 
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
@@ -86,4 +89,103 @@ class CommentForm(forms.ModelForm):
                 "placeholder": "Escribe tu comentario…",
             })
         }
-        labels = {"text": ""}
\ No newline at end of file
+        labels = {"text": ""}
+
+# =======================
+# FILTROS DEL LISTADO DE REVIEWS
+# =======================
+class ReviewFilterForm(forms.Form):
+    """
+    Filtros y orden del listado de una empresa (GET). Cada orden coincide
+    con un índice de Review.Meta.indexes, en el mismo sentido de recorrido.
+    """
+
+    SORTS = {
+        "newest": ("Más recientes", ("-created_at", "-id")),
+        "oldest": ("Más antiguas", ("created_at", "id")),
+        "highest": ("Mejor calificadas", ("-rating", "-created_at", "-id")),
+        "lowest": ("Peor calificadas", ("rating", "created_at", "id")),
+        "comments": ("Más comentadas", ("-comments_count", "-created_at", "-id")),
+    }
+    # Condición siempre cierta por la restricción review_rating_1_to_5: con un rango
+    # de fechas, SQLite preferiría el índice (enterprise, created_at) + B-tree
+    # temporal; así elige el índice del orden (rating IN recorre cada estrella con
+    # su rango de fechas). "comments" con fechas ordena en memoria solo ese rango.
+    SORT_HINTS = {
+        "highest": {"rating__in": [1, 2, 3, 4, 5]},
+        "lowest": {"rating__in": [1, 2, 3, 4, 5]},
+    }
+
+    rating = forms.TypedChoiceField(
+        required=False,
+        coerce=int,
+        empty_value=None,
+        label="Calificación",
+        choices=[("", "Todas")] + [(i, f"{i} ⭐") for i in range(5, 0, -1)],
+        widget=forms.Select(attrs={"class": "form-select form-select-sm"}),
+    )
+    date_from = forms.DateField(
+        required=False,
+        label="Desde",
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control form-control-sm"}),
+    )
+    date_to = forms.DateField(
+        required=False,
+        label="Hasta",
+        widget=forms.DateInput(attrs={"type": "date", "class": "form-control form-control-sm"}),
+    )
+    sort = forms.ChoiceField(
+        required=False,
+        label="Ordenar por",
+        choices=[(key, label) for key, (label, _) in SORTS.items()],
+        widget=forms.Select(attrs={"class": "form-select form-select-sm"}),
+    )
+
+    def clean(self):
+        cleaned = super().clean()
+        start, end = cleaned.get("date_from"), cleaned.get("date_to")
+        if start and end and start > end:
+            raise forms.ValidationError("La fecha inicial no puede ser posterior a la final.")
+        return cleaned
+
+    def apply(self, qs):
+        """Aplica filtros y orden válidos; con datos inválidos, el listado por defecto."""
+        data = self.cleaned_data if self.is_valid() else {}
+        if data.get("rating"):
+            qs = qs.filter(rating=data["rating"])
+        # Rangos sobre la columna (no created_at__date): así el índice sirve para el rango
+        tz = timezone.get_current_timezone()
+        if data.get("date_from"):
+            qs = qs.filter(created_at__gte=datetime.combine(data["date_from"], time.min, tzinfo=tz))
+        if data.get("date_to"):
+            end = data["date_to"] + timedelta(days=1)
+            qs = qs.filter(created_at__lt=datetime.combine(end, time.min, tzinfo=tz))
+        sort = data.get("sort") or "newest"
+        _, ordering = self.SORTS[sort]
+        return qs.filter(**self.SORT_HINTS.get(sort, {})).order_by(*ordering)
+
+# =======================
+# COMPARACIÓN DE EMPRESAS
+# =======================
+class CompareForm(forms.Form):
+    """
+    Empresas a comparar (GET ?ids=1&ids=2...). Al validar se cargan todas
+    con una sola consulta (ModelMultipleChoiceField filtra por pk__in).
+    """
+
+    MIN_ENTERPRISES = 2
+    MAX_ENTERPRISES = 10
+
+    ids = forms.ModelMultipleChoiceField(
+        queryset=Enterprise.objects.order_by("name"),
+        label="Empresas",
+        widget=forms.SelectMultiple(attrs={"class": "form-select", "size": 8}),
+    )
+
+    def clean_ids(self):
+        enterprises = list(self.cleaned_data["ids"])
+        if not self.MIN_ENTERPRISES <= len(enterprises) <= self.MAX_ENTERPRISES:
+            raise forms.ValidationError(
+                f"Elige entre {self.MIN_ENTERPRISES} y {self.MAX_ENTERPRISES} empresas."
+            )
+        return enterprises
@@ -0,0 +1,41 @@
+# ============================================================
+# poc/experiences/management/commands/build_similarity.py
+# Precalcula reviews similares y empresas relacionadas
+# ------------------------------------------------------------
+# Uso (pensado para cron / tarea periódica):
+#     python manage.py build_similarity           # incremental: reviews nuevas
+#     python manage.py build_similarity --full    # recalcula todo
+#     python manage.py build_similarity --full --k 10 --block-size 512
+# ============================================================
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from experiences import similarity
+
+
+class Command(BaseCommand):
+    help = "Calcula los vecinos más similares de cada review y de cada empresa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Recalcula todas las listas de vecinos.")
+        parser.add_argument("--k", type=int, help="Vecinos por review / empresa.")
+        parser.add_argument("--block-size", type=int, help="Filas por bloque del producto matricial.")
+
+    def handle(self, *args, **options):
+        cfg = similarity.get_config()
+        if options["k"]:
+            cfg["k"] = options["k"]
+        if options["block_size"]:
+            cfg["block_size"] = options["block_size"]
+
+        start = time.perf_counter()
+        if options["full"]:
+            stats = similarity.build_full(cfg)
+        else:
+            stats = similarity.build_incremental(cfg)
+        elapsed = time.perf_counter() - start
+
+        summary = ", ".join(f"{key}={value}" for key, value in stats.items())
+        self.stdout.write(self.style.SUCCESS(f"Similitud actualizada en {elapsed:.1f}s ({summary})."))
@@ -0,0 +1,97 @@
+# ============================================================
+# poc/experiences/management/commands/dedupe_reviews.py
+# Detección en lote de reviews casi duplicadas
+# ------------------------------------------------------------
+# Recorre las reviews en orden cronológico con un índice LSH en
+# memoria: cada review solo se compara con las anteriores que
+# comparten alguna cubeta. Reconstruye firmas, cubetas y marcas, y
+# borra las de reviews que ya no existen.
+#
+# Uso:
+#     python manage.py dedupe_reviews --dry-run   # solo reporte
+#     python manage.py dedupe_reviews             # reindexa y marca
+#     python manage.py dedupe_reviews --delete    # además borra las que superan "reject"
+# ============================================================
+
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from experiences import dedup, page_cache, ranking
+from experiences.models import Review
+
+
+class Command(BaseCommand):
+    help = "Reindexa las firmas MinHash de las reviews y marca (o borra) los casi duplicados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="No escribe nada; solo reporta.")
+        parser.add_argument("--delete", action="store_true", help="Borra los duplicados que superan el umbral 'reject'.")
+        parser.add_argument("--enterprise", type=int, help="Limita a una empresa.")
+
+    def handle(self, *args, **options):
+        cfg = dedup.get_config()
+        qs = Review.objects.order_by("created_at", "pk").values_list("pk", "body", "enterprise_id", "author_id")
+        if options["enterprise"]:
+            qs = qs.filter(enterprise_id=options["enterprise"])
+
+        buckets = defaultdict(list)  # clave LSH -> posiciones en `meta`
+        meta, sigs = [], []           # (pk, enterprise_id, author_id), firma
+        signatures, verdicts = {}, {}
+        scanned = {}                  # pk -> enterprise_id (también las que no tienen firma)
+
+        for pk, body, enterprise_id, author_id in qs.iterator(chunk_size=2000):
+            scanned[pk] = enterprise_id
+            sig = dedup.minhash(body, cfg["num_perm"], cfg["shingle_size"])
+            if sig is None:
+                continue
+            keys = dedup.band_keys(sig, cfg["bands"])
+
+            if len(dedup.words(body)) >= cfg["min_words"]:
+                cand = sorted({i for k in keys for i in buckets.get(k, ())})
+                if cand:
+                    scores = (np.stack([sigs[i] for i in cand]) == sig).mean(axis=1)
+                    verdict = dedup.decide(
+                        ((meta[i][0], meta[i][1], meta[i][2], float(s)) for i, s in zip(cand, scores)),
+                        enterprise_id, author_id, cfg,
+                    )
+                    if verdict.action != dedup.ACTION_OK:
+                        verdicts[pk] = verdict
+
+            for k in keys:
+                buckets[k].append(len(meta))
+            meta.append((pk, enterprise_id, author_id))
+            sigs.append(sig)
+            signatures[pk] = sig
+
+        flagged = {pk: v for pk, v in verdicts.items() if v.flagged}
+        rejected = {pk: v for pk, v in verdicts.items() if v.rejected}
+        for pk, v in sorted(verdicts.items()):
+            style = self.style.ERROR if v.rejected else self.style.WARNING
+            self.stdout.write(style(f"  review {pk} ≈ review {v.match_id} ({v.similarity:.0%}, {v.scope}, {v.action})"))
+
+        if not options["dry_run"]:
+            if options["delete"] and rejected:
+                Review.objects.filter(pk__in=rejected).delete()
+                for pk in rejected:
+                    signatures.pop(pk, None)
+                    verdicts.pop(pk, None)
+                # Las marcas que apuntaban a una review borrada pasan a su original
+                for v in verdicts.values():
+                    while v.match_id in rejected:
+                        v.match_id = rejected[v.match_id].match_id
+            changed = dedup.bulk_index(signatures, verdicts, cfg, scanned)
+            purged = 0 if options["enterprise"] else dedup.purge_orphans()
+            # Los casi duplicados no cuentan en promedios ni rankings: recalcular los afectados
+            for enterprise_id in {scanned[pk] for pk in changed if pk in scanned}:
+                page_cache.bump(page_cache.ENTERPRISE, enterprise_id)
+                ranking.refresh_ratings(enterprise_id)
+            if purged:
+                self.stdout.write(f"Firmas y cubetas huérfanas borradas: {purged}.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reviews indexadas: {len(meta)}. Marcadas: {len(flagged)}. "
+            f"Sobre umbral de rechazo: {len(rejected)}"
+            + (" (borradas)." if options["delete"] and not options["dry_run"] else ".")
+        ))
@@ -0,0 +1,53 @@
+# ============================================================
+# poc/experiences/management/commands/llm_stats.py
+# Reporte de telemetría de llamadas a la IA
+# ------------------------------------------------------------
+# Uso:
+#     python manage.py llm_stats --days 7 --top 10
+#     python manage.py llm_stats --json
+# ============================================================
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from experiences.telemetry import aggregate_stats
+
+
+class Command(BaseCommand):
+    help = "Muestra latencia, tokens, costo y regeneraciones de resúmenes IA por empresa."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30, help="Ventana en días (0 = todo el historial).")
+        parser.add_argument("--top", type=int, default=20, help="Máximo de empresas a listar.")
+        parser.add_argument("--json", action="store_true", help="Salida en JSON.")
+
+    def handle(self, *args, **options):
+        stats = aggregate_stats(days=options["days"] or None, top=options["top"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(stats, indent=2, default=str, ensure_ascii=False))
+            return
+
+        t = stats["totals"]
+        window = f"últimos {stats['days']} días" if stats["days"] else "todo el historial"
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Llamadas LLM ({window})"))
+        self.stdout.write(
+            f"  llamadas: {t['calls']}  errores: {t['errors']} ({t['error_rate']:.1%})\n"
+            f"  tokens prompt: {t['prompt_tokens']}  tokens salida: {t['output_tokens']}\n"
+            f"  latencia media: {t['avg_latency_ms']} ms  p50: {t['p50_latency_ms']} ms  p95: {t['p95_latency_ms']} ms\n"
+            f"  costo estimado: ${t['cost_usd']:.4f}"
+        )
+        if not stats["enterprises"]:
+            return
+
+        self.stdout.write("")
+        header = f"{'Empresa':<30} {'Llam.':>6} {'Err.':>5} {'save/del/man':>13} {'Tok. in':>9} {'Tok. out':>9} {'ms avg':>7} {'USD':>9}"
+        self.stdout.write(self.style.MIGRATE_HEADING(header))
+        for row in stats["enterprises"]:
+            triggers = f"{row['on_save']}/{row['on_delete']}/{row['manual']}"
+            self.stdout.write(
+                f"{row['name'][:30]:<30} {row['calls']:>6} {row['errors']:>5} {triggers:>13} "
+                f"{row['prompt_tokens']:>9} {row['output_tokens']:>9} {row['avg_latency_ms']:>7} "
+                f"{row['cost_usd']:>9.4f}"
+            )
@@ -0,0 +1,27 @@
+# ============================================================
+# poc/experiences/management/commands/rebuild_rankings.py
+# Recalcula la tabla de rankings (tendencia / mejor valoradas)
+# ------------------------------------------------------------
+# Las señales la mantienen en cada escritura; este comando solo hace falta
+# tras cambiar settings.RANKING, después de cargas masivas (bulk_create no
+# dispara señales) o para poblarla por primera vez:
+#     python manage.py rebuild_rankings
+# ============================================================
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from experiences import ranking
+
+
+class Command(BaseCommand):
+    help = "Recalcula el promedio bayesiano y la actividad con decaimiento de cada empresa."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        stats = ranking.rebuild()
+        elapsed = time.perf_counter() - start
+
+        summary = ", ".join(f"{key}={value}" for key, value in stats.items())
+        self.stdout.write(self.style.SUCCESS(f"Rankings recalculados en {elapsed:.1f}s ({summary})."))
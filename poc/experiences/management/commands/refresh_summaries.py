@@ -0,0 +1,42 @@
+# ============================================================
+# poc/experiences/management/commands/refresh_summaries.py
+# Reintento masivo de resúmenes de IA
+# ------------------------------------------------------------
+# Uso:
+#     python manage.py refresh_summaries            # solo los stale
+#     python manage.py refresh_summaries --all      # todas las empresas
+#     python manage.py refresh_summaries --enterprise 3 --force
+# ============================================================
+
+from django.core.management.base import BaseCommand
+
+from experiences.models import Enterprise, LLMCall
+from experiences.services import update_enterprise_summary
+
+
+class Command(BaseCommand):
+    help = "Regenera los resúmenes de IA marcados como stale (o todos con --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Incluye empresas con resumen al día.")
+        parser.add_argument("--enterprise", type=int, action="append", help="Id de empresa (repetible).")
+        parser.add_argument("--force", action="store_true", help="Llama a la IA aunque el corpus no haya cambiado.")
+
+    def handle(self, *args, **options):
+        qs = Enterprise.objects.order_by("pk")
+        if options["enterprise"]:
+            qs = qs.filter(pk__in=options["enterprise"])
+        elif not options["all"]:
+            qs = qs.filter(summary_stale=True)
+
+        ok = failed = 0
+        # Se procesa en serie: el objetivo es reintentar sin saturar la API
+        for pk, name in qs.values_list("pk", "name"):
+            if update_enterprise_summary(pk, trigger=LLMCall.TRIGGER_MANUAL, force=options["force"]):
+                ok += 1
+                self.stdout.write(f"  ✓ {name}")
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"  ✗ {name} (sigue stale)"))
+
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes al día: {ok}. Fallidos: {failed}."))
@@ -0,0 +1,57 @@
+# ============================================================
+# poc/experiences/management/commands/warm_cache.py
+# Calienta la caché de páginas (tras un deploy o un vaciado de caché)
+# ------------------------------------------------------------
+# Uso:
+#     python manage.py warm_cache
+#     python manage.py warm_cache --enterprises 50 --reviews-per-enterprise 10 --workers 8 --budget 60
+#     python manage.py warm_cache -v 2    # detalle por página
+# ============================================================
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from experiences import warmup
+from experiences.page_cache import get_config
+
+
+class Command(BaseCommand):
+    help = "Renderiza las páginas más activas para llenar la caché de fragmentos y agregados."
+
+    def add_arguments(self, parser):
+        cfg = get_config()
+        parser.add_argument("--enterprises", type=int, default=cfg["warm_enterprises"],
+                            help="Empresas más activas a calentar.")
+        parser.add_argument("--reviews-per-enterprise", type=int, default=cfg["warm_reviews_per_enterprise"],
+                            help="Reviews más nuevas de cada empresa a calentar.")
+        parser.add_argument("--workers", type=int, default=cfg["warm_workers"],
+                            help="Páginas renderizadas en paralelo.")
+        parser.add_argument("--budget", type=float, default=cfg["warm_budget"],
+                            help="Segundos máximos; al agotarse no se inician más páginas.")
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES["default"]["BACKEND"]
+        if backend.endswith("LocMemCache"):
+            self.stderr.write(self.style.WARNING(
+                "La caché es local a este proceso (LocMemCache): lo calentado no llega al servidor. "
+                "Configura ASKMEJOBS_REDIS_URL para una caché compartida."
+            ))
+
+        targets = warmup.hot_targets(options["enterprises"], options["reviews_per_enterprise"])
+        report = warmup.warm(targets, options["workers"], options["budget"])
+
+        if options["verbosity"] >= 2:
+            for kind, path, ms in report.warmed:
+                self.stdout.write(f"  {kind:<10} {ms:8.1f} ms  {path}")
+        for kind, path, error in report.failed:
+            self.stderr.write(self.style.ERROR(f"  {kind:<10} falló: {path} ({error})"))
+
+        for kind, row in report.by_kind().items():
+            self.stdout.write(
+                f"{kind:<10} {row['pages']:>4} páginas  {row['total_ms']:9.1f} ms  (máx {row['max_ms']:.1f} ms)"
+            )
+        skipped = f", {report.skipped} omitidas por el presupuesto" if report.skipped else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"Caché calentada: {len(report.warmed)} páginas en {report.elapsed:.1f}s "
+            f"({len(report.failed)} con error{skipped})."
+        ))
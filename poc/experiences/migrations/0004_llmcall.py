@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0003_comment_anonymous'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigger', models.CharField(choices=[('save', 'Review guardada'), ('delete', 'Review eliminada'), ('manual', 'Manual')], default='manual', max_length=16)),
+                ('outcome', models.CharField(choices=[('ok', 'OK'), ('empty', 'Respuesta vacía'), ('error', 'Error')], max_length=16)),
+                ('model_name', models.CharField(blank=True, max_length=80)),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('corpus_chars', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('output_tokens', models.PositiveIntegerField(blank=True, null=True)),
+                ('latency_ms', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('enterprise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='llm_calls', to='experiences.enterprise')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['enterprise', 'created_at'], name='experiences_enterpr_ad8dd1_idx')],
+            },
+        ),
+    ]
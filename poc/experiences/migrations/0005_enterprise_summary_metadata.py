@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:00
+
+from django.db import migrations, models
+
+
+FAILED_SUMMARY_TEXT = "No fue posible actualizar el resumen en este momento."
+
+
+def mark_failed_summaries_stale(apps, schema_editor):
+    # Antes se sobrescribía el resumen con un texto de error: esas empresas quedan stale
+    Enterprise = apps.get_model("experiences", "Enterprise")
+    Enterprise.objects.filter(AI_summary=FAILED_SUMMARY_TEXT).update(AI_summary="", summary_stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0004_llmcall'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enterprise',
+            name='summary_corpus_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='enterprise',
+            name='summary_generated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='enterprise',
+            name='summary_stale',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='enterprise',
+            name='summary_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_failed_summaries_stale, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0005_enterprise_summary_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewFingerprint',
+            fields=[
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='experiences.review')),
+                ('signature', models.BinaryField()),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='experiences.review')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='experiences.review')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'review'], name='experiences_key_90835b_idx')],
+            },
+        ),
+    ]
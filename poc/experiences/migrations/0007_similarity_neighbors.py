@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0006_review_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Watermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='EnterpriseNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('enterprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='experiences.enterprise')),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='experiences.enterprise')),
+            ],
+            options={
+                'ordering': ['enterprise', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('enterprise', 'rank'), name='unique_enterprise_neighbor_rank')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReviewNeighbor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('neighbor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='experiences.review')),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='experiences.review')),
+            ],
+            options={
+                'ordering': ['review', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('review', 'rank'), name='unique_review_neighbor_rank')],
+            },
+        ),
+    ]
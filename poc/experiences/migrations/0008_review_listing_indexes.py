@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comments_count(apps, schema_editor):
+    Review = apps.get_model("experiences", "Review")
+    Comment = apps.get_model("experiences", "Comment")
+    counts = (
+        Comment.objects.filter(review=OuterRef("pk"))
+        .order_by().values("review").annotate(n=Count("pk")).values("n")
+    )
+    Review.objects.update(comments_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0007_similarity_neighbors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_comments_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['enterprise', 'created_at'], name='experiences_enterpr_7bd569_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['enterprise', 'rating', 'created_at'], name='experiences_enterpr_acb984_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['enterprise', 'comments_count', 'created_at'], name='experiences_enterpr_f72943_idx'),
+        ),
+    ]
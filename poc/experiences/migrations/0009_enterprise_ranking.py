@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_rankings(apps, schema_editor):
+    # Las señales solo mantienen empresas que ya tienen fila: se llena con
+    # el mismo cálculo que rebuild(), sobre los modelos históricos.
+    from experiences.ranking import compute_rows, get_config
+
+    Review = apps.get_model('experiences', 'Review')
+    Comment = apps.get_model('experiences', 'Comment')
+    EnterpriseRanking = apps.get_model('experiences', 'EnterpriseRanking')
+    rows = compute_rows(Review.objects.all(), Comment.objects.all(), get_config())
+    EnterpriseRanking.objects.bulk_create((EnterpriseRanking(**row) for row in rows), batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0008_review_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnterpriseRanking',
+            fields=[
+                ('enterprise', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='experiences.enterprise')),
+                ('reviews_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('bayes_rating', models.FloatField(default=0)),
+                ('trend_log', models.FloatField()),
+                ('last_activity_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['trend_log'], name='ranking_trend_idx'), models.Index(fields=['bayes_rating', 'reviews_count'], name='ranking_bayes_idx')],
+            },
+        ),
+        migrations.RunPython(populate_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0009_enterprise_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewVector',
+            fields=[
+                ('review', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='experiences.review')),
+                ('columns', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
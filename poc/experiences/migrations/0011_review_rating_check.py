@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def clamp_ratings(apps, schema_editor):
+    # Filas previas a la restricción (cargas directas): se llevan al rango 1..5
+    Review = apps.get_model('experiences', 'Review')
+    Review.objects.filter(rating__lt=1).update(rating=1)
+    Review.objects.filter(rating__gt=5).update(rating=5)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('experiences', '0010_review_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(clamp_ratings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.CheckConstraint(condition=models.Q(('rating__gte', 1), ('rating__lte', 5)), name='review_rating_1_to_5'),
+        ),
+    ]
@@ -1,5 +1,16 @@
 from .enterprise import Enterprise
 from .review import Review
 from .comment import Comment
+from .llm_call import LLMCall
+from .review_fingerprint import ReviewFingerprint
+from .lsh_bucket import LSHBucket
+from .watermark import Watermark
+from .review_neighbor import ReviewNeighbor
+from .review_vector import ReviewVector
+from .enterprise_neighbor import EnterpriseNeighbor
+from .enterprise_ranking import EnterpriseRanking
 
-__all__ = ["Enterprise", "Review", "Comment"]
+__all__ = [
+    "Enterprise", "Review", "Comment", "LLMCall", "ReviewFingerprint", "LSHBucket",
+    "Watermark", "ReviewNeighbor", "ReviewVector", "EnterpriseNeighbor", "EnterpriseRanking",
+]
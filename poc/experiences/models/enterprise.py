@@ -4,17 +4,29 @@ from django.db.models import Avg
 class Enterprise(models.Model):
     name = models.CharField(max_length=255, unique=True, db_index=True)
     AI_summary  = models.TextField(blank=True)
+    # Metadatos del último resumen válido (stale-while-revalidate)
+    summary_version = models.PositiveIntegerField(default=0)
+    summary_generated_at = models.DateTimeField(null=True, blank=True)
+    summary_corpus_hash = models.CharField(max_length=64, blank=True)
+    summary_stale = models.BooleanField(default=False, db_index=True)
 
     def __str__(self):
         return self.name
 
     @property
     def reviews_count(self):
-        """Devuelve el número real de reviews asociadas a esta empresa."""
-        return self.reviews.count()
+        """Devuelve el número real de reviews asociadas a esta empresa (sin casi duplicados)."""
+        return self.reviews.filter(fingerprint__duplicate_of__isnull=True).count()
 
     @property
     def average_rating(self):
-        """Devuelve el promedio de estrellas de todas las calificaciones."""
-        result = self.reviews.aggregate(avg=Avg("rating"))
+        """Devuelve el promedio de estrellas de todas las calificaciones (sin casi duplicados)."""
+        result = self.reviews.filter(fingerprint__duplicate_of__isnull=True).aggregate(avg=Avg("rating"))
         return result["avg"] or 0
+
+    @property
+    def summary_status(self):
+        """Estado del resumen: 'empty', 'stale' (pendiente de refrescar) o 'fresh'."""
+        if self.summary_stale:
+            return "stale"
+        return "fresh" if self.AI_summary else "empty"
@@ -0,0 +1,24 @@
+# experiences/models/enterprise_neighbor.py
+from django.db import models
+
+
+class EnterpriseNeighbor(models.Model):
+    """Empresa con opiniones similares (coseno entre centroides de sus reviews)."""
+
+    enterprise = models.ForeignKey(
+        "experiences.Enterprise", on_delete=models.CASCADE, related_name="neighbors"
+    )
+    neighbor = models.ForeignKey(
+        "experiences.Enterprise", on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["enterprise", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["enterprise", "rank"], name="unique_enterprise_neighbor_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.enterprise_id} ~ {self.neighbor_id} ({self.score:.2f})"
@@ -0,0 +1,31 @@
+# experiences/models/enterprise_ranking.py
+from django.db import models
+
+
+class EnterpriseRanking(models.Model):
+    """
+    Puntajes materializados de una empresa (ver experiences/ranking.py).
+    - bayes_rating: promedio bayesiano de estrellas (prior en settings.RANKING).
+    - trend_log: log de la actividad con decaimiento exponencial referida a una
+      época fija; ordenar por este campo equivale a ordenar por la actividad actual.
+    """
+
+    enterprise = models.OneToOneField(
+        "experiences.Enterprise", on_delete=models.CASCADE, primary_key=True, related_name="ranking"
+    )
+    reviews_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    bayes_rating = models.FloatField(default=0)
+    trend_log = models.FloatField()
+    last_activity_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Cada listado se lee recorriendo su índice hacia atrás con LIMIT
+        indexes = [
+            models.Index(fields=["trend_log"], name="ranking_trend_idx"),
+            models.Index(fields=["bayes_rating", "reviews_count"], name="ranking_bayes_idx"),
+        ]
+
+    def __str__(self):
+        return f"Ranking {self.enterprise_id} ({self.bayes_rating:.2f})"
@@ -0,0 +1,62 @@
+# experiences/models/llm_call.py
+from django.db import models
+from django.conf import settings
+
+
+class LLMCall(models.Model):
+    """Registro de cada llamada al modelo de IA (telemetría de resúmenes)."""
+
+    TRIGGER_SAVE = "save"
+    TRIGGER_DELETE = "delete"
+    TRIGGER_MANUAL = "manual"
+    TRIGGER_CHOICES = [
+        (TRIGGER_SAVE, "Review guardada"),
+        (TRIGGER_DELETE, "Review eliminada"),
+        (TRIGGER_MANUAL, "Manual"),
+    ]
+
+    OUTCOME_OK = "ok"
+    OUTCOME_EMPTY = "empty"
+    OUTCOME_ERROR = "error"
+    OUTCOME_CHOICES = [
+        (OUTCOME_OK, "OK"),
+        (OUTCOME_EMPTY, "Respuesta vacía"),
+        (OUTCOME_ERROR, "Error"),
+    ]
+
+    enterprise = models.ForeignKey(
+        "experiences.Enterprise",
+        null=True, blank=True,
+        on_delete=models.SET_NULL,  # el historial de costos sobrevive a la empresa
+        related_name="llm_calls",
+    )
+    trigger = models.CharField(max_length=16, choices=TRIGGER_CHOICES, default=TRIGGER_MANUAL)
+    outcome = models.CharField(max_length=16, choices=OUTCOME_CHOICES)
+    model_name = models.CharField(max_length=80, blank=True)
+    reviews_count = models.PositiveIntegerField(default=0)
+    corpus_chars = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(null=True, blank=True)
+    output_tokens = models.PositiveIntegerField(null=True, blank=True)
+    latency_ms = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["enterprise", "created_at"])]
+
+    def __str__(self):
+        return f"LLMCall {self.outcome} ({self.trigger}) enterprise={self.enterprise_id}"
+
+    @property
+    def cost_usd(self):
+        """Costo estimado según GENAI_PRICING (USD por millón de tokens)."""
+        return estimate_cost(self.prompt_tokens or 0, self.output_tokens or 0)
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int) -> float:
+    pricing = getattr(settings, "GENAI_PRICING", {})
+    return (
+        prompt_tokens * pricing.get("input_per_million", 0)
+        + output_tokens * pricing.get("output_per_million", 0)
+    ) / 1_000_000
@@ -0,0 +1,23 @@
+# experiences/models/lsh_bucket.py
+from django.db import models
+
+
+class LSHBucket(models.Model):
+    """
+    Cubeta LSH: hash de una banda de la firma MinHash de una review.
+    Dos reviews que comparten alguna cubeta son candidatas a casi duplicado,
+    así una búsqueda es un lookup por índice y no un recorrido de todas las reviews.
+    """
+
+    key = models.BigIntegerField()
+    review = models.ForeignKey(
+        "experiences.Review",
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["key", "review"])]
+
+    def __str__(self):
+        return f"LSHBucket {self.key} -> review {self.review_id}"
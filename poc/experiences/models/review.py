@@ -14,9 +14,24 @@ class Review(models.Model):
     rating = models.PositiveSmallIntegerField(default=5)  # 1 a 5 estrellas
     anonymous = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Desnormalizado: lo mantienen las señales de Comment (ordenar por "más comentadas")
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        # Un índice por orden del listado de la empresa (ver ReviewFilterForm):
+        # el plan recorre el índice en orden y nunca arma un B-tree temporal
+        indexes = [
+            models.Index(fields=["enterprise", "created_at"]),
+            models.Index(fields=["enterprise", "rating", "created_at"]),
+            models.Index(fields=["enterprise", "comments_count", "created_at"]),
+        ]
+        constraints = [
+            # Con la restricción, "rating IN (1..5)" es siempre cierto (ver ReviewFilterForm)
+            models.CheckConstraint(
+                condition=models.Q(rating__gte=1, rating__lte=5), name="review_rating_1_to_5"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.enterprise.name} - {self.title} ({self.rating}⭐)"
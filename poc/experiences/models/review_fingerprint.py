@@ -0,0 +1,30 @@
+# experiences/models/review_fingerprint.py
+from django.db import models
+
+
+class ReviewFingerprint(models.Model):
+    """Firma MinHash del cuerpo de una review (detección de casi duplicados)."""
+
+    review = models.OneToOneField(
+        "experiences.Review",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="fingerprint",
+    )
+    signature = models.BinaryField()
+    # Review anterior más parecida cuando superó el umbral de marcado
+    duplicate_of = models.ForeignKey(
+        "experiences.Review",
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    similarity = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Fingerprint review {self.review_id}"
+
+    @property
+    def is_flagged(self):
+        return self.duplicate_of_id is not None
@@ -0,0 +1,24 @@
+# experiences/models/review_neighbor.py
+from django.db import models
+
+
+class ReviewNeighbor(models.Model):
+    """Vecino precalculado de una review (similitud coseno de su texto)."""
+
+    review = models.ForeignKey(
+        "experiences.Review", on_delete=models.CASCADE, related_name="neighbors"
+    )
+    neighbor = models.ForeignKey(
+        "experiences.Review", on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["review", "rank"]
+        constraints = [
+            models.UniqueConstraint(fields=["review", "rank"], name="unique_review_neighbor_rank"),
+        ]
+
+    def __str__(self):
+        return f"Review {self.review_id} ~ {self.neighbor_id} ({self.score:.2f})"
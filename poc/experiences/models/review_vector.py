@@ -0,0 +1,23 @@
+# experiences/models/review_vector.py
+from django.db import models
+
+
+class ReviewVector(models.Model):
+    """
+    Vector disperso (feature hashing) del título + cuerpo de una review, con TF
+    sublineal y sin IDF (el IDF depende del corpus y se aplica al cargar).
+    Sin fila = review nueva o editada: build_similarity la vectoriza.
+    """
+
+    review = models.OneToOneField(
+        "experiences.Review",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="vector",
+    )
+    columns = models.BinaryField()  # int32
+    weights = models.BinaryField()  # float32
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Vector review {self.review_id}"
@@ -0,0 +1,28 @@
+# experiences/models/watermark.py
+from django.db import models
+
+
+class Watermark(models.Model):
+    """
+    Valor entero persistido de un trabajo por lotes, identificado por `name`.
+    Según el nombre es una de dos cosas (documentar cada nombre nuevo aquí):
+    - Marca de agua: último id procesado (p. ej. para continuar desde ahí).
+    - Sello de parámetros: configuración con la que se calcularon datos
+      guardados; si no coincide con la actual, hay que recalcularlos.
+      "similarity.n_features": dimensión de los ReviewVector (similarity.py).
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}={self.value}"
+
+    @classmethod
+    def get(cls, name: str) -> int:
+        return cls.objects.filter(name=name).values_list("value", flat=True).first() or 0
+
+    @classmethod
+    def set(cls, name: str, value: int) -> None:
+        cls.objects.update_or_create(name=name, defaults={"value": value})
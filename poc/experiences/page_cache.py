@@ -0,0 +1,103 @@
+# ============================================
+# poc/experiences/page_cache.py
+# Fragmentos y agregados de páginas en caché, con sellos de versión
+# --------------------------------------------
+# - Cada empresa y cada review tienen un sello de versión en la caché;
+#   las señales lo incrementan en cada escritura que cambia lo que se muestra.
+#   Las claves de fragmentos y agregados llevan el sello: no hay que borrar
+#   nada, las entradas viejas dejan de leerse y expiran solas.
+# - enterprise_stats(): conteo y promedio de estrellas por empresa (índice y
+#   página de la empresa) con un get_many; las faltantes salen de una sola
+#   consulta agrupada.
+# - Los templates usan {% cache %} con el sello como parte de la clave
+#   (listado de reviews de la empresa, comentarios de una review).
+# - warmup.py renderiza las páginas más activas para llenar esta caché.
+# ============================================
+
+from __future__ import annotations
+import random
+from typing import Any, Dict, Iterable, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg, Count
+
+from .models import Review
+
+ENTERPRISE = "enterprise"
+REVIEW = "review"
+
+
+class Stats(NamedTuple):
+    reviews_count: int
+    average_rating: float
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {
+        "timeout": 3600,
+        "warm_enterprises": 20,
+        "warm_reviews_per_enterprise": 5,
+        "warm_workers": 4,
+        "warm_budget": 30,
+    }
+    cfg.update(getattr(settings, "PAGE_CACHE", {}))
+    return cfg
+
+
+def _version_key(scope: str, pk) -> str:
+    return f"pagecache:{scope}:{pk}:v"
+
+
+def _initial_version() -> int:
+    # Aleatorio: si la caché pierde el sello, el nuevo no coincide con el viejo
+    return random.randrange(1, 2**31)
+
+
+def bump(scope: str, pk) -> None:
+    """Invalida los fragmentos y agregados de una empresa o review (señales)."""
+    try:
+        cache.incr(_version_key(scope, pk))
+    except ValueError:
+        cache.set(_version_key(scope, pk), _initial_version(), None)
+
+
+def versions(scope: str, pks: Iterable) -> Dict[Any, int]:
+    keys = {_version_key(scope, pk): pk for pk in pks}
+    found = cache.get_many(list(keys))
+    for key in keys.keys() - found.keys():
+        # add: si otro proceso se adelantó, se respeta su sello
+        cache.add(key, _initial_version(), None)
+        found[key] = cache.get(key)
+    return {pk: found[key] for key, pk in keys.items()}
+
+
+def version(scope: str, pk) -> int:
+    return versions(scope, [pk])[pk]
+
+
+def enterprise_stats(pks: Iterable[int]) -> Dict[int, Stats]:
+    """
+    Conteo de reviews y promedio de estrellas por empresa (con caché por
+    versión). Los casi duplicados marcados no cuentan.
+    """
+    current = versions(ENTERPRISE, pks)
+    keys = {f"pagecache:stats:{pk}:{v}": pk for pk, v in current.items()}
+    found = cache.get_many(list(keys))
+    stats = {keys[key]: Stats(*value) for key, value in found.items()}
+
+    missing = [pk for key, pk in keys.items() if key not in found]
+    if missing:
+        computed = {pk: Stats(0, 0) for pk in missing}
+        for pk, n, avg in (
+            Review.objects.filter(enterprise_id__in=missing, fingerprint__duplicate_of__isnull=True)
+            .order_by().values("enterprise_id")
+            .annotate(n=Count("id"), avg=Avg("rating")).values_list("enterprise_id", "n", "avg")
+        ):
+            computed[pk] = Stats(n, avg or 0)
+        cache.set_many(
+            {f"pagecache:stats:{pk}:{current[pk]}": tuple(s) for pk, s in computed.items()},
+            get_config()["timeout"],
+        )
+        stats.update(computed)
+    return stats
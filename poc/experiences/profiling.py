@@ -0,0 +1,191 @@
+# ============================================
+# poc/experiences/profiling.py
+# Perfilado bajo demanda de una petición (solo staff)
+# --------------------------------------------
+# - Se activa con ?_profile=1 o la cabecera "X-Profile: 1", y solo si el
+#   usuario es staff. Sin ese disparador el middleware no hace nada más
+#   que mirar la query string y las cabeceras (sin costo extra).
+# - Ejecuta la vista bajo cProfile y guarda el .prof (snakeviz, pstats...).
+# - Junto al .prof guarda un .json con: duración, SQL con su origen en el
+#   código del proyecto y tiempos de render de cada template.
+# - El envoltorio de Template.render se instala recién en la primera
+#   captura y solo mide si hay una captura activa (ContextVar).
+# ============================================
+
+from __future__ import annotations
+import cProfile
+import json
+import re
+import time
+import traceback
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection
+
+QUERY_PARAM = "_profile"
+HEADER = "X-Profile"
+
+_NAME_RE = re.compile(r"^[\w.-]+$")
+_capture: ContextVar[Optional["Capture"]] = ContextVar("profiling_capture", default=None)
+_template_hook_installed = False
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {"dir": Path(settings.BASE_DIR) / "profiles", "keep": 50, "stack_depth": 4}
+    cfg.update(getattr(settings, "PROFILING", {}))
+    cfg["dir"] = Path(cfg["dir"])
+    return cfg
+
+
+class Capture:
+    """Datos recolectados durante una petición perfilada."""
+
+    def __init__(self, stack_depth: int):
+        self.stack_depth = stack_depth
+        self.queries: List[Dict[str, Any]] = []
+        self.templates: List[Dict[str, Any]] = []
+
+    def origin(self) -> List[str]:
+        """Últimos frames del propio proyecto (fuera de site-packages)."""
+        base = str(settings.BASE_DIR)
+        frames = [
+            f for f in traceback.extract_stack()
+            if f.filename.startswith(base) and "site-packages" not in f.filename
+            and f.filename != __file__
+        ]
+        return [
+            f"{Path(f.filename).relative_to(base)}:{f.lineno} in {f.name}"
+            for f in frames[-self.stack_depth:]
+        ]
+
+    def __call__(self, execute, sql, params, many, context):
+        # Firma de connection.execute_wrapper
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "sql": sql,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+                "many": many,
+                "origin": self.origin(),
+            })
+
+
+def _install_template_hook() -> None:
+    """Envuelve Template.render una sola vez por proceso (la primera captura)."""
+    global _template_hook_installed
+    if _template_hook_installed:
+        return
+    from django.template.base import Template
+
+    original = Template.render
+
+    def render(self, context):
+        capture = _capture.get()
+        if capture is None:
+            return original(self, context)
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            capture.templates.append({
+                "name": self.origin.template_name if self.origin else self.name,
+                "ms": round((time.perf_counter() - start) * 1000, 3),
+            })
+
+    Template.render = render
+    _template_hook_installed = True
+
+
+def is_requested(request) -> bool:
+    return QUERY_PARAM in request.GET or bool(request.headers.get(HEADER))
+
+
+def _prune(directory: Path, keep: int) -> None:
+    captures = sorted(directory.glob("*.json"), reverse=True)
+    for meta in captures[keep:]:
+        meta.unlink(missing_ok=True)
+        meta.with_suffix(".prof").unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Va después de AuthenticationMiddleware (necesita request.user)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+        return self.profile(request)
+
+    def profile(self, request):
+        cfg = get_config()
+        _install_template_hook()
+        capture = Capture(cfg["stack_depth"])
+        token = _capture.set(capture)
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(capture):
+                response = profiler.runcall(self.get_response, request)
+        finally:
+            _capture.reset(token)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}"
+        directory = cfg["dir"]
+        directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(directory / f"{name}.prof")
+        meta = {
+            "name": name,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "user": request.user.get_username(),
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "sql_count": len(capture.queries),
+            "sql_ms": round(sum(q["ms"] for q in capture.queries), 2),
+            "queries": capture.queries,
+            "templates": capture.templates,
+        }
+        (directory / f"{name}.json").write_text(json.dumps(meta, indent=2, ensure_ascii=False))
+        _prune(directory, cfg["keep"])
+
+        response["X-Profile-Id"] = name
+        return response
+
+
+# ============================================================
+# Lectura de capturas (página de staff)
+# ============================================================
+
+def list_captures(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Capturas más recientes primero (sin el detalle de SQL/templates)."""
+    directory = get_config()["dir"]
+    if not directory.is_dir():
+        return []
+    rows = []
+    for path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+        try:
+            meta = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        meta["slowest_sql"] = max(meta.pop("queries"), key=lambda q: q["ms"], default=None)
+        meta["templates_count"] = len(meta.pop("templates"))
+        rows.append(meta)
+    return rows
+
+
+def capture_path(filename: str) -> Optional[Path]:
+    """Ruta de un archivo de captura (.prof/.json) o None si el nombre no es válido."""
+    if not _NAME_RE.match(filename) or Path(filename).suffix not in (".prof", ".json"):
+        return None
+    path = get_config()["dir"] / filename
+    return path if path.is_file() else None
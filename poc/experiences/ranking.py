@@ -0,0 +1,258 @@
+# ============================================
+# poc/experiences/ranking.py
+# Rankings "tendencia" y "mejor valoradas" (tabla materializada)
+# --------------------------------------------
+# - Mejor valoradas: promedio bayesiano
+#       (prior_weight * prior_mean + suma_estrellas) / (prior_weight + n)
+#   para que una empresa con una sola review de 5 no supere a una con cien de 4.8.
+# - Tendencia: actividad con decaimiento exponencial (reviews y comentarios
+#   ponderados, vida media configurable). Se guarda en log y referida a una
+#   época fija: z = ln(peso) + (t - época) / tau. Como todas las empresas
+#   decaen igual, ordenar por el log acumulado (logaddexp) equivale a ordenar
+#   por la actividad actual y no hace falta "envejecer" las filas.
+# - Se mantiene en cada escritura (señales): una fila por empresa, sin
+#   recorrer sus reviews. Las bajas descuentan estrellas pero no actividad.
+#   Una empresa sin fila se siembra con el cálculo completo de sus reviews
+#   y comentarios (una sola vez); la migración 0009 llena la tabla inicial.
+# - rebuild() recalcula todo (cambios de prior/vida media o cargas masivas
+#   con bulk_create, que no disparan señales).
+# ============================================
+
+from __future__ import annotations
+import math
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import Comment, EnterpriseRanking, Review, ReviewFingerprint
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {
+        "prior_mean": 3.0,
+        "prior_weight": 5,
+        "half_life_days": 7,
+        "review_weight": 1.0,
+        "comment_weight": 0.3,
+        "limit": 20,
+    }
+    cfg.update(getattr(settings, "RANKING", {}))
+    return cfg
+
+
+# ============================================================
+# Fórmulas
+# ============================================================
+
+def bayesian(count: int, total: int, cfg: Dict[str, Any]) -> float:
+    weight = cfg["prior_weight"]
+    if count + weight <= 0:
+        return 0.0
+    return (weight * cfg["prior_mean"] + total) / (weight + count)
+
+
+def tau(cfg: Dict[str, Any]) -> float:
+    """Constante de tiempo (segundos) del decaimiento: vida media / ln 2."""
+    return cfg["half_life_days"] * 86400 / math.log(2)
+
+
+def time_coord(at: datetime, cfg: Dict[str, Any]) -> float:
+    return (at - EPOCH).total_seconds() / tau(cfg)
+
+
+def activity(trend_log: float, now: datetime, cfg: Optional[Dict[str, Any]] = None) -> float:
+    """Actividad ponderada vigente en `now` (≈ reviews recientes equivalentes)."""
+    return math.exp(trend_log - time_coord(now, cfg or get_config()))
+
+
+def _logaddexp(a: float, b: float) -> float:
+    high, low = (a, b) if a >= b else (b, a)
+    return high + math.log1p(math.exp(low - high))
+
+
+# ============================================================
+# Mantenimiento incremental (señales)
+# ============================================================
+
+def _lock(enterprise_id: int) -> bool:
+    """
+    Toma el candado de escritura de la fila escribiendo primero (en PostgreSQL
+    bloquea la fila; en SQLite pasa la transacción a escritura y espera su turno).
+    Leer y después escribir falla en SQLite con "database is locked" si otra
+    conexión escribe en medio. Devuelve False si la empresa aún no tiene fila.
+    """
+    return EnterpriseRanking.objects.filter(pk=enterprise_id).update(updated_at=timezone.now()) > 0
+
+
+def _seed(enterprise_id: int, cfg: Dict[str, Any]) -> bool:
+    """
+    Fila de una empresa que aún no la tiene, calculada desde todas sus reviews
+    y comentarios (ya incluyen el evento que disparó la señal). Si otra
+    petición la creó primero, se toma el candado y se sobrescribe con el mismo
+    cálculo, que es idempotente. Devuelve False si no hay actividad.
+    """
+    rows = compute_rows(
+        Review.objects.filter(enterprise_id=enterprise_id),
+        Comment.objects.filter(review__enterprise_id=enterprise_id),
+        cfg,
+    )
+    if not rows:
+        return False
+    values = rows[0]
+    del values["enterprise_id"]
+    _, created = EnterpriseRanking.objects.get_or_create(enterprise_id=enterprise_id, defaults=values)
+    if not created:
+        _lock(enterprise_id)
+        EnterpriseRanking.objects.filter(pk=enterprise_id).update(**values)
+    return True
+
+
+def _apply(
+    enterprise_id: int,
+    at: Optional[datetime] = None,
+    weight: float = 0.0,
+    reviews: int = 0,
+    rating: int = 0,
+    cfg: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Suma un evento de actividad (si `at`) y/o un delta de reviews y estrellas."""
+    cfg = cfg or get_config()
+    event = at is not None and weight > 0
+    with transaction.atomic():
+        if not _lock(enterprise_id):
+            _seed(enterprise_id, cfg)
+            return
+        row = EnterpriseRanking.objects.get(pk=enterprise_id)
+        if event:
+            row.trend_log = _logaddexp(row.trend_log, math.log(weight) + time_coord(at, cfg))
+            row.last_activity_at = max(row.last_activity_at, at)
+        row.reviews_count = max(0, row.reviews_count + reviews)
+        row.rating_sum = max(0, row.rating_sum + rating)
+        row.bayes_rating = bayesian(row.reviews_count, row.rating_sum, cfg)
+        row.save()
+
+
+def record_review(review: Review) -> None:
+    # La señal de dedup corre antes: un casi duplicado marcado no suma
+    if ReviewFingerprint.objects.filter(review_id=review.pk, duplicate_of__isnull=False).exists():
+        return
+    cfg = get_config()
+    _apply(review.enterprise_id, review.created_at, cfg["review_weight"], 1, review.rating, cfg)
+
+
+def forget_review(review: Review) -> None:
+    # Se recuenta: en post_delete ya no queda su huella para saber si estaba marcada
+    refresh_ratings(review.enterprise_id)
+
+
+def record_comment(comment: Comment) -> None:
+    cfg = get_config()
+    enterprise_id = Review.objects.filter(pk=comment.review_id).values_list("enterprise_id", flat=True).first()
+    if enterprise_id is not None:
+        _apply(enterprise_id, comment.created_at, cfg["comment_weight"], cfg=cfg)
+
+
+def refresh_ratings(enterprise_id: int) -> None:
+    """Recuenta estrellas de una empresa (tras editar una review; usa su índice)."""
+    agg = Review.objects.filter(enterprise_id=enterprise_id, fingerprint__duplicate_of__isnull=True).aggregate(n=Count("id"), total=Sum("rating"))
+    n, total = agg["n"], agg["total"] or 0
+    EnterpriseRanking.objects.filter(pk=enterprise_id).update(
+        reviews_count=n, rating_sum=total, bayes_rating=bayesian(n, total, get_config())
+    )
+
+
+# ============================================================
+# Recalculo completo
+# ============================================================
+
+def compute_rows(reviews, comments, cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Valores de la tabla para las empresas con actividad en `reviews` y
+    `comments` (querysets, también de modelos históricos en migraciones).
+    Los casi duplicados marcados no suman estrellas ni actividad.
+    """
+    reviews = reviews.filter(fingerprint__duplicate_of__isnull=True)
+    enterprise_ids, stamps, weights = [], [], []
+    sources = [
+        (reviews.values_list("enterprise_id", "created_at"), cfg["review_weight"]),
+        (comments.values_list("review__enterprise_id", "created_at"), cfg["comment_weight"]),
+    ]
+    for qs, weight in sources:
+        n = 0
+        if weight > 0:
+            for enterprise_id, created_at in qs.order_by().iterator(chunk_size=5000):
+                enterprise_ids.append(enterprise_id)
+                stamps.append(created_at.timestamp())
+                n += 1
+            weights += [math.log(weight)] * n
+    if not enterprise_ids:
+        return []
+
+    ratings = {
+        enterprise_id: (n, total)
+        for enterprise_id, n, total in reviews.order_by().values("enterprise_id")
+        .annotate(n=Count("id"), total=Sum("rating")).values_list("enterprise_id", "n", "total")
+    }
+
+    groups = np.asarray(enterprise_ids, dtype=np.int64)
+    t = np.asarray(stamps, dtype=np.float64)
+    z = np.asarray(weights) + (t - EPOCH.timestamp()) / tau(cfg)
+    order = np.argsort(groups, kind="stable")
+    groups, t, z = groups[order], t[order], z[order]
+    starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+    sizes = np.diff(np.r_[starts, len(groups)])
+    # logsumexp por empresa, restando el máximo de cada grupo para no desbordar
+    peak = np.maximum.reduceat(z, starts)
+    trend = peak + np.log(np.add.reduceat(np.exp(z - np.repeat(peak, sizes)), starts))
+    last = np.maximum.reduceat(t, starts)
+    rows = []
+    for enterprise_id, trend_log, last_ts in zip(groups[starts].tolist(), trend.tolist(), last.tolist()):
+        n, total = ratings.get(enterprise_id, (0, 0))
+        rows.append({
+            "enterprise_id": enterprise_id,
+            "reviews_count": n,
+            "rating_sum": total,
+            "bayes_rating": bayesian(n, total, cfg),
+            "trend_log": trend_log,
+            "last_activity_at": datetime.fromtimestamp(last_ts, tz=dt_timezone.utc),
+        })
+    return rows
+
+
+def rebuild(cfg: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Recalcula la tabla desde todas las reviews y comentarios (vectorizado)."""
+    cfg = cfg or get_config()
+    objs = [EnterpriseRanking(**row) for row in compute_rows(Review.objects.all(), Comment.objects.all(), cfg)]
+    with transaction.atomic():
+        EnterpriseRanking.objects.all().delete()
+        EnterpriseRanking.objects.bulk_create(objs, batch_size=2000)
+    return {
+        "enterprises": len(objs),
+        "reviews": Review.objects.filter(fingerprint__duplicate_of__isnull=True).count() if cfg["review_weight"] > 0 else 0,
+        "comments": Comment.objects.count() if cfg["comment_weight"] > 0 else 0,
+    }
+
+
+# ============================================================
+# Lectura (una consulta con LIMIT cada una)
+# ============================================================
+
+def trending(limit: Optional[int] = None):
+    limit = limit or get_config()["limit"]
+    return EnterpriseRanking.objects.select_related("enterprise").order_by("-trend_log")[:limit]
+
+
+def best_rated(limit: Optional[int] = None):
+    limit = limit or get_config()["limit"]
+    return (
+        EnterpriseRanking.objects.select_related("enterprise")
+        .filter(reviews_count__gt=0)
+        .order_by("-bayes_rating", "-reviews_count")[:limit]
+    )
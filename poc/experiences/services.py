@@ -3,40 +3,32 @@
 # ============================================
 
 from __future__ import annotations
-import os
+import hashlib
 import textwrap
+import threading
+import time
 from typing import List, Dict, Any
 from django.conf import settings
-from .models import Enterprise
-from google import genai
-from google.genai import types
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+from .models import Enterprise, LLMCall
+from . import extractive
+from .summarizers import get_summarizer
+from .telemetry import record_call
 import logging
 
-def get_client() -> genai.Client:
-    api_key = os.environ.get("GEMINI_API_KEY")
-
-    if not api_key:
-        raise RuntimeError("Falta GEMINI_API_KEY en el entorno.")
-
-    return genai.Client()
-
-def get_config() -> Dict[str, Any]:
-    cfg = getattr(settings, "GENAI_CONFIG", {}) # Obtener configuración desde settings.py
-    thinking_cfg = cfg.get("thinking_config", {}) # Configuración de 'thinking'
-
-    # Construir y devolver configuración completa
-    return types.GenerateContentConfig(
-        temperature=cfg.get("temperature", 0.2),
-        max_output_tokens=cfg.get("max_output_tokens", 600),
-        thinking_config=types.ThinkingConfig(**thinking_cfg),
-    )
-
 def build_corpus(enterprise: Enterprise, max_chars: int = 18000) -> str:
-    """Corpus condensado de todas las reviews de la empresa."""
+    """
+    Corpus condensado de todas las reviews de la empresa.
+    Si excede AI_EXTRACTIVE["token_budget"], se reemplaza por un extracto
+    local (oraciones representativas por banda de rating, sin redundancia).
+    """
     reviews = [] # Lista que contendrá cada review formateada
-    qs = enterprise.reviews.order_by("-created_at").values(
+    # Los casi duplicados marcados no inflan el corpus
+    qs = list(enterprise.reviews.filter(fingerprint__duplicate_of__isnull=True).order_by("-created_at").values(
         "title", "body", "rating", "anonymous", "created_at", "author__username"
-    ) # QuerySet optimizado
+    )) # QuerySet optimizado
 
     # Para cada review, formatear y añadir a la lista
     for r in qs:
@@ -55,6 +47,15 @@ def build_corpus(enterprise: Enterprise, max_chars: int = 18000) -> str:
 
     # Unir todas las reviews en un solo string y truncar si es necesario
     corpus = "\n".join(reviews).strip()
+    cfg = getattr(settings, "AI_EXTRACTIVE", {})
+    budget = cfg.get("token_budget", 2000)
+    if cfg.get("enabled", True) and extractive.estimate_tokens(corpus) > budget:
+        extract = extractive.build_extract(
+            qs, budget, cfg.get("mmr_lambda", 0.7), cfg.get("max_candidates", extractive.MAX_CANDIDATES)
+        )
+        # Sin oraciones utilizables (todas muy cortas): el corpus crudo recortado al presupuesto
+        corpus = extract or corpus[:budget * 4] + "\n\n[TRUNCADO]"
+
     if len(corpus) > max_chars:
         corpus = corpus[:max_chars] + "\n\n[TRUNCADO]"
 
@@ -80,61 +81,171 @@ def build_prompt(enterprise: Enterprise, corpus: str) -> str:
         """
     )
 
-def summarize_enterprise_reviews(enterprise: Enterprise) -> str:
+def corpus_hash(corpus: str) -> str:
+    """Huella del corpus: si no cambia, el resumen vigente sigue siendo válido."""
+    return hashlib.sha256(corpus.encode("utf-8")).hexdigest()
+
+def summarize_enterprise_reviews(
+    enterprise: Enterprise, trigger: str = LLMCall.TRIGGER_MANUAL, corpus: str | None = None
+) -> str:
     """
-    Llama a Gemini y devuelve el resumen (no persiste).
+    Genera el resumen con el backend configurado (settings.SUMMARIZER_BACKEND)
+    y lo devuelve (no persiste). Cada llamada queda registrada en LLMCall
+    (modelo, tokens, latencia, resultado, trigger).
     """
+    model_name = ""
+    reviews_count = 0
+    start = time.perf_counter()
 
     try:
-        # Construir corpus y prompt
-        corpus = build_corpus(enterprise)
-        prompt = build_prompt(enterprise, corpus)
-
-        # Obtener cliente y configuración
-        client = get_client()
-        model = os.environ.get("GEMINI_MODEL")
-        config = get_config()
-
-        # Llamar a la API de generación de contenido
-        resp = client.models.generate_content(
-            model=model,
-            contents=prompt,
-            config=config,
+        # Construir corpus y obtener backend (el SDK se importa en su primer uso)
+        if corpus is None:
+            corpus = build_corpus(enterprise)
+        reviews_count = enterprise.reviews.count()
+        backend = get_summarizer()
+        model_name = backend.model_name
+
+        start = time.perf_counter()
+        result = backend.summarize(enterprise, corpus)
+        latency_ms = round((time.perf_counter() - start) * 1000)
+
+        summary = (result.text or "").strip()
+        record_call(
+            enterprise=enterprise,
+            trigger=trigger,
+            outcome=LLMCall.OUTCOME_OK if summary else LLMCall.OUTCOME_EMPTY,
+            model_name=result.model_name,
+            reviews_count=reviews_count,
+            corpus_chars=len(corpus),
+            prompt_tokens=result.prompt_tokens,
+            output_tokens=result.output_tokens,
+            latency_ms=latency_ms,
         )
-
-        # Extraer y devolver el texto generado
-        summary = resp.text.strip()
         return summary
 
     except Exception as e:
+        record_call(
+            enterprise=enterprise,
+            trigger=trigger,
+            outcome=LLMCall.OUTCOME_ERROR,
+            model_name=model_name,
+            reviews_count=reviews_count,
+            corpus_chars=len(corpus or ""),
+            latency_ms=round((time.perf_counter() - start) * 1000),
+            error=str(e)[:2000],
+        )
         raise RuntimeError(f"Error al generar resumen: {e}")
 
-def update_enterprise_summary(enterprise_id: int) -> None:
+def update_enterprise_summary(
+    enterprise_id: int, trigger: str = LLMCall.TRIGGER_MANUAL, force: bool = False
+) -> bool:
     """
     Recalcula y persiste el resumen en Enterprise.AI_summary.
-    Maneja ausencia de reviews y errores de red/SDK.
+    - Si el corpus no cambió desde el último resumen válido, no llama a la IA.
+    - Si la llamada falla, conserva el último resumen válido y lo marca como stale.
+    `trigger` indica qué originó el recálculo (save/delete/manual) para la telemetría.
+    Devuelve True si el resumen quedó al día.
     """
     try:
         # Obtener empresa y verificar reviews
         enterprise = Enterprise.objects.get(pk=enterprise_id)
+    except Enterprise.DoesNotExist:
+        return False
 
-        # Si no hay reviews, limpiar resumen y salir
-        if not enterprise.reviews.exists() or enterprise.reviews.count() == 0:
-            enterprise.AI_summary = ""
-            enterprise.save(update_fields=["AI_summary"])
-            return
+    try:
+        # Si no hay reviews (o todas son casi duplicados marcados), limpiar resumen y salir
+        corpus = build_corpus(enterprise)
+        if not corpus:
+            Enterprise.objects.filter(pk=enterprise_id).update(
+                AI_summary="",
+                summary_corpus_hash="",
+                summary_generated_at=timezone.now(),
+                summary_stale=False,
+            )
+            return True
+
+        # Mismo corpus que el resumen vigente: basta con quitar la marca stale
+        digest = corpus_hash(corpus)
+        if not force and enterprise.AI_summary and digest == enterprise.summary_corpus_hash:
+            if enterprise.summary_stale:
+                Enterprise.objects.filter(pk=enterprise_id).update(summary_stale=False)
+            return True
 
         # Generar nuevo resumen
-        summary = summarize_enterprise_reviews(enterprise)
+        summary = summarize_enterprise_reviews(enterprise, trigger=trigger, corpus=corpus)
         if not summary:
             summary = "Aún no hay suficiente información para generar un resumen fiable."
 
-        # Guardar resumen
-        enterprise.AI_summary = summary
-        enterprise.save(update_fields=["AI_summary"])
-
-    except Exception as e:
+        # Guardar resumen con sus metadatos
         Enterprise.objects.filter(pk=enterprise_id).update(
-            AI_summary="No fue posible actualizar el resumen en este momento."
+            AI_summary=summary,
+            summary_version=enterprise.summary_version + 1,
+            summary_generated_at=timezone.now(),
+            summary_corpus_hash=digest,
+            summary_stale=False,
         )
-        logging.error(f"Error al actualizar resumen para Enterprise {enterprise_id}: {e}")
\ No newline at end of file
+        return True
+
+    except Exception as e:
+        # Se conserva el último resumen válido; queda marcado para reintento
+        Enterprise.objects.filter(pk=enterprise_id).update(summary_stale=True)
+        logging.error(f"Error al actualizar resumen para Enterprise {enterprise_id}: {e}")
+        return False
+
+def _refresh_lock_key(enterprise_id: int) -> str:
+    return f"ai-summary-refresh:{enterprise_id}"
+
+def _refresh_pending_key(enterprise_id: int) -> str:
+    return f"ai-summary-pending:{enterprise_id}"
+
+def _run_refresh(enterprise_id: int, trigger: str) -> None:
+    """
+    Ejecuta el refresco mientras lleguen cambios nuevos durante el cálculo.
+    Si falla, el candado no se libera y expira solo (backoff de reintento).
+    """
+    backoff = getattr(settings, "AI_SUMMARY_REFRESH", {}).get("retry_backoff", 300)
+    while True:
+        cache.delete(_refresh_pending_key(enterprise_id))
+        if not update_enterprise_summary(enterprise_id, trigger=trigger):
+            return
+        if cache.get(_refresh_pending_key(enterprise_id)):
+            continue
+        cache.delete(_refresh_lock_key(enterprise_id))
+        # Un cambio pudo marcar "pendiente" entre la última lectura y la liberación
+        # (vio el candado tomado y no lanzó su refresco): se retoma si nadie más lo hizo
+        if not cache.get(_refresh_pending_key(enterprise_id)):
+            return
+        if not cache.add(_refresh_lock_key(enterprise_id), True, backoff):
+            return  # otra petición tomó el candado y refresca con el corpus nuevo
+
+def _refresh_in_background(enterprise_id: int, trigger: str) -> None:
+    try:
+        _run_refresh(enterprise_id, trigger)
+    finally:
+        connection.close()
+
+def schedule_summary_refresh(enterprise_id: int, trigger: str = LLMCall.TRIGGER_MANUAL) -> bool:
+    """
+    Marca el resumen como stale y programa su recálculo.
+    Un candado en caché evita refrescos duplicados de la misma empresa y,
+    tras un fallo, espacia los reintentos (AI_SUMMARY_REFRESH["retry_backoff"]).
+    Devuelve False si ya había un refresco en curso o en espera.
+    """
+    cfg = getattr(settings, "AI_SUMMARY_REFRESH", {})
+    Enterprise.objects.filter(pk=enterprise_id, summary_stale=False).update(summary_stale=True)
+
+    if not cache.add(_refresh_lock_key(enterprise_id), True, cfg.get("retry_backoff", 300)):
+        # Hay un refresco en curso: que repita con el corpus nuevo al terminar
+        cache.set(_refresh_pending_key(enterprise_id), True, cfg.get("retry_backoff", 300))
+        return False
+
+    if cfg.get("async", True):
+        threading.Thread(
+            target=_refresh_in_background,
+            args=(enterprise_id, trigger),
+            name=f"ai-summary-{enterprise_id}",
+            daemon=True,
+        ).start()
+    else:
+        _run_refresh(enterprise_id, trigger)
+    return True
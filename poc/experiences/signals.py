@@ -1,19 +1,129 @@
+from django.contrib.auth import user_logged_out
+from django.contrib.auth.models import User
 from django.db import transaction
+from django.db.models import F
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from .models import Review
-from .services import update_enterprise_summary
+from .models import Comment, Enterprise, Review, ReviewVector, LLMCall
+from .services import schedule_summary_refresh
+from .dedup import index_review
+from .autocomplete import bump_version
+from .auth_backends import forget_user
+from . import page_cache, ranking
 
 # ============================================================
 # 🔔 SEÑALES
-# 1) Cambio en Review -> Actualizar resumen de Enterprise con AI.
+# 1) Cambio en Review -> Marcar resumen stale y recalcularlo en segundo plano.
+# 2) Cambio en Review -> Reindexar su firma MinHash (detección de duplicados).
+# 3) Cambio en Enterprise -> Invalidar el índice de autocompletado.
+# 4) Cambio en User o logout -> Quitar el usuario de la caché de sesiones.
+# 5) Alta/baja de Comment -> Mantener Review.comments_count.
+# 6) Cambio en Review / alta de Comment -> Actualizar la fila de EnterpriseRanking.
+# 7) Cambio en Enterprise, Review o Comment -> Nuevo sello de los fragmentos en caché.
+# 8) Edición de Review -> Descartar su vector de similitud (se recalcula en lote).
 # ============================================================
 
 @receiver(post_save, sender=Review)
 def refresh_summary_on_review_save(sender, instance: Review, created, **kwargs):
-    transaction.on_commit(lambda: update_enterprise_summary(instance.enterprise_id))
+    transaction.on_commit(
+        lambda: schedule_summary_refresh(instance.enterprise_id, trigger=LLMCall.TRIGGER_SAVE)
+    )
 
 @receiver(post_delete, sender=Review)
 def refresh_summary_on_review_delete(sender, instance: Review, **kwargs):
-    transaction.on_commit(lambda: update_enterprise_summary(instance.enterprise_id))
\ No newline at end of file
+    transaction.on_commit(
+        lambda: schedule_summary_refresh(instance.enterprise_id, trigger=LLMCall.TRIGGER_DELETE)
+    )
+
+@receiver(post_save, sender=Review)
+def index_review_fingerprint(sender, instance: Review, raw=False, update_fields=None, **kwargs):
+    # Solo si cambió el cuerpo (o no se sabe qué cambió); las cargas de fixtures se omiten
+    if raw or (update_fields is not None and "body" not in update_fields):
+        return
+    index_review(instance)
+
+
+@receiver(post_save, sender=Review)
+def invalidate_review_vector(sender, instance: Review, created, raw=False, update_fields=None, **kwargs):
+    # Texto editado: build_similarity la vuelve a vectorizar y recalcula sus listas
+    if created or raw or (update_fields is not None and not {"title", "body"} & set(update_fields)):
+        return
+    ReviewVector.objects.filter(review_id=instance.pk).delete()
+
+
+@receiver(post_save, sender=Enterprise)
+@receiver(post_delete, sender=Enterprise)
+def invalidate_autocomplete_index(sender, **kwargs):
+    bump_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance: User, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_user_on_logout(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance: Comment, created, raw=False, **kwargs):
+    if created and not raw:
+        # update() con F(): atómico y sin disparar las señales de Review
+        Review.objects.filter(pk=instance.review_id).update(comments_count=F("comments_count") + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance: Comment, **kwargs):
+    Review.objects.filter(pk=instance.review_id, comments_count__gt=0).update(
+        comments_count=F("comments_count") - 1
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_ranking_on_review_save(sender, instance: Review, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        ranking.record_review(instance)
+    elif update_fields is None or "rating" in update_fields:
+        ranking.refresh_ratings(instance.enterprise_id)
+
+
+@receiver(post_delete, sender=Review)
+def update_ranking_on_review_delete(sender, instance: Review, **kwargs):
+    ranking.forget_review(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_ranking_on_comment(sender, instance: Comment, created, raw=False, **kwargs):
+    if created and not raw:
+        ranking.record_comment(instance)
+
+
+@receiver(post_save, sender=Enterprise)
+def bump_enterprise_page_cache(sender, instance: Enterprise, created, **kwargs):
+    # Al crearla: un id reutilizado no debe leer fragmentos de la empresa anterior
+    if created:
+        page_cache.bump(page_cache.ENTERPRISE, instance.pk)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_page_cache(sender, instance: Review, **kwargs):
+    page_cache.bump(page_cache.ENTERPRISE, instance.enterprise_id)
+    page_cache.bump(page_cache.REVIEW, instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_page_cache(sender, instance: Comment, **kwargs):
+    # El listado de la empresa muestra comments_count de cada review
+    enterprise_id = Review.objects.filter(pk=instance.review_id).values_list("enterprise_id", flat=True).first()
+    if enterprise_id is not None:
+        page_cache.bump(page_cache.ENTERPRISE, enterprise_id)
+    page_cache.bump(page_cache.REVIEW, instance.review_id)
@@ -0,0 +1,331 @@
+# ============================================
+# poc/experiences/similarity.py
+# Reviews similares y empresas relacionadas (vecinos precalculados)
+# --------------------------------------------
+# - Vectoriza título + cuerpo de cada review con "feature hashing"
+#   (sin vocabulario que reajustar) y TF-IDF, filas normalizadas L2.
+# - Calcula los k vecinos por coseno en bloques de filas (X_bloque · Xᵀ),
+#   para acotar la memoria a bloque × N.
+# - Persiste las listas en ReviewNeighbor / EnterpriseNeighbor: las páginas
+#   las leen con una sola consulta.
+# - Persiste el vector disperso de cada review (ReviewVector). Modo
+#   incremental: solo vectoriza las reviews sin vector (nuevas, o editadas:
+#   la señal borra su vector), recalcula sus listas y las que las contenían,
+#   y actualiza las demás listas en las que una de ellas entra al top-k.
+# - Los casi duplicados marcados quedan fuera por ambos lados: no tienen
+#   lista ni aparecen como vecinos.
+# ============================================
+
+from __future__ import annotations
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+
+from .extractive import tokenize
+from .models import EnterpriseNeighbor, Review, ReviewNeighbor, ReviewVector, Watermark
+
+# Dimensión con la que se guardaron los ReviewVector (si cambia, hay que revectorizar)
+FEATURES = "similarity.n_features"
+
+
+def get_config() -> Dict[str, Any]:
+    cfg = {"n_features": 512, "k": 5, "block_size": 256, "min_score": 0.2}
+    cfg.update(getattr(settings, "SIMILARITY", {}))
+    return cfg
+
+
+# ============================================================
+# Núcleo NumPy
+# ============================================================
+
+def term_frequencies(
+    texts: Sequence[str], n_features: int = 512, chunk_rows: int = 8192
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Representación dispersa (CSR) con feature hashing y TF sublineal, sin IDF:
+    (indptr[n+1], columnas int32, pesos float32). Es lo que se persiste por review.
+    """
+    columns: Dict[str, int] = {}  # memo token -> columna (el vocabulario real es pequeño)
+    row_parts, col_parts, count_parts = [], [], []
+
+    for start in range(0, len(texts), chunk_rows):
+        keys: List[int] = []
+        for offset, text in enumerate(texts[start:start + chunk_rows]):
+            base = (start + offset) * n_features
+            for token in tokenize(text):
+                col = columns.get(token)
+                if col is None:
+                    col = columns[token] = zlib.crc32(token.encode("utf-8")) % n_features
+                keys.append(base + col)
+        # Pares (fila, columna) únicos y su conteo, ya ordenados por fila
+        unique, counts = np.unique(np.asarray(keys, dtype=np.int64), return_counts=True)
+        rows, cols = np.divmod(unique, n_features)
+        row_parts.append(rows)
+        col_parts.append(cols.astype(np.int32))
+        count_parts.append(counts)
+
+    rows = np.concatenate(row_parts) if row_parts else np.zeros(0, dtype=np.int64)
+    cols = np.concatenate(col_parts) if col_parts else np.zeros(0, dtype=np.int32)
+    counts = np.concatenate(count_parts) if count_parts else np.zeros(0, dtype=np.int64)
+    indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=len(texts)), out=indptr[1:])
+    return indptr, cols, (1.0 + np.log(counts)).astype(np.float32)
+
+
+def tfidf_dense(indptr: np.ndarray, cols: np.ndarray, weights: np.ndarray, n_features: int = 512) -> np.ndarray:
+    """Matriz densa TF-IDF (float32, filas L2) a partir de la representación dispersa."""
+    n = len(indptr) - 1
+    df = np.bincount(cols, minlength=n_features)
+    idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+    X = np.zeros((n, n_features), dtype=np.float32)
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    X[rows, cols] = weights * idf[cols]
+    normalize_rows(X)
+    return X
+
+
+def vectorize(texts: Sequence[str], n_features: int = 512, chunk_rows: int = 8192) -> np.ndarray:
+    """Matriz TF-IDF con feature hashing (float32, n_textos x n_features, filas L2)."""
+    return tfidf_dense(*term_frequencies(texts, n_features, chunk_rows), n_features)
+
+
+def normalize_rows(X: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    X /= np.where(norms == 0, 1.0, norms)
+    return X
+
+
+def topk_blocks(
+    X: np.ndarray,
+    rows: Sequence[int],
+    k: int,
+    block_size: int = 256,
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Para cada fila de `rows`, sus k vecinos más cercanos en X (excluyéndose).
+    Genera bloques (filas, índices[b, k], scores[b, k]) ordenados por score desc.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    n = X.shape[0]
+    k = min(k, n - 1)
+    if k <= 0:
+        return
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        S = X[block] @ X.T
+        S[np.arange(len(block)), block] = -np.inf
+        # Particiona S en su sitio (sin copia negada): los k mayores quedan al final
+        idx = np.argpartition(S, n - k, axis=1)[:, n - k:]
+        scores = np.take_along_axis(S, idx, axis=1)
+        order = np.argsort(-scores, axis=1)
+        yield block, np.take_along_axis(idx, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def centroids(X: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Centroide normalizado de las filas de X por grupo (empresa)."""
+    order = np.argsort(groups, kind="stable")
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    C = np.zeros((n_groups, X.shape[1]), dtype=np.float32)
+    if len(order):
+        C[sorted_groups[starts]] = np.add.reduceat(X[order], starts, axis=0)
+    return normalize_rows(C)
+
+
+# ============================================================
+# Carga y persistencia
+# ============================================================
+
+def _texts(qs) -> Tuple[List[int], List[str]]:
+    ids, texts = [], []
+    for pk, title, body in qs.order_by("pk").values_list("pk", "title", "body").iterator(chunk_size=5000):
+        ids.append(pk)
+        texts.append(f"{title}. {body}")
+    return ids, texts
+
+
+def _save_vectors(ids: Sequence[int], indptr: np.ndarray, cols: np.ndarray, weights: np.ndarray) -> None:
+    objs = [
+        ReviewVector(
+            review_id=pk,
+            columns=cols[indptr[i]:indptr[i + 1]].tobytes(),
+            weights=weights[indptr[i]:indptr[i + 1]].tobytes(),
+        )
+        for i, pk in enumerate(ids)
+    ]
+    ReviewVector.objects.bulk_create(objs, batch_size=2000)
+
+
+def _vectorize_pending(cfg: Dict[str, Any]) -> List[int]:
+    """Vectoriza y persiste solo las reviews sin vector (nuevas o editadas)."""
+    ids, texts = _texts(Review.objects.filter(vector__isnull=True, fingerprint__duplicate_of__isnull=True))
+    if ids:
+        _save_vectors(ids, *term_frequencies(texts, cfg["n_features"]))
+    return ids
+
+
+def _load_matrix(cfg: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(ids, enterprise_ids, X) desde los vectores persistidos, sin casi duplicados marcados."""
+    ids, enterprises, lengths, col_parts, weight_parts = [], [], [], [], []
+    qs = (
+        ReviewVector.objects.filter(review__fingerprint__duplicate_of__isnull=True)
+        .order_by("review_id").values_list("review_id", "review__enterprise_id", "columns", "weights")
+    )
+    for pk, enterprise_id, cols, weights in qs.iterator(chunk_size=5000):
+        ids.append(pk)
+        enterprises.append(enterprise_id)
+        cols = np.frombuffer(bytes(cols), dtype=np.int32)
+        lengths.append(len(cols))
+        col_parts.append(cols)
+        weight_parts.append(np.frombuffer(bytes(weights), dtype=np.float32))
+    indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    cols = np.concatenate(col_parts) if col_parts else np.zeros(0, dtype=np.int32)
+    weights = np.concatenate(weight_parts) if weight_parts else np.zeros(0, dtype=np.float32)
+    X = tfidf_dense(indptr, cols, weights, cfg["n_features"])
+    return np.asarray(ids, dtype=np.int64), np.asarray(enterprises, dtype=np.int64), X
+
+
+def _neighbor_rows(model, owner_field, owner_id, neighbor_ids, scores, min_score):
+    return [
+        model(**{f"{owner_field}_id": int(owner_id)}, neighbor_id=int(nid), score=float(s), rank=r)
+        for r, (nid, s) in enumerate((nid, s) for nid, s in zip(neighbor_ids, scores) if s >= min_score)
+    ]
+
+
+def _build_enterprise_neighbors(X: np.ndarray, enterprise_ids: np.ndarray, cfg: Dict[str, Any]) -> int:
+    unique, groups = np.unique(enterprise_ids, return_inverse=True)
+    C = centroids(X, groups, len(unique))
+    objs = []
+    for block, idx, scores in topk_blocks(C, range(len(unique)), cfg["k"], cfg["block_size"]):
+        for row, nbrs, sc in zip(block, idx, scores):
+            objs += _neighbor_rows(EnterpriseNeighbor, "enterprise", unique[row], unique[nbrs], sc, cfg["min_score"])
+    with transaction.atomic():
+        EnterpriseNeighbor.objects.all().delete()
+        EnterpriseNeighbor.objects.bulk_create(objs, batch_size=2000)
+    return len(objs)
+
+
+def _write_lists(X: np.ndarray, ids: np.ndarray, rows: Sequence[int], cfg: Dict[str, Any]) -> int:
+    """Recalcula y reemplaza las listas completas de las filas `rows`."""
+    total = 0
+    for block, idx, scores in topk_blocks(X, rows, cfg["k"], cfg["block_size"]):
+        objs = []
+        for row, nbrs, sc in zip(block, idx, scores):
+            objs += _neighbor_rows(ReviewNeighbor, "review", ids[row], ids[nbrs], sc, cfg["min_score"])
+        ReviewNeighbor.objects.filter(review_id__in=ids[block].tolist()).delete()
+        ReviewNeighbor.objects.bulk_create(objs, batch_size=2000)
+        total += len(objs)
+    return total
+
+
+def build_full(cfg: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Revectoriza todas las reviews y recalcula todos los vecinos de reviews y empresas."""
+    cfg = cfg or get_config()
+    with transaction.atomic():
+        ReviewVector.objects.all().delete()
+        ids, texts = _texts(Review.objects.filter(fingerprint__duplicate_of__isnull=True))
+        _save_vectors(ids, *term_frequencies(texts, cfg["n_features"]))
+        Watermark.set(FEATURES, cfg["n_features"])
+    ids, enterprise_ids, X = _load_matrix(cfg)
+
+    with transaction.atomic():
+        ReviewNeighbor.objects.all().delete()
+        total = _write_lists(X, ids, range(len(ids)), cfg)
+
+    return {
+        "reviews": len(ids),
+        "review_neighbors": total,
+        "enterprise_neighbors": _build_enterprise_neighbors(X, enterprise_ids, cfg),
+    }
+
+
+def build_incremental(cfg: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+    """
+    Vectoriza solo las reviews nuevas o editadas y recalcula sus listas, las
+    listas que las contenían y las que apuntaban a un casi duplicado marcado.
+    En las demás listas solo entran las reviews cambiadas que superen al
+    k-ésimo vecino.
+    """
+    cfg = cfg or get_config()
+    if Watermark.get(FEATURES) != cfg["n_features"]:
+        return build_full(cfg)  # vectores de otra dimensión (o nunca calculados)
+
+    changed = _vectorize_pending(cfg)
+    # Los marcados no tienen lista ni aparecen en otras (pudieron marcarse sin editarse)
+    flagged = ReviewNeighbor.objects.filter(review__fingerprint__duplicate_of__isnull=False)
+    stale = set(
+        ReviewNeighbor.objects.filter(neighbor__fingerprint__duplicate_of__isnull=False)
+        .values_list("review_id", flat=True)
+    )
+    for start in range(0, len(changed), 500):
+        stale.update(
+            ReviewNeighbor.objects.filter(neighbor_id__in=changed[start:start + 500])
+            .values_list("review_id", flat=True)
+        )
+    if not changed and not stale and not flagged.exists():
+        return {"reviews": ReviewVector.objects.count(), "new_reviews": 0, "refreshed_lists": 0,
+                "updated_lists": 0, "enterprise_neighbors": 0}
+
+    ids, enterprise_ids, X = _load_matrix(cfg)
+    k, min_score = cfg["k"], cfg["min_score"]
+    position = {int(pk): i for i, pk in enumerate(ids)}
+    changed_rows = np.asarray([position[pk] for pk in changed if pk in position], dtype=np.int64)
+    recompute = np.zeros(len(ids), dtype=bool)
+    recompute[changed_rows] = True
+    recompute[[position[pk] for pk in stale if pk in position]] = True
+
+    # Umbral de entrada de cada lista existente: su k-ésimo score (o min_score si no está llena)
+    threshold = np.full(len(ids), min_score, dtype=np.float32)
+    for review_id, n, worst in (
+        ReviewNeighbor.objects.order_by().values("review_id").annotate(n=Count("id"), worst=Min("score"))
+        .values_list("review_id", "n", "worst")
+    ):
+        pos = position.get(review_id)
+        if pos is not None and n >= k:
+            threshold[pos] = max(worst, min_score)
+
+    candidates: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+    for start in range(0, len(changed_rows), cfg["block_size"]):
+        block = changed_rows[start:start + cfg["block_size"]]
+        S = X[block] @ X.T
+        S[np.arange(len(block)), block] = -np.inf
+        # Listas existentes (no recalculadas) en las que entra alguna review cambiada
+        hits = (S > threshold[None, :]) & ~recompute[None, :]
+        for i, j in zip(*np.nonzero(hits)):
+            candidates[int(ids[j])].append((float(S[i, j]), int(ids[block[i]])))
+
+    with transaction.atomic():
+        flagged.delete()
+        _write_lists(X, ids, np.flatnonzero(recompute), cfg)
+
+        affected = list(candidates)
+        for start in range(0, len(affected), 500):
+            chunk = affected[start:start + 500]
+            current: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+            for review_id, neighbor_id, score in ReviewNeighbor.objects.filter(review_id__in=chunk).values_list(
+                "review_id", "neighbor_id", "score"
+            ):
+                current[review_id].append((score, neighbor_id))
+            objs = []
+            for review_id in chunk:
+                merged = sorted(current[review_id] + candidates[review_id], reverse=True)[:k]
+                objs += _neighbor_rows(
+                    ReviewNeighbor, "review", review_id, [n for _, n in merged], [s for s, _ in merged], min_score
+                )
+            ReviewNeighbor.objects.filter(review_id__in=chunk).delete()
+            ReviewNeighbor.objects.bulk_create(objs, batch_size=2000)
+
+    return {
+        "reviews": len(ids),
+        "new_reviews": len(changed),
+        "refreshed_lists": len(stale),
+        "updated_lists": len(candidates),
+        # Los centroides cambian con cualquier review nueva: se recalculan (son pocas filas)
+        "enterprise_neighbors": _build_enterprise_neighbors(X, enterprise_ids, cfg),
+    }
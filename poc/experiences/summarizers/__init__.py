@@ -0,0 +1,51 @@
+# ============================================
+# poc/experiences/summarizers/__init__.py
+# Selección del backend de resumen (settings.SUMMARIZER_BACKEND)
+# --------------------------------------------
+# - "auto": gemini si hay GEMINI_API_KEY, si no extractive.
+# - "gemini" | "extractive" | "fake", o la ruta "paquete.modulo.Clase".
+# - El módulo del backend se importa recién al pedirlo (import_string):
+#   importar experiences no carga ningún SDK.
+# ============================================
+
+from __future__ import annotations
+import os
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .base import Summarizer, SummaryResult
+
+BACKENDS = {
+    "gemini": "experiences.summarizers.gemini.GeminiSummarizer",
+    "extractive": "experiences.summarizers.extractive.ExtractiveSummarizer",
+    "fake": "experiences.summarizers.fake.FakeSummarizer",
+}
+
+__all__ = ["Summarizer", "SummaryResult", "BACKENDS", "get_summarizer"]
+
+
+def _backend_path() -> str:
+    backend = getattr(settings, "SUMMARIZER_BACKEND", "auto")
+    if backend == "auto":
+        backend = "gemini" if os.environ.get("GEMINI_API_KEY") else "extractive"
+    return BACKENDS.get(backend, backend)
+
+
+@lru_cache(maxsize=None)
+def _load(path: str) -> Summarizer:
+    return import_string(path)()
+
+
+def get_summarizer() -> Summarizer:
+    """Instancia (una por proceso) del backend configurado."""
+    return _load(_backend_path())
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    if setting == "SUMMARIZER_BACKEND":
+        _load.cache_clear()
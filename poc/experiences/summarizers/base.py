@@ -0,0 +1,40 @@
+# ============================================
+# poc/experiences/summarizers/base.py
+# Interfaz común de los resumidores
+# ============================================
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class SummaryResult:
+    """Resumen generado y los datos que se registran en LLMCall."""
+
+    text: str
+    model_name: str = ""
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+
+
+class Summarizer(ABC):
+    """
+    Un backend recibe la empresa y el corpus ya armado (services.build_corpus)
+    y devuelve el resumen. Los SDK pesados se importan dentro de summarize(),
+    nunca a nivel de módulo: elegir un backend no debe encarecer el arranque.
+    summarize() es abstracto: un backend incompleto falla al instanciarlo en
+    get_summarizer(), no en el primer refresco en segundo plano.
+    """
+
+    name = "base"
+
+    @property
+    def model_name(self) -> str:
+        """Nombre registrado en LLMCall.model_name."""
+        return self.name
+
+    @abstractmethod
+    def summarize(self, enterprise, corpus: str) -> SummaryResult:
+        """Genera el resumen; los errores se propagan (services los registra)."""
@@ -0,0 +1,23 @@
+# ============================================
+# poc/experiences/summarizers/extractive.py
+# Resumen extractivo local (sin IA ni red)
+# ============================================
+
+from __future__ import annotations
+
+from .. import extractive
+from .base import Summarizer, SummaryResult
+
+
+class ExtractiveSummarizer(Summarizer):
+    """Oraciones representativas por banda de rating (experiences/extractive.py)."""
+
+    name = "extractive"
+
+    def summarize(self, enterprise, corpus: str) -> SummaryResult:
+        # Trabaja sobre las reviews (necesita el rating de cada oración), no sobre el corpus
+        rows = list(
+            enterprise.reviews.filter(fingerprint__duplicate_of__isnull=True)
+            .order_by("-created_at").values("body", "rating")
+        )
+        return SummaryResult(text=extractive.extractive_summary(rows), model_name=self.name)
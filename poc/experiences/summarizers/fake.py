@@ -0,0 +1,33 @@
+# ============================================
+# poc/experiences/summarizers/fake.py
+# Resumidor determinista para tests y pruebas de carga
+# ============================================
+
+from __future__ import annotations
+import time
+
+from django.conf import settings
+
+from ..extractive import estimate_tokens
+from .base import Summarizer, SummaryResult
+
+
+class FakeSummarizer(Summarizer):
+    """
+    Mismo corpus -> mismo resumen, sin red. La latencia simulada se
+    configura con SUMMARIZER_FAKE_LATENCY (segundos, por defecto 0).
+    """
+
+    name = "fake"
+
+    def summarize(self, enterprise, corpus: str) -> SummaryResult:
+        latency = getattr(settings, "SUMMARIZER_FAKE_LATENCY", 0)
+        if latency:
+            time.sleep(latency)
+        text = f"Resumen simulado para {enterprise.name} ({corpus.count('- Review:')} reviews)."
+        return SummaryResult(
+            text=text,
+            model_name=self.name,
+            prompt_tokens=estimate_tokens(corpus),
+            output_tokens=estimate_tokens(text),
+        )
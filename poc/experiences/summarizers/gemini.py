@@ -0,0 +1,60 @@
+# ============================================
+# poc/experiences/summarizers/gemini.py
+# Resumen con Gemini (google-genai, importado en el primer uso)
+# ============================================
+
+from __future__ import annotations
+import os
+
+from django.conf import settings
+
+from ..services import build_prompt
+from ..telemetry import usage_tokens
+from .base import Summarizer, SummaryResult
+
+
+def get_client():
+    api_key = os.environ.get("GEMINI_API_KEY")
+
+    if not api_key:
+        raise RuntimeError("Falta GEMINI_API_KEY en el entorno.")
+
+    from google import genai  # ~350 ms de import: solo cuando se usa
+
+    return genai.Client()
+
+def get_config():
+    from google.genai import types
+
+    cfg = getattr(settings, "GENAI_CONFIG", {}) # Obtener configuración desde settings.py
+    thinking_cfg = cfg.get("thinking_config", {}) # Configuración de 'thinking'
+
+    # Construir y devolver configuración completa
+    return types.GenerateContentConfig(
+        temperature=cfg.get("temperature", 0.2),
+        max_output_tokens=cfg.get("max_output_tokens", 600),
+        thinking_config=types.ThinkingConfig(**thinking_cfg),
+    )
+
+
+class GeminiSummarizer(Summarizer):
+    name = "gemini"
+
+    @property
+    def model_name(self) -> str:
+        return os.environ.get("GEMINI_MODEL") or ""
+
+    def summarize(self, enterprise, corpus: str) -> SummaryResult:
+        model = self.model_name
+        resp = get_client().models.generate_content(
+            model=model or None,
+            contents=build_prompt(enterprise, corpus),
+            config=get_config(),
+        )
+        prompt_tokens, output_tokens = usage_tokens(resp)
+        return SummaryResult(
+            text=(resp.text or "").strip(),
+            model_name=model,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+        )
@@ -0,0 +1,103 @@
+# ============================================
+# poc/experiences/telemetry.py
+# Telemetría de llamadas al modelo de IA
+# ============================================
+
+from __future__ import annotations
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import LLMCall
+from .models.llm_call import estimate_cost
+
+logger = logging.getLogger(__name__)
+
+
+def usage_tokens(resp: Any) -> tuple[Optional[int], Optional[int]]:
+    """Extrae (prompt_tokens, output_tokens) del usage_metadata de la respuesta."""
+    usage = getattr(resp, "usage_metadata", None)
+    if usage is None:
+        return None, None
+    return (
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+    )
+
+
+def record_call(**fields) -> Optional[LLMCall]:
+    """
+    Persiste una llamada en LLMCall.
+    Un fallo al registrar nunca debe romper la generación del resumen.
+    """
+    try:
+        return LLMCall.objects.create(**fields)
+    except Exception as e:
+        logger.warning("No se pudo registrar la llamada LLM: %s", e)
+        return None
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+    if not sorted_values:
+        return 0
+    idx = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def aggregate_stats(days: Optional[int] = 30, top: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Métricas agregadas de las llamadas de los últimos `days` días (None = todo).
+    Devuelve totales globales y una fila por empresa ordenada por costo estimado.
+    """
+    qs = LLMCall.objects.all()
+    if days:
+        qs = qs.filter(created_at__gte=timezone.now() - timedelta(days=days))
+
+    totals = qs.aggregate(
+        calls=Count("id"),
+        errors=Count("id", filter=Q(outcome=LLMCall.OUTCOME_ERROR)),
+        prompt_tokens=Sum("prompt_tokens"),
+        output_tokens=Sum("output_tokens"),
+        avg_latency_ms=Avg("latency_ms"),
+    )
+    latencies = sorted(qs.values_list("latency_ms", flat=True))
+    totals["prompt_tokens"] = totals["prompt_tokens"] or 0
+    totals["output_tokens"] = totals["output_tokens"] or 0
+    totals["avg_latency_ms"] = round(totals["avg_latency_ms"] or 0)
+    totals["p50_latency_ms"] = _percentile(latencies, 50)
+    totals["p95_latency_ms"] = _percentile(latencies, 95)
+    totals["error_rate"] = round(totals["errors"] / totals["calls"], 4) if totals["calls"] else 0.0
+    totals["cost_usd"] = estimate_cost(totals["prompt_tokens"], totals["output_tokens"])
+
+    rows = list(
+        qs.values("enterprise_id", "enterprise__name")
+        .annotate(
+            calls=Count("id"),
+            errors=Count("id", filter=Q(outcome=LLMCall.OUTCOME_ERROR)),
+            on_save=Count("id", filter=Q(trigger=LLMCall.TRIGGER_SAVE)),
+            on_delete=Count("id", filter=Q(trigger=LLMCall.TRIGGER_DELETE)),
+            manual=Count("id", filter=Q(trigger=LLMCall.TRIGGER_MANUAL)),
+            prompt_tokens=Sum("prompt_tokens"),
+            output_tokens=Sum("output_tokens"),
+            avg_corpus_chars=Avg("corpus_chars"),
+            avg_latency_ms=Avg("latency_ms"),
+            max_latency_ms=Max("latency_ms"),
+            last_call=Max("created_at"),
+        )
+        .order_by()
+    )
+    for row in rows:
+        row["name"] = row.pop("enterprise__name") or "(empresa eliminada)"
+        row["prompt_tokens"] = row["prompt_tokens"] or 0
+        row["output_tokens"] = row["output_tokens"] or 0
+        row["avg_corpus_chars"] = round(row["avg_corpus_chars"] or 0)
+        row["avg_latency_ms"] = round(row["avg_latency_ms"] or 0)
+        row["cost_usd"] = estimate_cost(row["prompt_tokens"], row["output_tokens"])
+    rows.sort(key=lambda r: (r["cost_usd"], r["calls"]), reverse=True)
+    if top:
+        rows = rows[:top]
+
+    return {"days": days, "totals": totals, "enterprises": rows}
@@ -1,3 +1,1086 @@
-from django.test import TestCase
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from datetime import datetime, timedelta, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import autocomplete, comparison, dedup, extractive, page_cache, profiling, ranking, services, similarity, throttling, warmup
+from .auth_backends import user_cache_key
+from .forms import ReviewFilterForm
+from .summarizers import Summarizer, get_summarizer, gemini
+from .models import Comment, Enterprise, EnterpriseNeighbor, EnterpriseRanking, LSHBucket, Review, ReviewNeighbor, LLMCall, ReviewFingerprint
+from .telemetry import aggregate_stats
+
+
+def fake_response(text="Resumen.", prompt_tokens=1200, output_tokens=150):
+    """Respuesta mínima con la forma de google.genai (text + usage_metadata)."""
+    return SimpleNamespace(
+        text=text,
+        usage_metadata=SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+        ),
+    )
+
+
+def fake_client(response=None, error=None):
+    generate = mock.Mock(side_effect=error, return_value=response)
+    return SimpleNamespace(models=SimpleNamespace(generate_content=generate))
+
+
+# ============================================================
+# Telemetría de llamadas a la IA
+# ============================================================
+@mock.patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"})
+class LLMTelemetryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        Review.objects.create(enterprise=self.enterprise, title="Bien", body="Buen ambiente.", rating=4)
+
+    def test_successful_call_records_tokens_and_trigger(self):
+        with mock.patch.object(gemini, "get_client", return_value=fake_client(fake_response())):
+            summary = services.summarize_enterprise_reviews(self.enterprise, trigger=LLMCall.TRIGGER_SAVE)
+
+        self.assertEqual(summary, "Resumen.")
+        call = LLMCall.objects.get()
+        self.assertEqual(call.outcome, LLMCall.OUTCOME_OK)
+        self.assertEqual(call.trigger, LLMCall.TRIGGER_SAVE)
+        self.assertEqual((call.prompt_tokens, call.output_tokens), (1200, 150))
+        self.assertEqual(call.reviews_count, 1)
+        self.assertGreater(call.corpus_chars, 0)
+        self.assertGreater(call.cost_usd, 0)
+
+    def test_failed_call_is_recorded_as_error(self):
+        client = fake_client(error=ConnectionError("timeout"))
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            services.update_enterprise_summary(self.enterprise.pk, trigger=LLMCall.TRIGGER_DELETE)
+
+        call = LLMCall.objects.get()
+        self.assertEqual(call.outcome, LLMCall.OUTCOME_ERROR)
+        self.assertEqual(call.trigger, LLMCall.TRIGGER_DELETE)
+        self.assertIn("timeout", call.error)
+        self.assertIsNone(call.prompt_tokens)
+
+    def test_aggregate_stats_groups_by_enterprise(self):
+        other = Enterprise.objects.create(name="Globex")
+        LLMCall.objects.create(enterprise=self.enterprise, trigger="save", outcome="ok",
+                               prompt_tokens=1000, output_tokens=100, latency_ms=300)
+        LLMCall.objects.create(enterprise=self.enterprise, trigger="save", outcome="ok",
+                               prompt_tokens=3000, output_tokens=100, latency_ms=500)
+        LLMCall.objects.create(enterprise=other, trigger="manual", outcome="error", latency_ms=50)
+
+        stats = aggregate_stats(days=None)
+
+        self.assertEqual(stats["totals"]["calls"], 3)
+        self.assertEqual(stats["totals"]["errors"], 1)
+        self.assertEqual(stats["totals"]["prompt_tokens"], 4000)
+        top = stats["enterprises"][0]
+        self.assertEqual(top["name"], "Acme")
+        self.assertEqual((top["calls"], top["on_save"], top["avg_latency_ms"]), (2, 2, 400))
+
+    def test_llm_stats_command(self):
+        LLMCall.objects.create(enterprise=self.enterprise, trigger="save", outcome="ok",
+                               prompt_tokens=10, output_tokens=5, latency_ms=120)
+        out = StringIO()
+        call_command("llm_stats", "--days", "0", stdout=out)
+        self.assertIn("Acme", out.getvalue())
+
+    def test_staff_report_requires_staff(self):
+        url = reverse("llm_stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        User.objects.create_user("staff", password="pass12345", is_staff=True)
+        self.client.login(username="staff", password="pass12345")
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+# ============================================================
+# Resúmenes stale-while-revalidate
+# ============================================================
+@override_settings(AI_SUMMARY_REFRESH={"async": False, "retry_backoff": 300})
+@mock.patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"})
+class SummaryRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        Review.objects.create(enterprise=self.enterprise, title="Bien", body="Buen ambiente.", rating=4)
+
+    def refresh(self, client, **kwargs):
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            return services.update_enterprise_summary(self.enterprise.pk, **kwargs)
+
+    def test_success_stores_metadata(self):
+        self.assertTrue(self.refresh(fake_client(fake_response("Resumen v1."))))
+        self.enterprise.refresh_from_db()
+        self.assertEqual(self.enterprise.AI_summary, "Resumen v1.")
+        self.assertEqual(self.enterprise.summary_version, 1)
+        self.assertEqual(len(self.enterprise.summary_corpus_hash), 64)
+        self.assertIsNotNone(self.enterprise.summary_generated_at)
+        self.assertEqual(self.enterprise.summary_status, "fresh")
+
+    def test_failure_keeps_last_good_summary_and_marks_stale(self):
+        self.refresh(fake_client(fake_response("Resumen v1.")))
+        Review.objects.create(enterprise=self.enterprise, title="Mal", body="Salario bajo.", rating=2)
+
+        self.assertFalse(self.refresh(fake_client(error=ConnectionError("503"))))
+        self.enterprise.refresh_from_db()
+        self.assertEqual(self.enterprise.AI_summary, "Resumen v1.")
+        self.assertEqual(self.enterprise.summary_status, "stale")
+        self.assertEqual(self.enterprise.summary_version, 1)
+
+    def test_only_flagged_duplicates_clears_summary_without_llm_call(self):
+        self.refresh(fake_client(fake_response("Resumen v1.")))
+        original = Review.objects.create(enterprise=Enterprise.objects.create(name="Otra"), title="x", body="y")
+        for review in self.enterprise.reviews.all():
+            ReviewFingerprint.objects.update_or_create(
+                review=review, defaults={"signature": b"", "duplicate_of": original, "similarity": 0.8}
+            )
+        client = fake_client(fake_response("No debería."))
+        self.assertTrue(self.refresh(client))
+        client.models.generate_content.assert_not_called()
+        self.enterprise.refresh_from_db()
+        self.assertEqual((self.enterprise.AI_summary, self.enterprise.summary_status), ("", "empty"))
+        self.assertEqual(LLMCall.objects.count(), 1)
+
+    def test_unchanged_corpus_skips_llm_call(self):
+        self.refresh(fake_client(fake_response("Resumen v1.")))
+        client = fake_client(fake_response("Resumen v2."))
+        self.assertTrue(self.refresh(client))
+        client.models.generate_content.assert_not_called()
+
+        self.assertTrue(self.refresh(client, force=True))
+        client.models.generate_content.assert_called_once()
+
+    def test_stale_page_serves_old_summary_and_schedules_refresh(self):
+        Enterprise.objects.filter(pk=self.enterprise.pk).update(AI_summary="Resumen viejo.", summary_stale=True)
+        client = fake_client(fake_response("Resumen nuevo."))
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            resp = self.client.get(reverse("enterprise_experiences", args=[self.enterprise.pk]))
+
+        self.assertContains(resp, "Resumen viejo.")
+        self.assertContains(resp, "Actualizando")
+        self.enterprise.refresh_from_db()
+        self.assertEqual(self.enterprise.AI_summary, "Resumen nuevo.")
+
+    def test_failed_refresh_backs_off_until_lock_expires(self):
+        client = fake_client(error=ConnectionError("503"))
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            self.assertTrue(services.schedule_summary_refresh(self.enterprise.pk))
+            self.assertFalse(services.schedule_summary_refresh(self.enterprise.pk))
+        client.models.generate_content.assert_called_once()
+
+    def test_change_marked_while_releasing_lock_is_not_lost(self):
+        lock = services._refresh_lock_key(self.enterprise.pk)
+        pending = services._refresh_pending_key(self.enterprise.pk)
+        delete = cache.delete
+        raced = []
+
+        def delete_then_race(key, *args, **kwargs):
+            # Justo antes de liberar el candado, otra petición lo ve tomado y marca "pendiente"
+            if key == lock and not raced:
+                raced.append(True)
+                cache.set(pending, True)
+            return delete(key, *args, **kwargs)
+
+        with mock.patch.object(services, "update_enterprise_summary", return_value=True) as update, \
+                mock.patch.object(services.cache, "delete", side_effect=delete_then_race):
+            self.assertTrue(services.schedule_summary_refresh(self.enterprise.pk))
+        self.assertEqual(update.call_count, 2)
+        self.assertIsNone(cache.get(lock))
+
+    def test_refresh_summaries_command_retries_only_stale(self):
+        fresh = Enterprise.objects.create(name="Globex", AI_summary="Ok.")
+        Review.objects.create(enterprise=fresh, title="x", body="y", rating=3)
+        Enterprise.objects.filter(pk=self.enterprise.pk).update(summary_stale=True)
+
+        client = fake_client(fake_response("Reintento."))
+        with mock.patch.object(gemini, "get_client", return_value=client):
+            call_command("refresh_summaries", stdout=StringIO())
+
+        client.models.generate_content.assert_called_once()
+        self.assertFalse(Enterprise.objects.filter(summary_stale=True).exists())
+
+
+# ============================================================
+# Pre-resumen extractivo (TF-IDF + MMR)
+# ============================================================
+class ExtractiveTests(TestCase):
+    REVIEWS = [
+        {"rating": 5, "body": "El ambiente laboral es excelente y el equipo ayuda mucho. Hay aprendizaje constante en proyectos reales."},
+        {"rating": 5, "body": "El ambiente laboral es excelente y el equipo ayuda mucho. El salario es competitivo para la ciudad."},
+        {"rating": 4, "body": "El ambiente laboral es excelente y el equipo colabora siempre. Los horarios son flexibles casi siempre."},
+        {"rating": 1, "body": "Los jefes gritan en las reuniones semanales. El salario llega tarde todos los meses sin explicación."},
+    ]
+
+    def test_extract_covers_every_band_within_budget(self):
+        text = extractive.build_extract(self.REVIEWS, token_budget=80)
+        self.assertIn("positivas", text)
+        self.assertIn("negativas", text)
+        self.assertNotIn("intermedias", text)
+        lines = [l for l in text.splitlines() if l.startswith("- ")]
+        self.assertLessEqual(sum(extractive.estimate_tokens(l[2:]) for l in lines), 80)
+
+    def test_mmr_prefers_novel_sentence_over_near_duplicate(self):
+        import numpy as np
+        X = np.array([[1.0, 0.0, 0.0], [0.85, 0.527, 0.0], [0.7, 0.0, 0.714]], dtype=np.float32)
+        X /= np.linalg.norm(X, axis=1, keepdims=True)
+        costs = np.array([10, 10, 10])
+        # Solo relevancia: toma los dos parecidos; con MMR, el que aporta algo nuevo
+        self.assertEqual(extractive.mmr_select(X, costs, 20, mmr_lambda=1.0), [0, 1])
+        self.assertEqual(extractive.mmr_select(X, costs, 20, mmr_lambda=0.7), [0, 2])
+
+    def test_candidates_are_capped_before_vectorizing(self):
+        reviews = [{"rating": 5, "body": f"El equipo apoya siempre en el proyecto {i}. Codigo{i} unico raro{i} aislado{i}."}
+                   for i in range(50)]
+        with mock.patch.object(extractive, "tfidf_matrix", wraps=extractive.tfidf_matrix) as tfidf:
+            picked = extractive.select_sentences(reviews, token_budget=200, max_candidates=10)
+        self.assertEqual(len(tfidf.call_args.args[0]), 10)
+        # Se conservan las representativas (términos compartidos), no las aisladas
+        self.assertTrue(all("equipo" in s for s in picked["positive"]))
+
+    @override_settings(AI_EXTRACTIVE={"enabled": True, "token_budget": 100, "mmr_lambda": 0.7})
+    def test_large_corpus_is_replaced_by_extract(self):
+        enterprise = Enterprise.objects.create(name="Acme")
+        # Textos repetidos a propósito: sin indexar, para que no se marquen como duplicados
+        with mock.patch("experiences.signals.index_review"):
+            for i in range(30):
+                Review.objects.create(enterprise=enterprise, title=f"R{i}", rating=4,
+                                      body="Buen ambiente y compañeros atentos siempre. " * 5)
+        corpus = services.build_corpus(enterprise)
+        self.assertIn("Reseñas positivas", corpus)
+        self.assertLess(len(corpus), 600)
+
+    @override_settings(AI_EXTRACTIVE={"enabled": True, "token_budget": 100, "mmr_lambda": 0.7})
+    def test_empty_extract_falls_back_to_truncated_corpus(self):
+        enterprise = Enterprise.objects.create(name="Acme")
+        # Oraciones de menos de 4 palabras: el extracto queda vacío
+        with mock.patch("experiences.signals.index_review"):
+            for i in range(30):
+                Review.objects.create(enterprise=enterprise, title=f"R{i}", rating=4, body="Muy buena. Recomendada.")
+        corpus = services.build_corpus(enterprise)
+        self.assertIn("Muy buena", corpus)
+        self.assertTrue(corpus.endswith("[TRUNCADO]"))
+        self.assertLessEqual(len(corpus), 100 * 4 + len("\n\n[TRUNCADO]"))
+
+    @mock.patch.dict(os.environ, {"GEMINI_API_KEY": ""})
+    def test_offline_summary_without_api_key(self):
+        enterprise = Enterprise.objects.create(name="Acme")
+        for r in self.REVIEWS:
+            Review.objects.create(enterprise=enterprise, title="x", **r)
+        with mock.patch.object(gemini, "get_client") as get_client:
+            summary = services.summarize_enterprise_reviews(enterprise)
+        get_client.assert_not_called()
+        self.assertIn("Resumen extractivo de 4 reviews", summary)
+        self.assertEqual(LLMCall.objects.get().model_name, "extractive")
+
+
+# ============================================================
+# Casi duplicados (MinHash + LSH)
+# ============================================================
+class DedupTests(TestCase):
+    BODY = ("Trabajé dos años en el área de soporte, el ambiente era bueno pero los turnos "
+            "nocturnos eran agotadores y el salario llegaba con retraso casi todos los meses.")
+
+    def setUp(self):
+        self.user = User.objects.create_user("ana", password="pass12345")
+        self.other = User.objects.create_user("beto", password="pass12345")
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        self.original = Review.objects.create(enterprise=self.enterprise, author=self.other,
+                                              title="Soporte", body=self.BODY, rating=3)
+
+    def post_review(self, body, enterprise=None):
+        self.client.force_login(self.user)
+        url = reverse("review_create", args=[(enterprise or self.enterprise).pk])
+        return self.client.post(url, {"title": "Copia", "body": body, "rating": 5})
+
+    def test_save_indexes_signature_and_buckets(self):
+        fp = self.original.fingerprint
+        self.assertEqual(len(dedup.decode(fp.signature)), 128)
+        self.assertEqual(self.original.lsh_buckets.count(), 32)
+
+    def test_exact_copy_is_rejected(self):
+        resp = self.post_review(self.BODY)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "casi idéntica")
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_light_edit_is_flagged_not_rejected(self):
+        edited = self.BODY.replace("dos años", "tres años").replace("casi todos los meses", "casi siempre")
+        resp = self.post_review(edited)
+        self.assertEqual(resp.status_code, 302)
+        review = Review.objects.exclude(pk=self.original.pk).get()
+        self.assertEqual(review.fingerprint.duplicate_of_id, self.original.pk)
+
+    def test_same_text_other_enterprise_other_author_is_allowed(self):
+        other_enterprise = Enterprise.objects.create(name="Globex")
+        self.assertEqual(self.post_review(self.BODY, other_enterprise).status_code, 302)
+
+    def test_unrelated_review_is_not_a_candidate(self):
+        sig = dedup.minhash("La cafetería tiene opciones saludables y el gimnasio abre temprano los lunes.")
+        self.assertEqual(dedup.find_candidates(sig), [])
+
+    def test_flagged_reviews_are_left_out_of_corpus(self):
+        dup = Review.objects.create(enterprise=self.enterprise, author=self.user, title="Dup",
+                                    body=self.BODY + " Nada más.", rating=1)
+        self.assertTrue(dup.fingerprint.is_flagged)
+        self.assertNotIn("Dup", services.build_corpus(self.enterprise))
+
+    def test_dedupe_command_flags_and_deletes_existing_duplicates(self):
+        ReviewFingerprint.objects.all().delete()
+        with mock.patch("experiences.signals.index_review"):
+            Review.objects.create(enterprise=self.enterprise, author=self.other, title="Copia",
+                                  body=self.BODY, rating=5)
+        call_command("dedupe_reviews", "--delete", stdout=StringIO())
+        self.assertEqual(list(Review.objects.values_list("pk", flat=True)), [self.original.pk])
+        self.assertTrue(ReviewFingerprint.objects.filter(review=self.original).exists())
+
+    def test_original_edited_after_a_copy_exists(self):
+        cache.clear()
+        copy = Review.objects.create(enterprise=self.enterprise, author=self.user, title="Copia",
+                                     body=self.BODY + " Nada más.", rating=5)
+        self.assertEqual(copy.fingerprint.duplicate_of_id, self.original.pk)
+
+        # El autor original cambia solo la calificación: no se rechaza
+        self.client.force_login(self.other)
+        resp = self.client.post(reverse("edit_review", args=[self.original.pk]),
+                                {"title": "Soporte", "body": self.BODY, "rating": 4})
+        self.assertEqual(resp.status_code, 302)
+        # Un save() completo reindexa, pero no contra reviews posteriores
+        self.original.refresh_from_db()
+        self.original.save()
+        self.assertFalse(ReviewFingerprint.objects.get(review=self.original).is_flagged)
+        self.assertEqual(self.enterprise.reviews_count, 1)
+
+        # También al editar el cuerpo del original
+        resp = self.client.post(reverse("edit_review", args=[self.original.pk]),
+                                {"title": "Soporte", "body": self.BODY + " Editado.", "rating": 4})
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(ReviewFingerprint.objects.get(review=self.original).is_flagged)
+
+    def test_flagged_reviews_do_not_count_in_stats(self):
+        cache.clear()
+        dup = Review.objects.create(enterprise=self.enterprise, author=self.user, title="Dup",
+                                    body=self.BODY + " Nada más.", rating=1)
+        self.assertTrue(dup.fingerprint.is_flagged)
+        self.assertEqual((self.enterprise.reviews_count, self.enterprise.average_rating), (1, 3))
+        self.assertEqual(page_cache.enterprise_stats([self.enterprise.pk])[self.enterprise.pk], (1, 3))
+        row = EnterpriseRanking.objects.get(pk=self.enterprise.pk)
+        self.assertEqual((row.reviews_count, row.rating_sum), (1, 3))
+        dup.delete()
+        row.refresh_from_db()
+        self.assertEqual((row.reviews_count, row.rating_sum), (1, 3))
+
+    def test_dedupe_command_drops_stale_and_orphaned_fingerprints(self):
+        emptied = Review.objects.create(enterprise=self.enterprise, title="Vacía", body="Otra review distinta.", rating=4)
+        Review.objects.filter(pk=emptied.pk).update(body="")
+        LSHBucket.objects.create(key=1, review_id=999999)  # review borrada con SQL directo
+        call_command("dedupe_reviews", stdout=StringIO())
+        self.assertFalse(ReviewFingerprint.objects.filter(review=emptied).exists())
+        self.assertFalse(LSHBucket.objects.filter(review_id__in=[emptied.pk, 999999]).exists())
+        self.assertEqual(self.original.lsh_buckets.count(), 32)
+
+
+# ============================================================
+# Autocompletado de empresas
+# ============================================================
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bogota = Enterprise.objects.create(name="Banco de Bogotá")
+        self.bancolombia = Enterprise.objects.create(name="Bancolombia")
+        self.globant = Enterprise.objects.create(name="Globant")
+        for i in range(3):
+            Review.objects.create(enterprise=self.bancolombia, title="x", body=f"Texto {i}", rating=4)
+        Review.objects.create(enterprise=self.bogota, title="x", body="Texto", rating=4)
+
+    def names(self, q, **kwargs):
+        return [e.name for e in autocomplete.search(q, **kwargs)]
+
+    def test_prefix_ranked_by_review_count(self):
+        self.assertEqual(self.names("ban"), ["Bancolombia", "Banco de Bogotá"])
+        self.assertEqual(self.names("b"), ["Bancolombia", "Banco de Bogotá"])
+
+    def test_flagged_duplicates_do_not_raise_rank(self):
+        original = Review.objects.get(enterprise=self.bogota)
+        for i in range(3):
+            copy = Review.objects.create(enterprise=self.bogota, title="x", body=f"Copia {i}", rating=5)
+            ReviewFingerprint.objects.update_or_create(
+                review=copy, defaults={"signature": b"", "duplicate_of": original, "similarity": 0.8}
+            )
+        self.assertEqual(self.names("ban"), ["Bancolombia", "Banco de Bogotá"])
+        counts = {e.name: e.reviews_count for e in autocomplete.build_index(top_k=5).entries}
+        self.assertEqual(counts["Banco de Bogotá"], 1)
+
+    def test_accent_and_case_folding_and_inner_words(self):
+        self.assertEqual(self.names("BOGOTA"), ["Banco de Bogotá"])
+        self.assertEqual(self.names("bogotá"), ["Banco de Bogotá"])
+        self.assertEqual(self.names("xyz"), [])
+
+    def test_enterprise_signals_invalidate_index(self):
+        self.assertEqual(self.names("glob"), ["Globant"])
+        Enterprise.objects.create(name="Globex")
+        self.assertEqual(self.names("glob"), ["Globant", "Globex"])
+        self.globant.delete()
+        self.assertEqual(self.names("glob"), ["Globex"])
+
+    def test_search_does_not_query_db_once_built(self):
+        autocomplete.search("b")
+        with self.assertNumQueries(0):
+            autocomplete.search("banc")
+
+    def test_endpoint_returns_json(self):
+        resp = self.client.get(reverse("enterprise_autocomplete"), {"q": "banco", "limit": 1})
+        data = resp.json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["name"], "Bancolombia")
+        self.assertEqual(data["results"][0]["reviews_count"], 3)
+
+
+@override_settings(SIMILARITY={"n_features": 256, "k": 2, "block_size": 2, "min_score": 0.1})
+class SimilarityTests(TestCase):
+    def setUp(self):
+        self.tech = Enterprise.objects.create(name="Tech")
+        self.soft = Enterprise.objects.create(name="Soft")
+        self.food = Enterprise.objects.create(name="Food")
+        self.salary = Review.objects.create(
+            enterprise=self.tech, title="Salario", body="El salario es alto y los bonos llegan puntuales", rating=5
+        )
+        self.salary2 = Review.objects.create(
+            enterprise=self.soft, title="Salario", body="Buen salario, bonos puntuales cada trimestre", rating=4
+        )
+        self.kitchen = Review.objects.create(
+            enterprise=self.food, title="Cocina", body="Turnos nocturnos en la cocina y mucho calor", rating=2
+        )
+        self.kitchen2 = Review.objects.create(
+            enterprise=self.food, title="Turnos", body="La cocina exige turnos nocturnos muy largos", rating=2
+        )
+
+    def neighbor_ids(self, review):
+        return list(review.neighbors.values_list("neighbor_id", flat=True))
+
+    def test_topk_blocks_matches_brute_force(self):
+        X = similarity.vectorize(
+            ["salario alto bonos", "salario bonos puntuales", "cocina turnos calor", "turnos cocina noche", "salario cocina"],
+            n_features=64,
+        )
+        S = X @ X.T
+        np.fill_diagonal(S, -np.inf)
+        for block, idx, scores in similarity.topk_blocks(X, range(5), k=2, block_size=2):
+            for row, nbrs, sc in zip(block, idx, scores):
+                np.testing.assert_allclose(sc, np.sort(S[row])[::-1][:2], rtol=1e-6)
+                np.testing.assert_allclose(S[row, nbrs], sc, rtol=1e-6)
+
+    def test_full_build_persists_nearest_neighbors(self):
+        stats = similarity.build_full()
+        self.assertEqual(stats["reviews"], 4)
+        self.assertEqual(self.neighbor_ids(self.salary)[0], self.salary2.pk)
+        self.assertEqual(self.neighbor_ids(self.kitchen)[0], self.kitchen2.pk)
+        self.assertEqual(
+            list(self.tech.neighbors.values_list("neighbor_id", flat=True)[:1]), [self.soft.pk]
+        )
+
+    def test_incremental_adds_new_review_and_updates_existing_lists(self):
+        similarity.build_full()
+        newer = Review.objects.create(
+            enterprise=self.tech, title="Bonos", body="Los bonos y el salario alto llegan puntuales", rating=5
+        )
+        stats = similarity.build_incremental()
+        self.assertEqual(stats["new_reviews"], 1)
+        self.assertIn(self.salary.pk, self.neighbor_ids(newer))
+        self.assertIn(newer.pk, self.neighbor_ids(self.salary))
+        # Sin reviews nuevas no hay trabajo
+        self.assertEqual(similarity.build_incremental()["new_reviews"], 0)
+
+    def test_incremental_only_vectorizes_new_and_edited_reviews(self):
+        similarity.build_full()
+        self.salary2.title = "Cocina"
+        self.salary2.body = "La cocina exige turnos nocturnos y mucho calor"
+        self.salary2.save()
+        with mock.patch.object(similarity, "term_frequencies", wraps=similarity.term_frequencies) as tf:
+            stats = similarity.build_incremental()
+        self.assertEqual(tf.call_args.args[0], [f"Cocina. {self.salary2.body}"])
+        self.assertEqual((stats["new_reviews"], stats["refreshed_lists"]), (1, 1))
+        self.assertNotEqual(self.neighbor_ids(self.salary)[:1], [self.salary2.pk])
+        self.assertIn(self.salary2.pk, self.neighbor_ids(self.kitchen))
+
+    def test_flagged_duplicates_are_left_out_of_neighbors(self):
+        similarity.build_full()
+        ReviewFingerprint.objects.update_or_create(
+            review=self.salary2, defaults={"signature": b"", "duplicate_of": self.salary, "similarity": 0.8}
+        )
+        resp = self.client.get(reverse("review_detail", args=[self.salary.pk]))
+        self.assertNotContains(resp, reverse("review_detail", args=[self.salary2.pk]))
+
+        similarity.build_incremental()
+        self.assertFalse(ReviewNeighbor.objects.filter(review=self.salary2).exists())
+        self.assertFalse(ReviewNeighbor.objects.filter(neighbor=self.salary2).exists())
+
+    def test_pages_read_precomputed_neighbors(self):
+        call_command("build_similarity", "--full", stdout=StringIO())
+        resp = self.client.get(reverse("review_detail", args=[self.salary.pk]))
+        self.assertContains(resp, "Reviews similares")
+        self.assertContains(resp, reverse("review_detail", args=[self.salary2.pk]))
+        resp = self.client.get(reverse("enterprise_experiences", args=[self.tech.pk]))
+        self.assertContains(resp, reverse("enterprise_experiences", args=[self.soft.pk]))
+        self.assertTrue(EnterpriseNeighbor.objects.exists())
+        # Solo se guardan vecinos por encima de min_score, como mucho k
+        self.assertLessEqual(ReviewNeighbor.objects.filter(review=self.salary).count(), 2)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        override = override_settings(PROFILING={"dir": self.dir, "keep": 2, "stack_depth": 4})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.staff = User.objects.create(username="staff", is_staff=True)
+        self.user = User.objects.create(username="ana")
+        Enterprise.objects.create(name="Acme")
+
+    def captures(self):
+        return sorted(os.listdir(self.dir))
+
+    def test_staff_request_is_profiled(self):
+        self.client.force_login(self.staff)
+        resp = self.client.get(reverse("index"), {"_profile": "1"})
+        name = resp["X-Profile-Id"]
+        self.assertEqual(self.captures(), [f"{name}.json", f"{name}.prof"])
+
+        with open(os.path.join(self.dir, f"{name}.json")) as fh:
+            meta = json.load(fh)
+        self.assertEqual(meta["status"], 200)
+        self.assertGreater(meta["sql_count"], 0)
+        # El origen de cada SQL apunta al código del proyecto
+        self.assertTrue(any("experiences/views.py" in o for q in meta["queries"] for o in q["origin"]))
+        self.assertIn("experiences/index.html", [t["name"] for t in meta["templates"]])
+
+    def test_header_trigger_and_pruning(self):
+        self.client.force_login(self.staff)
+        for _ in range(3):
+            self.client.get(reverse("index"), HTTP_X_PROFILE="1")
+        self.assertEqual(len(self.captures()), 4)  # keep=2 capturas (.prof + .json)
+
+    def test_not_triggered_or_not_staff_skips_profiler(self):
+        with mock.patch("experiences.profiling.cProfile.Profile") as profile:
+            self.client.get(reverse("index"), {"_profile": "1"})
+            self.client.force_login(self.user)
+            self.client.get(reverse("index"), {"_profile": "1"})
+            self.client.force_login(self.staff)
+            resp = self.client.get(reverse("index"))
+        profile.assert_not_called()
+        self.assertNotIn("X-Profile-Id", resp)
+        self.assertEqual(self.captures(), [])
+
+    def test_staff_page_lists_and_serves_captures(self):
+        self.client.force_login(self.staff)
+        name = self.client.get(reverse("index"), {"_profile": "1"})["X-Profile-Id"]
+        resp = self.client.get(reverse("profile_captures"))
+        self.assertContains(resp, name)
+        resp = self.client.get(reverse("profile_capture_download", args=[f"{name}.prof"]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            self.client.get(reverse("profile_capture_download", args=["..settings.py"])).status_code, 404
+        )
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("profile_captures")).status_code, 302)
+
+
+# ============================================================
+# Backends de resumen
+# ============================================================
+class IncompleteSummarizer(Summarizer):
+    """Backend sin summarize(): no debe poder instanciarse."""
+
+    name = "incompleto"
+
+
+class SummarizerBackendTests(TestCase):
+    def setUp(self):
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        Review.objects.create(enterprise=self.enterprise, title="Bien", body="Buen ambiente.", rating=4)
+
+    def test_auto_selects_by_api_key(self):
+        with mock.patch.dict(os.environ, {"GEMINI_API_KEY": "test-key"}):
+            self.assertEqual(get_summarizer().name, "gemini")
+        with mock.patch.dict(os.environ, {"GEMINI_API_KEY": ""}):
+            self.assertEqual(get_summarizer().name, "extractive")
+
+    @override_settings(SUMMARIZER_BACKEND="experiences.summarizers.fake.FakeSummarizer")
+    def test_dotted_path_and_fake_backend_is_deterministic(self):
+        self.assertEqual(get_summarizer().name, "fake")
+        first = services.summarize_enterprise_reviews(self.enterprise)
+        self.assertEqual(first, services.summarize_enterprise_reviews(self.enterprise))
+        self.assertEqual(first, "Resumen simulado para Acme (1 reviews).")
+        call = LLMCall.objects.first()
+        self.assertEqual(call.model_name, "fake")
+        self.assertGreater(call.prompt_tokens, 0)
+
+    def test_incomplete_backend_fails_when_selected(self):
+        with override_settings(SUMMARIZER_BACKEND="experiences.tests.IncompleteSummarizer"):
+            with self.assertRaises(TypeError):
+                get_summarizer()
+
+    @override_settings(SUMMARIZER_BACKEND="experiences.summarizers.missing.Backend")
+    def test_unknown_backend_keeps_summary_stale(self):
+        self.assertFalse(services.update_enterprise_summary(self.enterprise.pk))
+        self.enterprise.refresh_from_db()
+        self.assertTrue(self.enterprise.summary_stale)
+        self.assertEqual(LLMCall.objects.get().outcome, LLMCall.OUTCOME_ERROR)
+
+    def test_startup_does_not_import_sdk(self):
+        code = (
+            "import sys, django; django.setup(); import experiences.services, experiences.views; "
+            "print('google.genai' in sys.modules)"
+        )
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": "askmejobs.settings", "GEMINI_API_KEY": "x"}
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env,
+                             cwd=os.path.dirname(os.path.dirname(__file__)), check=True)
+        self.assertEqual(out.stdout.strip(), "False")
+
+
+# ============================================================
+# Límites de escritura
+# ============================================================
+@override_settings(THROTTLE_RATES={
+    "review_create": {"user": "2/h", "enterprise": "3/h"},
+    "comment_create": {"ip": "1/m"},
+    "test": {"user": "10/m"},
+})
+class ThrottlingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        self.ana = User.objects.create(username="ana")
+        self.beto = User.objects.create(username="beto")
+
+    def post_review(self, user, i):
+        self.client.force_login(user)
+        return self.client.post(
+            reverse("review_create", args=[self.enterprise.pk]),
+            {"title": f"R{i}", "body": f"Experiencia número {i} en la empresa", "rating": 4},
+        )
+
+    def test_parse_rate(self):
+        self.assertEqual(throttling.parse_rate("5/h"), throttling.Rate(5, 3600))
+        self.assertEqual(throttling.parse_rate("20/10m"), throttling.Rate(20, 600))
+
+    def test_user_limit_returns_429_with_retry_after(self):
+        self.assertEqual(self.post_review(self.ana, 1).status_code, 302)
+        self.assertEqual(self.post_review(self.ana, 2).status_code, 302)
+        resp = self.post_review(self.ana, 3)
+        self.assertEqual(resp.status_code, 429)
+        self.assertGreater(int(resp["Retry-After"]), 0)
+        self.assertEqual(Review.objects.count(), 2)
+        # Las lecturas no cuentan
+        self.assertEqual(self.client.get(reverse("review_create", args=[self.enterprise.pk])).status_code, 200)
+
+    def test_enterprise_limit_applies_across_users(self):
+        self.post_review(self.ana, 1)
+        self.post_review(self.ana, 2)
+        self.assertEqual(self.post_review(self.beto, 3).status_code, 302)
+        self.assertEqual(self.post_review(self.beto, 4).status_code, 429)
+
+    def test_comment_limit_by_ip(self):
+        review = Review.objects.create(enterprise=self.enterprise, title="x", body="Texto", rating=3)
+        self.client.force_login(self.ana)
+        url = reverse("review_detail", args=[review.pk])
+        self.assertEqual(self.client.post(url, {"text": "Uno"}).status_code, 302)
+        self.client.force_login(self.beto)
+        self.assertEqual(self.client.post(url, {"text": "Dos"}).status_code, 429)
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_sliding_window_and_rejections_not_counted(self):
+        start = 6000.0  # inicio de una ventana de 60 s
+        for _ in range(10):
+            self.assertIsNone(throttling.check("test", {"user": 1}, now=start + 50))
+        self.assertIsNotNone(throttling.check("test", {"user": 1}, now=start + 55))
+        # Al empezar la ventana siguiente la anterior todavía pesa casi entera
+        self.assertIsNotNone(throttling.check("test", {"user": 1}, now=start + 61))
+        # A mitad de ventana pesa la mitad: caben 5 más
+        for _ in range(5):
+            self.assertIsNone(throttling.check("test", {"user": 1}, now=start + 90))
+        self.assertIsNotNone(throttling.check("test", {"user": 1}, now=start + 90))
+
+    def test_retry_after(self):
+        rate = throttling.Rate(5, 3600)
+        # Ventana actual llena: hay que esperar a la siguiente y a que la actual pese menos
+        self.assertEqual(throttling.retry_after(0, 5, 100, rate), 3500 + 720)
+        # La anterior llena y la actual vacía: basta con que la anterior pierda 1/5 de peso
+        self.assertEqual(throttling.retry_after(5, 0, 0, rate), 720)
+
+
+# ============================================================
+# Sesiones y usuario en caché
+# ============================================================
+class SessionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="ana")
+        Enterprise.objects.create(name="Acme")
+        self.url = reverse("index")
+        # Con la caché vacía (agregados por calcular) y ya llena
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as anonymous:
+            self.client.get(self.url)
+        self.cold_queries = len(cold)
+        self.anonymous_queries = len(anonymous)
+
+    def test_logged_in_request_has_no_session_or_user_queries(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)  # primera petición: carga el usuario en la caché
+        with self.assertNumQueries(self.anonymous_queries):
+            resp = self.client.get(self.url)
+        self.assertEqual(resp.context["user"], self.user)
+
+    def test_sessions_opened_with_model_backend_stay_logged_in(self):
+        # Sesión iniciada antes de activar CachedModelBackend
+        self.client.force_login(self.user, backend="django.contrib.auth.backends.ModelBackend")
+        self.assertEqual(self.client.get(self.url).context["user"], self.user)
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.db",
+        AUTHENTICATION_BACKENDS=["django.contrib.auth.backends.ModelBackend"],
+    )
+    def test_default_backends_cost_two_queries_per_request(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(self.anonymous_queries + 2):
+            self.client.get(self.url)
+
+    def test_session_survives_cache_loss(self):
+        self.client.force_login(self.user)
+        cache.clear()
+        with self.assertNumQueries(self.cold_queries + 2):
+            resp = self.client.get(self.url)
+        self.assertTrue(resp.context["user"].is_authenticated)
+
+    def test_user_changes_invalidate_cache(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("llm_stats")).status_code, 302)
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse("llm_stats")).status_code, 200)
+
+        # Cambio de clave: la sesión deja de ser válida
+        self.user.set_password("otra-clave-segura")
+        self.user.save()
+        self.assertFalse(self.client.get(self.url).context["user"].is_authenticated)
+
+    def test_logout_forgets_cached_user(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        self.client.get(reverse("logout"))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+
+# ============================================================
+# Listado de reviews: filtros, orden e índices
+# ============================================================
+class ReviewListingTests(TestCase):
+    def setUp(self):
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        self.reviews = []
+        for i, (rating, day) in enumerate([(5, 1), (2, 10), (4, 20), (5, 40)]):
+            r = Review.objects.create(enterprise=self.enterprise, title=f"R{i}", body=f"Texto {i}", rating=rating)
+            Review.objects.filter(pk=r.pk).update(created_at=datetime(2025, 1, 1, tzinfo=dt_timezone.utc) + timedelta(days=day))
+            self.reviews.append(r)
+        Comment.objects.create(review=self.reviews[1], text="a")
+        Comment.objects.create(review=self.reviews[1], text="b")
+        Comment.objects.create(review=self.reviews[2], text="c")
+
+    def titles(self, **data):
+        return [r.title for r in ReviewFilterForm(data).apply(self.enterprise.reviews.all())]
+
+    def test_comments_count_follows_comment_signals(self):
+        self.reviews[1].refresh_from_db()
+        self.assertEqual(self.reviews[1].comments_count, 2)
+        Comment.objects.filter(review=self.reviews[1]).first().delete()
+        self.reviews[1].refresh_from_db()
+        self.assertEqual(self.reviews[1].comments_count, 1)
+
+    def test_sorts_and_filters(self):
+        self.assertEqual(self.titles(), ["R3", "R2", "R1", "R0"])
+        self.assertEqual(self.titles(sort="oldest"), ["R0", "R1", "R2", "R3"])
+        self.assertEqual(self.titles(sort="highest"), ["R3", "R0", "R2", "R1"])
+        self.assertEqual(self.titles(sort="lowest"), ["R1", "R2", "R0", "R3"])
+        self.assertEqual(self.titles(sort="comments"), ["R1", "R2", "R3", "R0"])
+        self.assertEqual(self.titles(rating="5"), ["R3", "R0"])
+        self.assertEqual(self.titles(date_from="2025-01-05", date_to="2025-01-21"), ["R2", "R1"])
+        # Datos inválidos: listado por defecto
+        self.assertEqual(self.titles(date_from="2025-02-01", date_to="2025-01-01"), ["R3", "R2", "R1", "R0"])
+
+    def test_every_combination_is_served_by_an_index_without_temp_btree(self):
+        for sort, rating, dated in itertools.product(ReviewFilterForm.SORTS, ["", "4"], [False, True]):
+            data = {"sort": sort, "rating": rating}
+            if dated:
+                data.update(date_from="2025-01-05", date_to="2025-06-30")
+            qs = ReviewFilterForm(data).apply(self.enterprise.reviews.select_related("author"))
+            sql, params = qs[:20].query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = " | ".join(row[-1] for row in cursor.fetchall())
+            with self.subTest(sort=sort, rating=rating, dated=dated):
+                # "Más comentadas" con fechas ordena en memoria solo las filas del rango
+                if not (sort == "comments" and dated):
+                    self.assertNotIn("TEMP B-TREE", plan)
+                self.assertRegex(plan, r"SEARCH experiences_review USING INDEX experiences_enterpr_\w+_idx")
+
+    def test_rating_out_of_range_is_rejected_by_the_database(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Review.objects.filter(pk=self.reviews[0].pk).update(rating=0)
+        # Así el filtro "rating IN (1..5)" de los órdenes por estrellas no excluye nada
+        self.assertEqual(len(self.titles(sort="highest")), Review.objects.filter(enterprise=self.enterprise).count())
+
+    def test_view_paginates_and_keeps_filters(self):
+        with mock.patch("experiences.views.REVIEWS_PER_PAGE", 1):
+            resp = self.client.get(reverse("enterprise_experiences", args=[self.enterprise.pk]),
+                                   {"sort": "highest", "rating": "5"})
+        self.assertContains(resp, "R3")
+        self.assertNotContains(resp, "R0</h5>")
+        self.assertContains(resp, "sort=highest&amp;rating=5&amp;page=2")
+
+
+# ============================================================
+# Rankings: promedio bayesiano y actividad con decaimiento
+# ============================================================
+class RankingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.one = Enterprise.objects.create(name="Una review")
+        self.many = Enterprise.objects.create(name="Muchas reviews")
+        self.bad = Enterprise.objects.create(name="Mal valorada")
+        Review.objects.create(enterprise=self.one, title="T", body="Excelente.", rating=5)
+        for i in range(10):
+            Review.objects.create(enterprise=self.many, title=f"M{i}", body="Muy bien.", rating=5 if i % 5 else 4)
+            Review.objects.create(enterprise=self.bad, title=f"B{i}", body="Muy mal.", rating=1)
+
+    def rows(self):
+        return {
+            r.enterprise_id: (r.reviews_count, r.rating_sum, round(r.bayes_rating, 6), round(r.trend_log, 6))
+            for r in EnterpriseRanking.objects.all()
+        }
+
+    def test_bayesian_average_prefers_volume(self):
+        order = [r.enterprise_id for r in ranking.best_rated()]
+        self.assertEqual(order, [self.many.pk, self.one.pk, self.bad.pk])
+        row = EnterpriseRanking.objects.get(pk=self.one.pk)
+        self.assertAlmostEqual(row.bayes_rating, (5 * 3.0 + 5) / 6)
+
+    def test_incremental_updates_match_rebuild(self):
+        review = Review.objects.filter(enterprise=self.one).first()
+        Comment.objects.create(review=review, text="Coincido.")
+        Review.objects.filter(enterprise=self.bad).first().delete()
+        edited = Review.objects.filter(enterprise=self.many).first()
+        edited.rating = 1
+        edited.save()
+        incremental = self.rows()
+        self.assertEqual(incremental[self.bad.pk][:2], (9, 9))
+
+        ranking.rebuild()
+        rebuilt = self.rows()
+        for pk in (self.one.pk, self.many.pk):
+            self.assertEqual(incremental[pk], rebuilt[pk])
+        # Las bajas descuentan estrellas pero no la actividad ya registrada
+        self.assertEqual(incremental[self.bad.pk][:3], rebuilt[self.bad.pk][:3])
+        self.assertGreater(incremental[self.bad.pk][3], rebuilt[self.bad.pk][3])
+
+    def test_missing_row_is_seeded_from_existing_activity(self):
+        # Empresa cargada antes de la tabla (o con la fila borrada)
+        EnterpriseRanking.objects.filter(pk=self.many.pk).delete()
+        Comment.objects.create(review=Review.objects.filter(enterprise=self.many).first(), text="Coincido.")
+        seeded = self.rows()[self.many.pk]
+        self.assertEqual(seeded[:2], (10, 48))
+
+        EnterpriseRanking.objects.filter(pk=self.many.pk).delete()
+        Review.objects.create(enterprise=self.many, title="Nueva", body="Bien.", rating=3)
+        seeded = self.rows()[self.many.pk]
+        ranking.rebuild()
+        self.assertEqual(seeded, self.rows()[self.many.pk])
+        self.assertEqual(seeded[:2], (11, 51))
+
+    def test_old_activity_decays_below_recent_activity(self):
+        Review.objects.filter(enterprise=self.bad).update(created_at=timezone.now() - timedelta(days=30))
+        ranking.rebuild()
+        order = [r.enterprise_id for r in ranking.trending()]
+        self.assertEqual(order[0], self.many.pk)
+        self.assertEqual(order[-1], self.bad.pk)
+        row = EnterpriseRanking.objects.get(pk=self.bad.pk)
+        # 10 reviews hace 30 días con vida media de 7: 10 * 2^(-30/7)
+        self.assertAlmostEqual(ranking.activity(row.trend_log, timezone.now()), 10 * 2 ** (-30 / 7), places=3)
+
+    def test_listings_read_their_index_with_limit(self):
+        for qs in (ranking.trending(), ranking.best_rated()):
+            sql, params = qs.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+                plan = " | ".join(row[-1] for row in cursor.fetchall())
+            self.assertNotIn("TEMP B-TREE", plan)
+            self.assertRegex(plan, r"ranking_(trend|bayes)_idx")
+
+    def test_view_uses_a_single_ranking_query(self):
+        for by in ("trending", "rating"):
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.client.get(reverse("rankings"), {"by": by})
+            self.assertContains(resp, "Muchas reviews")
+            touching = [q for q in ctx.captured_queries if "experiences_" in q["sql"]]
+            self.assertEqual(len(touching), 1)
+            self.assertIn("LIMIT 20", touching[0]["sql"])
+
+
+# ============================================================
+# Caché de páginas por versión y calentamiento
+# ============================================================
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterprise = Enterprise.objects.create(name="Acme")
+        self.review = Review.objects.create(enterprise=self.enterprise, title="Primera", body="Texto.", rating=4)
+
+    def test_stats_are_cached_and_follow_writes(self):
+        self.assertEqual(page_cache.enterprise_stats([self.enterprise.pk])[self.enterprise.pk], (1, 4))
+        with self.assertNumQueries(0):
+            page_cache.enterprise_stats([self.enterprise.pk])
+        Review.objects.create(enterprise=self.enterprise, title="Segunda", body="Otro.", rating=2)
+        self.assertEqual(page_cache.enterprise_stats([self.enterprise.pk])[self.enterprise.pk], (2, 3))
+
+    def test_fragments_are_invalidated_by_writes(self):
+        url = reverse("review_detail", args=[self.review.pk])
+        self.assertContains(self.client.get(url), "Aún no hay comentarios")
+        Comment.objects.create(review=self.review, text="Comentario nuevo")
+        self.assertContains(self.client.get(url), "Comentario nuevo")
+
+        url = reverse("enterprise_experiences", args=[self.enterprise.pk])
+        self.assertContains(self.client.get(url), "1 comentario")
+        Review.objects.create(enterprise=self.enterprise, title="Recien llegada", body="Hola.", rating=3)
+        self.assertContains(self.client.get(url), "Recien llegada")
+
+    def test_cached_listing_skips_review_queries(self):
+        url = reverse("enterprise_experiences", args=[self.enterprise.pk])
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(url), "Primera")
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "experiences_review"' in q["sql"]])
+
+
+@override_settings(AI_SUMMARY_REFRESH={"async": False, "retry_backoff": 300}, SUMMARIZER_BACKEND="fake")
+class WarmCacheTests(TransactionTestCase):
+    # Los hilos del calentador usan sus propias conexiones: los datos deben estar confirmados
+    def setUp(self):
+        cache.clear()
+        self.quiet = Enterprise.objects.create(name="Tranquila")
+        self.busy = Enterprise.objects.create(name="Activa")
+        Review.objects.create(enterprise=self.quiet, title="Vieja", body="Texto.", rating=3)
+        Review.objects.filter(enterprise=self.quiet).update(created_at=timezone.now() - timedelta(days=60))
+        for i in range(3):
+            Review.objects.create(enterprise=self.busy, title=f"Nueva {i}", body="Texto.", rating=5)
+        ranking.rebuild()
+
+    def test_targets_follow_activity(self):
+        targets = warmup.hot_targets(enterprises=2, reviews_per_enterprise=2)
+        self.assertEqual(targets[0], ("index", reverse("index")))
+        self.assertEqual(targets[1], ("enterprise", reverse("enterprise_experiences", args=[self.busy.pk])))
+        self.assertEqual([kind for kind, _ in targets].count("review"), 3)
+
+    def test_warm_renders_pages_into_the_cache(self):
+        targets = warmup.hot_targets(enterprises=2, reviews_per_enterprise=5)
+        report = warmup.warm(targets, workers=2, budget=30)
+        self.assertEqual((len(report.warmed), report.failed, report.skipped), (len(targets), [], 0))
+        self.assertEqual(report.by_kind()["enterprise"]["pages"], 2)
+
+        url = reverse("enterprise_experiences", args=[self.busy.pk])
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(url), "Nueva 2")
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "experiences_review"' in q["sql"]])
+
+    def test_warm_does_not_schedule_summary_refreshes(self):
+        Enterprise.objects.update(summary_stale=True)
+        with mock.patch("experiences.views.schedule_summary_refresh") as schedule:
+            report = warmup.warm(warmup.hot_targets(2, 5), workers=2, budget=30)
+        self.assertEqual(report.failed, [])
+        schedule.assert_not_called()
+
+    def test_budget_stops_new_pages(self):
+        report = warmup.warm(warmup.hot_targets(2, 5), workers=2, budget=0)
+        self.assertEqual(report.warmed, [])
+        self.assertEqual(report.skipped, 7)
+
+    def test_command_reports_what_was_warmed(self):
+        out, err = StringIO(), StringIO()
+        call_command("warm_cache", "--enterprises", "2", stdout=out, stderr=err)
+        self.assertIn("Caché calentada: 7 páginas", out.getvalue())
+        self.assertIn("LocMemCache", err.getvalue())
+
+
+# ============================================================
+# Comparación de empresas (cantidad fija de consultas)
+# ============================================================
+class CompareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterprises = [Enterprise.objects.create(name=f"Empresa {i:02d}") for i in range(11)]
+        self.acme = self.enterprises[0]
+        self.acme.AI_summary = "Buen lugar para aprender."
+        self.acme.save()
+        for i, e in enumerate(self.enterprises):
+            for rating in (5, 4, 4)[: 1 + i % 3]:
+                Review.objects.create(enterprise=e, title="T", body="Texto.", rating=rating)
+        old = Review.objects.filter(enterprise=self.acme).first()
+        Review.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=62))
+        Comment.objects.create(review=old, text="a")
+        Comment.objects.create(review=old, text="b")
+
+    def query(self, enterprises):
+        return "?" + "&".join(f"ids={e.pk}" for e in enterprises)
+
+    def test_metrics(self):
+        data = self.client.get(reverse("enterprise_compare_json") + self.query(self.enterprises[:3])).json()
+        self.assertEqual(len(data["months"]), comparison.MONTHS)
+        acme = next(e for e in data["enterprises"] if e["id"] == self.acme.pk)
+        self.assertEqual(acme["reviews_count"], 1)
+        self.assertEqual(acme["distribution"], {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1})
+        self.assertEqual((acme["comments_count"], acme["comments_per_review"], acme["commented_share"]), (2, 2, 1))
+        self.assertEqual(acme["summary"]["text"], "Buen lugar para aprender.")
+        self.assertEqual(sum(point["reviews"] for point in acme["monthly"]), 1)
+        self.assertEqual(acme["monthly"][-1]["reviews"], 0)
+
+        third = next(e for e in data["enterprises"] if e["id"] == self.enterprises[2].pk)
+        self.assertEqual((third["reviews_count"], third["average_rating"]), (3, 4.33))
+        self.assertEqual(third["monthly"][-1], {"month": data["months"][-1], "reviews": 3, "average_rating": 4.33})
+
+    def test_query_count_does_not_grow_with_selection(self):
+        for n in (2, 10):
+            with self.subTest(n=n), self.assertNumQueries(3):
+                resp = self.client.get(reverse("enterprise_compare_json") + self.query(self.enterprises[:n]))
+            self.assertEqual(len(resp.json()["enterprises"]), n)
+            # La página suma solo la consulta de las opciones del selector
+            with self.subTest(n=n, page=True), self.assertNumQueries(4):
+                resp = self.client.get(reverse("enterprise_compare") + self.query(self.enterprises[:n]))
+            self.assertContains(resp, "Reviews por mes")
+
+    def test_selection_must_have_between_two_and_ten(self):
+        for selected in (self.enterprises[:1], self.enterprises):
+            resp = self.client.get(reverse("enterprise_compare_json") + self.query(selected))
+            self.assertEqual(resp.status_code, 400)
+            self.assertIn("ids", resp.json()["errors"])
+        resp = self.client.get(reverse("enterprise_compare") + self.query(self.enterprises[:1]))
+        self.assertContains(resp, "Elige entre 2 y 10 empresas.")
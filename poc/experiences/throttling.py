@@ -0,0 +1,158 @@
+# ============================================
+# poc/experiences/throttling.py
+# Límite de escrituras por usuario, IP y empresa
+# --------------------------------------------
+# - Ventana deslizante aproximada con dos contadores de ventana fija
+#   (actual y anterior): estimado = anterior * (1 - transcurrido/ventana) + actual.
+#   Dos claves por alcance en la caché, sin listas de timestamps.
+# - Cada petición hace un cache.incr por alcance (add solo al abrir la
+#   ventana) y un get_many de las ventanas anteriores: con una caché
+#   compartida (Redis/Memcached) el conteo es atómico entre procesos.
+#   Si la petición se rechaza, el incremento se deshace (decr).
+# - Límites por ruta en settings.THROTTLE_RATES; al superarlos se responde
+#   429 con Retry-After.
+# ============================================
+
+from __future__ import annotations
+import math
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    window: int  # segundos
+
+
+def parse_rate(rate: str) -> Rate:
+    """ "5/h" -> Rate(5, 3600); también acepta "20/10m" (20 cada 10 minutos)."""
+    count, period = rate.split("/")
+    unit = period[-1]
+    multiplier = int(period[:-1] or 1)
+    return Rate(int(count), multiplier * UNITS[unit])
+
+
+def get_rates(route: str) -> Dict[str, Rate]:
+    rates = getattr(settings, "THROTTLE_RATES", {}).get(route, {})
+    return {scope: parse_rate(rate) for scope, rate in rates.items() if rate}
+
+
+def client_ip(request) -> str:
+    return request.META.get("REMOTE_ADDR") or "unknown"
+
+
+def _keys(route: str, scope: str, ident, window: int, now: float) -> Tuple[str, str, float]:
+    index = int(now // window)
+    base = f"throttle:{route}:{scope}:{ident}:{window}"
+    return f"{base}:{index}", f"{base}:{index - 1}", now - index * window
+
+
+def _hit(key: str, window: int) -> int:
+    # Camino habitual: la clave ya existe y incr es atómico en backends compartidos
+    try:
+        return cache.incr(key)
+    except ValueError:
+        pass
+    # Primera petición de la ventana: add no pisa a otro proceso que se adelantó
+    if cache.add(key, 1, window * 2):
+        return 1
+    return cache.incr(key)
+
+
+def retry_after(previous: int, current: int, elapsed: float, rate: Rate) -> int:
+    """Segundos hasta que una petición más quepa en la ventana (`current` sin contarla)."""
+    limit, window = rate.limit, rate.window
+    if current + 1 <= limit and previous:
+        # Alcanza con esperar a que pese menos la ventana anterior
+        wait = window * (1 - (limit - current - 1) / previous) - elapsed
+    else:
+        # Hay que pasar a la ventana siguiente, donde la actual será la anterior
+        wait = window - elapsed
+        if current and limit > 1:
+            wait += max(0.0, window * (1 - (limit - 1) / current))
+        elif current:
+            wait += window
+    return max(1, math.ceil(wait))
+
+
+def check(route: str, idents: Dict[str, object], now: Optional[float] = None) -> Optional[int]:
+    """
+    Cuenta la petición en cada alcance configurado para la ruta.
+    Devuelve None si se acepta, o los segundos de Retry-After si se rechaza
+    (en ese caso no queda contada en ningún alcance).
+    """
+    now = time.time() if now is None else now
+    hits = []
+    for scope, rate in get_rates(route).items():
+        ident = idents.get(scope)
+        if ident is None:
+            continue
+        key, previous_key, elapsed = _keys(route, scope, ident, rate.window, now)
+        hits.append((rate, key, previous_key, elapsed, _hit(key, rate.window)))
+    if not hits:
+        return None
+
+    # Una sola ida a la caché para las ventanas anteriores de todos los alcances
+    previous_counts = cache.get_many([h[2] for h in hits])
+    wait = 0
+    for rate, key, previous_key, elapsed, current in hits:
+        previous = previous_counts.get(previous_key, 0)
+        if previous * (1 - elapsed / rate.window) + current > rate.limit:
+            wait = max(wait, retry_after(previous, current - 1, elapsed, rate))
+    if not wait:
+        return None
+
+    for _, key, *_ in hits:
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+    return wait
+
+
+def too_many_requests(retry: int) -> HttpResponse:
+    response = HttpResponse(
+        "Demasiadas solicitudes. Intenta de nuevo en unos minutos.", status=429
+    )
+    response["Retry-After"] = str(retry)
+    return response
+
+
+def throttle(
+    route: str,
+    methods: Tuple[str, ...] = ("POST",),
+    enterprise: Optional[Callable[..., object]] = None,
+):
+    """
+    Decorador de vistas. `route` es la clave en settings.THROTTLE_RATES;
+    `enterprise(request, **kwargs)` devuelve el id de empresa para el alcance
+    "enterprise". Solo cuenta los métodos indicados (por defecto, POST).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method in methods:
+                user = getattr(request, "user", None)
+                idents = {
+                    "user": user.pk if user is not None and user.is_authenticated else None,
+                    "ip": client_ip(request),
+                    "enterprise": enterprise(request, **kwargs) if enterprise else None,
+                }
+                retry = check(route, idents)
+                if retry is not None:
+                    return too_many_requests(retry)
+            return view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
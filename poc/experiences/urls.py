@@ -29,6 +29,10 @@ urlpatterns = [
     # Experiencias por empresa
     # -------------------------
     path("enterprises/<int:pk>/experiences/", views.enterprise_experiences, name="enterprise_experiences"),
+    path("enterprises/autocomplete/", views.enterprise_autocomplete, name="enterprise_autocomplete"),
+    path("enterprises/ranking/", views.rankings, name="rankings"),
+    path("enterprises/compare/", views.enterprise_compare, name="enterprise_compare"),
+    path("enterprises/compare/json/", views.enterprise_compare_json, name="enterprise_compare_json"),
 
     # -------------------------
     # Detalle de experiencia y comentarios
@@ -56,6 +60,13 @@ urlpatterns = [
     path('login/', views.signin, name='login'),
     path('logout/', views.signout, name='logout'),
 
+    # -------------------------
+    # Reportes para staff
+    # -------------------------
+    path('staff/llm-stats/', views.llm_stats, name='llm_stats'),
+    path('staff/profiles/', views.profile_captures, name='profile_captures'),
+    path('staff/profiles/<str:filename>', views.profile_capture_download, name='profile_capture_download'),
+
     # -------------------------
     # Ruta de verificación (Health Check)
     # -------------------------
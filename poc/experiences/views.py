@@ -6,12 +6,21 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.paginator import Paginator
+from django.urls import reverse
 from django.utils import timezone
-from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.functional import SimpleLazyObject
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.views.decorators.http import require_POST
 from .models import Enterprise, Review, Comment
-from .forms import SignUpForm, ReviewForm, CommentForm
+from .forms import SignUpForm, ReviewForm, CommentForm, ReviewFilterForm, CompareForm
+from .services import schedule_summary_refresh
+from . import autocomplete, comparison, dedup, page_cache, profiling, ranking
+from .throttling import throttle
+from .telemetry import aggregate_stats
 
+REVIEWS_PER_PAGE = 20
 
 # ============================================================
 # Autenticación básica (signup / login / logout)
@@ -66,25 +75,113 @@ def index(request):
     qs = Enterprise.objects.all()
     if q:
         qs = qs.filter(name__icontains=q)
-    qs = qs.order_by("name")
+    qs = list(qs.order_by("name"))
+    # Conteo y promedio de cada empresa: caché por versión (sin 2 consultas por tarjeta)
+    stats = page_cache.enterprise_stats([e.pk for e in qs])
+    for e in qs:
+        e.stats = stats[e.pk]
     return render(request, "experiences/index.html", {"q": q, "qs": qs})
 
+def rankings(request):
+    """
+    Empresas en tendencia (?by=trending) o mejor valoradas (?by=rating).
+    Lee la tabla materializada EnterpriseRanking: una consulta con LIMIT.
+    """
+    by = "rating" if request.GET.get("by") == "rating" else "trending"
+    cfg = ranking.get_config()
+    rows = list(ranking.best_rated() if by == "rating" else ranking.trending())
+    now = timezone.now()
+    for row in rows:
+        row.activity = ranking.activity(row.trend_log, now, cfg)
+        row.average = row.rating_sum / row.reviews_count if row.reviews_count else 0
+    return render(request, "experiences/rankings.html", {"by": by, "rows": rows, "cfg": cfg})
+
+def enterprise_compare(request):
+    """
+    Comparación lado a lado de 2-10 empresas (?ids=1&ids=2...).
+    Métricas en una cantidad fija de consultas (ver comparison.py).
+    """
+    form = CompareForm(request.GET or None)
+    result = volume = None
+    if form.is_valid():
+        result = comparison.compare(form.cleaned_data["ids"])
+        # Filas de la tabla mensual: (mes, [punto de cada empresa])
+        volume = list(zip(result["months"], zip(*(e["monthly"] for e in result["enterprises"]))))
+    return render(request, "experiences/compare.html", {"form": form, "comparison": result, "volume": volume})
+
+def enterprise_compare_json(request):
+    """Las mismas métricas de enterprise_compare en JSON (400 si la selección no es válida)."""
+    form = CompareForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors.get_json_data()}, status=400)
+    return JsonResponse(comparison.compare(form.cleaned_data["ids"]))
+
+def enterprise_autocomplete(request):
+    """
+    Sugerencias de empresas por prefijo (JSON), para el buscador del índice.
+    Se sirve desde el índice en memoria, sin consultar la BD por petición.
+    """
+    q = (request.GET.get("q") or "").strip()
+    try:
+        limit = min(max(int(request.GET.get("limit", 0)), 0), 20) or None
+    except ValueError:
+        limit = None
+    results = [
+        {
+            "id": e.id,
+            "name": e.name,
+            "reviews_count": e.reviews_count,
+            "url": reverse("enterprise_experiences", args=[e.id]),
+        }
+        for e in autocomplete.search(q, limit)
+    ]
+    return JsonResponse({"q": q, "results": results})
+
 def enterprise_experiences(request, pk):
     enterprise = get_object_or_404(Enterprise, pk=pk)
-    # Trae las reviews más recientes con su autor
-    reviews = enterprise.reviews.select_related("author").order_by("-created_at")
+    # Resumen desactualizado: se muestra el último válido y se programa el refresco
+    # (no al calentar la caché: serían decenas de llamadas a la IA de golpe)
+    if enterprise.summary_stale and not getattr(request, "cache_warmup", False):
+        schedule_summary_refresh(enterprise.pk)
+    # Reviews filtradas y ordenadas (GET), paginadas; cada orden usa su índice
+    filters = ReviewFilterForm(request.GET or None)
+    reviews = filters.apply(enterprise.reviews.select_related("author"))
+    page_number = request.GET.get("page") or "1"
+    # Perezosa: si el fragmento del listado está en caché no se consulta la BD
+    page = SimpleLazyObject(lambda: Paginator(reviews, REVIEWS_PER_PAGE).get_page(page_number))
+    querystring = request.GET.copy()
+    querystring.pop("page", None)
+    # Empresas relacionadas: precalculadas por build_similarity (una consulta)
+    related = enterprise.neighbors.select_related("neighbor")
     return render(
         request,
         "experiences/enterprise_experiences.html",
-        {"enterprise": enterprise, "reviews": reviews},
+        {
+            "enterprise": enterprise,
+            "stats": page_cache.enterprise_stats([enterprise.pk])[enterprise.pk],
+            "version": page_cache.version(page_cache.ENTERPRISE, enterprise.pk),
+            "cache_timeout": page_cache.get_config()["timeout"],
+            "reviews": page,
+            "page": page,
+            "page_number": page_number,
+            "filters": filters,
+            "querystring": querystring.urlencode(),
+            "related": related,
+        },
     )
 
+@throttle("comment_create")
 def review_detail(request, pk):
     review = get_object_or_404(
         Review.objects.select_related("enterprise", "author"), pk=pk
     )
 
     comments = review.comments.select_related("author").order_by("-created_at")
+    # Reviews similares: precalculadas por build_similarity (una consulta);
+    # un casi duplicado marcado después del último cálculo no se muestra
+    similar = review.neighbors.filter(neighbor__fingerprint__duplicate_of__isnull=True).select_related(
+        "neighbor__enterprise"
+    )
 
     if request.method == "POST":
         if not request.user.is_authenticated:
@@ -103,19 +200,42 @@ def review_detail(request, pk):
     return render(
         request,
         "experiences/review_detail.html",
-        {"review": review, "comments": comments, "form": form},
+        {
+            "review": review,
+            "comments": comments,
+            "form": form,
+            "similar": similar,
+            "version": page_cache.version(page_cache.REVIEW, review.pk),
+            "cache_timeout": page_cache.get_config()["timeout"],
+        },
     )
 
 # ============================================================
 # Creación de nuevas reviews
 # ------------------------------------------------------------
+def _reject_duplicate(form, enterprise_id, author_id, review=None):
+    """
+    Rechaza reviews casi idénticas a otras de la misma empresa o del mismo autor
+    (umbrales en settings.REVIEW_DEDUP). Las que solo superan el umbral de
+    marcado se guardan y quedan marcadas por la señal de indexación.
+    Al editar (`review`) solo se compara con reviews anteriores a ella.
+    """
+    verdict = dedup.check_text(
+        form.cleaned_data["body"], enterprise_id, author_id,
+        review.pk if review else None, review.created_at if review else None,
+    )
+    if verdict.rejected:
+        form.add_error("body", "Esta experiencia es casi idéntica a otra ya publicada. Cuéntanos algo nuevo.")
+    return verdict.rejected
+
 @login_required(login_url="/login/")
+@throttle("review_create", enterprise=lambda request, pk: pk)
 def review_create(request, pk):
     enterprise = get_object_or_404(Enterprise, pk=pk)
 
     if request.method == "POST":
         form = ReviewForm(request.POST)
-        if form.is_valid():
+        if form.is_valid() and not _reject_duplicate(form, enterprise.pk, request.user.pk):
             review = form.save(commit=False)
             review.enterprise = enterprise
             review.author = request.user
@@ -142,8 +262,14 @@ def review_edit(request, pk):
 
     if request.method == "POST":
         form = ReviewForm(request.POST, instance=review)
-        if form.is_valid():
-            form.save()
+        # Sin cambios en el cuerpo no se vuelve a chequear ni a indexar su firma
+        body_changed = "body" in form.changed_data
+        if form.is_valid() and not (
+            body_changed and _reject_duplicate(form, review.enterprise_id, request.user.pk, review)
+        ):
+            review = form.save(commit=False)
+            if form.changed_data:
+                review.save(update_fields=form.changed_data)
             return redirect("review_detail", pk=review.pk)
     else:
         form = ReviewForm(instance=review)
@@ -219,6 +345,39 @@ def comment_edit(request, pk):
 
     return render(request, "experiences/comment_edit.html", {"comment": comment, "form": form})
 
+# ============================================================
+# Reportes para staff
+# ------------------------------------------------------------
+@staff_member_required(login_url="/login/")
+def llm_stats(request):
+    """
+    Telemetría de llamadas a la IA: latencia, tokens, costo estimado
+    y regeneraciones por empresa (?days=N, 0 = todo el historial).
+    """
+    try:
+        days = max(0, int(request.GET.get("days", 30)))
+    except ValueError:
+        days = 30
+    stats = aggregate_stats(days=days or None)
+    return render(request, "experiences/llm_stats.html", {"stats": stats, "days": days})
+
+@staff_member_required(login_url="/login/")
+def profile_captures(request):
+    """Capturas recientes del perfilador bajo demanda (?_profile=1 en cualquier página)."""
+    return render(
+        request,
+        "experiences/profile_captures.html",
+        {"captures": profiling.list_captures(limit=100), "param": profiling.QUERY_PARAM},
+    )
+
+@staff_member_required(login_url="/login/")
+def profile_capture_download(request, filename):
+    """Descarga el .prof (cProfile) o el .json (SQL + templates) de una captura."""
+    path = profiling.capture_path(filename)
+    if path is None:
+        raise Http404("Captura no encontrada")
+    return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
+
 def health(request):
     """Endpoint de salud (health check)."""
     return HttpResponse("OK - AskMeJobs")
\ No newline at end of file
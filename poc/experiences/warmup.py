@@ -0,0 +1,139 @@
+# ============================================
+# poc/experiences/warmup.py
+# Calentamiento de la caché de páginas tras un deploy o un vaciado
+# --------------------------------------------
+# - Elige las páginas más activas: índice, las empresas con más actividad
+#   reciente (EnterpriseRanking.trend_log) y las reviews más nuevas de cada
+#   una (las que se ven en la primera página de su listado).
+# - Renderiza cada página con su vista, como un visitante anónimo: quedan
+#   guardados los fragmentos {% cache %} y los agregados de page_cache.
+#   La petición lleva cache_warmup=True: las vistas omiten sus efectos
+#   secundarios (no se programan refrescos de resúmenes con la IA).
+# - Hilos con concurrencia acotada (workers) y presupuesto de tiempo: al
+#   agotarse no se inician más páginas; las que ya corren terminan.
+# - Solo tiene sentido con una caché compartida (ASKMEJOBS_REDIS_URL):
+#   con LocMemCache lo calentado queda en el proceso del comando.
+# ============================================
+
+from __future__ import annotations
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from .models import Enterprise, EnterpriseRanking, Review
+from .page_cache import get_config
+
+Target = Tuple[str, str]  # (tipo, ruta)
+
+
+@dataclass
+class Report:
+    warmed: List[Tuple[str, str, float]] = field(default_factory=list)  # (tipo, ruta, ms)
+    failed: List[Tuple[str, str, str]] = field(default_factory=list)    # (tipo, ruta, error)
+    skipped: int = 0  # páginas no iniciadas por el presupuesto de tiempo
+    elapsed: float = 0.0
+
+    def by_kind(self) -> Dict[str, Dict[str, float]]:
+        kinds: Dict[str, Dict[str, float]] = {}
+        for kind, _, ms in self.warmed:
+            row = kinds.setdefault(kind, {"pages": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["pages"] += 1
+            row["total_ms"] += ms
+            row["max_ms"] = max(row["max_ms"], ms)
+        return kinds
+
+
+def hot_targets(enterprises: int, reviews_per_enterprise: int) -> List[Target]:
+    """Páginas a calentar, de la más a la menos visitada (se recorren en ese orden)."""
+    hot = list(
+        EnterpriseRanking.objects.order_by("-trend_log").values_list("enterprise_id", flat=True)[:enterprises]
+    )
+    if len(hot) < enterprises:
+        # Sin ranking (o con pocas filas): las empresas con más reviews
+        hot += list(
+            Enterprise.objects.exclude(pk__in=hot).annotate(n=Count("reviews")).order_by("-n", "pk")
+            .values_list("pk", flat=True)[:enterprises - len(hot)]
+        )
+
+    newest: Dict[int, List[int]] = {pk: [] for pk in hot}
+    if reviews_per_enterprise > 0 and hot:
+        # Las N más nuevas de cada empresa en una sola consulta (ROW_NUMBER por empresa)
+        rows = (
+            Review.objects.filter(enterprise_id__in=hot)
+            .annotate(position=Window(RowNumber(), partition_by=F("enterprise_id"), order_by=F("created_at").desc()))
+            .filter(position__lte=reviews_per_enterprise)
+            .values_list("enterprise_id", "pk")
+        )
+        for enterprise_id, pk in rows:
+            newest[enterprise_id].append(pk)
+
+    targets: List[Target] = [("index", reverse("index"))]
+    targets += [("enterprise", reverse("enterprise_experiences", args=[pk])) for pk in hot]
+    targets += [("review", reverse("review_detail", args=[pk])) for enterprise_id in hot for pk in newest[enterprise_id]]
+    return targets
+
+
+def _render(path: str) -> int:
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    # Las vistas omiten efectos secundarios (p. ej. refrescar resúmenes con la IA)
+    request.cache_warmup = True
+    match = resolve(path)
+    try:
+        return match.func(request, *match.args, **match.kwargs).status_code
+    finally:
+        # Cada hilo abre su propia conexión: se cierra al terminar la página
+        connections.close_all()
+
+
+def _fetch(kind: str, path: str) -> Tuple[str, str, float, Optional[str]]:
+    start = time.perf_counter()
+    try:
+        status = _render(path)
+        error = None if status == 200 else f"HTTP {status}"
+    except Exception as exc:  # una página rota no detiene el resto
+        error = repr(exc)
+    return kind, path, (time.perf_counter() - start) * 1000, error
+
+
+def warm(
+    targets: List[Target],
+    workers: Optional[int] = None,
+    budget: Optional[float] = None,
+) -> Report:
+    cfg = get_config()
+    workers = max(1, workers or cfg["warm_workers"])
+    budget = cfg["warm_budget"] if budget is None else budget
+    deadline = time.monotonic() + budget
+    report = Report()
+
+    def collect(done) -> None:
+        for future in done:
+            kind, path, ms, error = future.result()
+            if error:
+                report.failed.append((kind, path, error))
+            else:
+                report.warmed.append((kind, path, ms))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm-cache") as pool:
+        pending = set()
+        for position, (kind, path) in enumerate(targets):
+            if len(pending) >= workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            if time.monotonic() >= deadline:
+                report.skipped = len(targets) - position
+                break
+            pending.add(pool.submit(_fetch, kind, path))
+        collect(wait(pending).done)
+    report.elapsed = time.perf_counter() - start
+    return report